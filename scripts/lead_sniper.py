@@ -5,22 +5,87 @@ Lead Sniper — Data acquisition engine for DoggyBagg Ordinance.
 Fetches San Diego Open Data (STRO, RUBT, Building Permits), applies 2026
 intelligence filters, and outputs high-priority leads to leads_crm.csv.
 
-Designed for GitHub Action automation with stealth delays for rate limits.
+Designed for GitHub Action automation: one pooled session with retry/backoff,
+paced by a per-host token bucket to stay within the portal's rate limits.
 """
 
+import argparse
 import csv
+import gzip
+import hashlib
+import io
+import json
 import os
-import random
+import re
+import shutil
+import tempfile
+import threading
 import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from difflib import SequenceMatcher
+from itertools import islice
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from lead_store import DIRECTIONALS, AddressIndex, LeadStore, canonical_address, csv_lock
+from run_report import RunReport, TimedIter, activate, current
+from tpa_index import TpaIndex, parse_point
 
 # --- Configuration ---
 BASE_DIR = Path(__file__).resolve().parent.parent
-OUTPUT_CSV = BASE_DIR / "leads_crm.csv"
-DELAY_MIN_SEC = 1.5
-DELAY_MAX_SEC = 3.5
+OUTPUT_CSV = BASE_DIR / "leads_crm.csv"  # Append-only mirror for spreadsheets and lib/leads.ts
+LEADS_DB = BASE_DIR / "leads_crm.db"     # Lead store (source of truth; see lead_store.py)
+
+# HTTP: every request goes through one pooled session, paced by a per-host token bucket.
+# --concurrent downloads the datasets in parallel (FETCH_WORKERS threads) under the same limit.
+FETCH_WORKERS = 3
+RATE_LIMIT_PER_SEC = 0.4  # Sustained requests/sec per host (~ one per 2.5 s)
+RATE_LIMIT_BURST = 3      # Requests allowed back-to-back before pacing kicks in
+HTTP_RETRIES = 4
+HTTP_BACKOFF_SEC = 1.0          # Exponential: 1, 2, 4, 8 s between attempts (Retry-After wins when sent)
+HTTP_BACKOFF_JITTER_SEC = 1.0
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# On-disk HTTP cache for Seshat exports (they change at most daily).
+# Entries are revalidated with If-None-Match / If-Modified-Since; a 304 reuses the stored body.
+CACHE_DIR = BASE_DIR / ".lead_sniper_cache"
+CACHE_TTL_SEC = 7 * 24 * 3600       # Drop entries not revalidated within a week
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB cap; least recently validated entries go first
+CACHE_ENABLED = os.environ.get("LEAD_SNIPER_NO_CACHE", "").strip() not in ("1", "true")
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Record/replay snapshots (--record / --replay): every raw dataset response (CSV export or CKAN
+# page) gzipped into one directory with a manifest. Replay serves them back with no network and
+# no rate limiting, for reproducible offline profiling of the filter pipeline.
+SNAPSHOT_DIR = BASE_DIR / ".lead_sniper_snapshot"
+SNAPSHOT_COMPRESS_LEVEL = 6
+
+# Columnar snapshot (needs pyarrow): after each run the downloaded CSVs are kept as uncompressed
+# Arrow IPC files holding only the columns the rules read. --analyze memory-maps them and runs the
+# rules as vectorized column scans, to try filter changes without re-downloading or re-parsing CSV.
+COLUMNAR_DIR = BASE_DIR / ".lead_sniper_columnar"
+COLUMNAR_ENABLED = HAS_PYARROW and os.environ.get("LEAD_SNIPER_NO_COLUMNAR", "").strip() not in ("1", "true")
+
+# Incremental ingestion: per-dataset row-hash watermarks from the last run.
+# Unchanged rows are skipped before the rule pass; --full (or a missing leads_crm.csv) rescans everything.
+WATERMARK_DIR = BASE_DIR / ".lead_sniper_state"
 
 # San Diego Open Data — seshat.datasd.org (City uses this for CSV exports)
 URL_STRO = "https://seshat.datasd.org/stro_licenses/stro_licenses_datasd.csv"
@@ -28,8 +93,15 @@ URL_RUBT = "https://seshat.datasd.org/rtax_accounts/rtax_accounts_datasd.csv"
 URL_PERMITS_ACTIVE = "https://seshat.datasd.org/development_permits_set2/permits_set2_active_datasd.csv"
 URL_PERMITS_CLOSED = "https://seshat.datasd.org/development_permits_set2/permits_set2_closed_datasd.csv"
 
-# CKAN fallback (if resource_id available)
+# CKAN datastore (data.sandiego.gov). When a resource id is set for a dataset
+# (LEAD_SNIPER_CKAN_STRO / _RUBT / _PERMITS_CLOSED), rules read it via paginated
+# datastore_search with column projection instead of downloading the full CSV export.
 CKAN_BASE = "https://data.sandiego.gov/api/3/action"
+CKAN_PAGE_SIZE = 5000
+CKAN_RESOURCE_IDS = {
+    dataset: os.environ.get(f"LEAD_SNIPER_CKAN_{dataset.upper()}", "").strip()
+    for dataset in ("stro", "rubt", "permits_closed")
+}
 
 # 2026 Intelligence — Priority zones
 ZIP_PACIFIC_BEACH = "92109"
@@ -39,7 +111,10 @@ TIER_3 = "Tier 3"
 TIER_4 = "Tier 4"
 
 # Transit Priority Areas (TPAs) — 2026 LDC density amendments
-# Add more zips/planning areas as needed; sample set for high-density corridors
+# With TPA_GEOJSON present, rows with lat/lon are tested against the real TPA polygons
+# (tpa_index.py); TPA_ZIPS remains the fallback for rows without coordinates or without the file.
+TPA_GEOJSON = Path(os.environ.get("LEAD_SNIPER_TPA_GEOJSON") or BASE_DIR / "data" / "transit_priority_areas.geojson")
+# Sample set of zips for high-density corridors
 TPA_ZIPS = {
     "92101", "92103", "92104", "92105", "92110", "92113",
     "92114", "92115", "92116", "92117", "92111", "92126",
@@ -48,39 +123,556 @@ TPA_ZIPS = {
 # ADU keywords in permit records
 ADU_KEYWORDS = ("adu", "accessory dwelling", "junior", "granny", "secondary unit")
 COMPLETED_STATUS = ("closed", "completed", "final", "approved")
+# One combined pattern, longest keyword first: a single scan per description instead of one per keyword
+ADU_KEYWORD_RE = re.compile("|".join(re.escape(k) for k in sorted(ADU_KEYWORDS, key=len, reverse=True)))
+
+# Fuzzy duplicates across sources: same zip + house number (no zip: house number + street prefix),
+# similar street and owner name
+FUZZY_MATCH_THRESHOLD = 0.8
+FUZZY_NAME_WEIGHT = 0.25  # share of the score from owner-name similarity, when both names are known
+FUZZY_TOKEN_RATIO = 0.8  # street tokens at least this similar count as a (partial) match ("garnet"/"garnett")
+FUZZY_STREET_PREFIX = 3  # leading characters of the street name in the zipless block key ("mission"/"misson")
+_DIRECTIONAL_TOKENS = set(DIRECTIONALS.values())
+NAME_STOPWORDS = {"llc", "inc", "co", "corp", "lp", "ltd", "trust", "the", "of", "and", "unknown"}
+LEAD_TYPE_SEP = "+"
+
+
+_TPA_INDEX: TpaIndex | None = None
+_TPA_INDEX_LOADED = False
+_TPA_INDEX_LOCK = threading.Lock()
+
+
+def tpa_index() -> TpaIndex | None:
+    """TPA polygons from TPA_GEOJSON, loaded once per run; None when the file is missing or unreadable."""
+    global _TPA_INDEX, _TPA_INDEX_LOADED
+    if _TPA_INDEX_LOADED:
+        return _TPA_INDEX
+    with _TPA_INDEX_LOCK:
+        if not _TPA_INDEX_LOADED:
+            if TPA_GEOJSON.exists():
+                try:
+                    _TPA_INDEX = TpaIndex.from_geojson(TPA_GEOJSON)
+                    print(f"[lead_sniper] TPA polygons: {len(_TPA_INDEX)} from {TPA_GEOJSON}")
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print(f"[lead_sniper] TPA polygons unreadable ({e}); using TPA_ZIPS")
+            _TPA_INDEX_LOADED = True
+    return _TPA_INDEX
+
+
+def in_tpa(view: dict) -> str | None:
+    """
+    Transit Priority Area membership of a row view: point-in-polygon on its lat/lon when TPA
+    polygons are loaded and the row has coordinates, else its zip in TPA_ZIPS.
+    Returns the method as the lead's Match tag ("tpa_polygon" / "tpa_zip"), or None.
+    """
+    index = tpa_index()
+    if index is not None:
+        point = parse_point(view.get("lat"), view.get("lon"))
+        if point is not None:
+            return "tpa_polygon" if index.contains(*point) else None
+    return "tpa_zip" if view["zip"] in TPA_ZIPS else None
+
+
+def match_adu_keyword(desc: str) -> str | None:
+    """Return the first ADU keyword found in a lowercased permit description, or None."""
+    m = ADU_KEYWORD_RE.search(desc)
+    return m.group(0) if m else None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens/sec up to `burst`; acquire() blocks until one is free."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def rate_limit(url: str) -> None:
+    """Block until the per-host token bucket for url allows another request."""
+    host = urlsplit(url).netloc
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(host)
+        if bucket is None:
+            bucket = _BUCKETS[host] = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+    bucket.acquire()
+
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _retry_policy() -> Retry:
+    """Retry transient failures (connect errors, 429/5xx) with exponential backoff + jitter, honoring Retry-After."""
+    kwargs = dict(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_SEC,
+        status_forcelist=HTTP_RETRY_STATUS,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand back the last response so raise_for_status() reports it
+    )
+    try:
+        return Retry(backoff_jitter=HTTP_BACKOFF_JITTER_SEC, **kwargs)
+    except TypeError:
+        return Retry(**kwargs)  # urllib3 < 2 has no backoff_jitter
+
+
+def get_session() -> requests.Session:
+    """Module-wide pooled session: one TCP/TLS connection pool per host, shared by all fetches and threads."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+            adapter = HTTPAdapter(
+                pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS, max_retries=_retry_policy(),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _cache_paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return CACHE_DIR / f"{key}.body", CACHE_DIR / f"{key}.json"
+
+
+def _cache_load(url: str) -> dict | None:
+    """Return cache metadata for url, or None if missing or past CACHE_TTL_SEC (stale entry is removed)."""
+    body_path, meta_path = _cache_paths(url)
+    if not body_path.exists() or not meta_path.exists():
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if time.time() - float(meta.get("validated_at", 0)) > CACHE_TTL_SEC:
+        body_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        return None
+    _cache_pin(meta_path)
+    return meta
+
+
+def _cache_write_meta(meta_path: Path, meta: dict) -> None:
+    tmp = meta_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, meta_path)
+
+
+def _stream_to_file(r: requests.Response, path: Path) -> int:
+    """Write a streamed response body to path chunk by chunk (atomic rename). Returns bytes written."""
+    tmp = path.with_name(path.name + ".tmp")
+    size = 0
+    with open(tmp, "wb") as f:
+        for chunk in r.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(tmp, path)
+    current().add("fetch", "bytes_downloaded", size)
+    return size
+
+
+def _cache_store(url: str, r: requests.Response) -> Path:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    body_path, meta_path = _cache_paths(url)
+    _cache_pin(meta_path)
+    size = _stream_to_file(r, body_path)
+    _cache_write_meta(meta_path, {
+        "url": url,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "encoding": r.encoding or "utf-8",
+        "size": size,
+        "validated_at": time.time(),
+    })
+    _cache_prune()
+    return body_path
+
+
+_CACHE_PRUNE_LOCK = threading.Lock()
+# Entries loaded or stored by this process: their bodies may still be read (DatasetRegistry
+# keeps the paths for the whole run), so pruning never evicts them. The cap can be exceeded
+# by this run's own datasets; older entries go on the next store.
+_CACHE_PINNED: set[str] = set()
+
+
+def _cache_pin(meta_path: Path) -> None:
+    with _CACHE_PRUNE_LOCK:
+        _CACHE_PINNED.add(meta_path.name)
+
+
+def _cache_prune() -> None:
+    """Evict stale entries, then least recently validated ones until under CACHE_MAX_BYTES (pinned entries excepted)."""
+    with _CACHE_PRUNE_LOCK:
+        _cache_prune_locked()
+
+
+def _cache_prune_locked() -> None:
+    entries = []
+    for meta_path in CACHE_DIR.glob("*.json"):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        entries.append((float(meta.get("validated_at", 0)), int(meta.get("size", 0)), meta_path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    now = time.time()
+    for validated_at, size, meta_path in entries:
+        if meta_path.name in _CACHE_PINNED:
+            continue
+        if total <= CACHE_MAX_BYTES and now - validated_at <= CACHE_TTL_SEC:
+            continue
+        meta_path.with_suffix(".body").unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        total -= size
+
+
+def http_get_cached(url: str, timeout: int = 60) -> tuple[Path, str]:
+    """
+    GET url through the on-disk conditional cache; the body is streamed to disk, never held in memory.
+    Sends If-None-Match / If-Modified-Since when a fresh entry exists; reuses it on 304.
+    Returns (body_path, encoding).
+    """
+    meta = _cache_load(url)
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as r:
+        if meta and r.status_code == 304:
+            body_path, meta_path = _cache_paths(url)
+            meta["validated_at"] = time.time()
+            _cache_write_meta(meta_path, meta)
+            current().add("fetch", "cache_hits")
+            print(f"[lead_sniper] Cache hit (304): {url}")
+            return body_path, meta.get("encoding") or "utf-8"
+        r.raise_for_status()
+        return _cache_store(url, r), r.encoding or "utf-8"
+
+
+class HttpSnapshot:
+    """
+    Recorded raw responses: one gzip file per request, keyed by a hash of url + params, listed
+    in manifest.json. Recording compresses each body after it is on local disk; replay hands
+    back the .gz path (read through gzip by iter_csv_file) or the parsed CKAN JSON.
+    """
+
+    def __init__(self, path: Path, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown snapshot mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._manifest_path = self.path / "manifest.json"
+        try:
+            self.manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            if mode == "replay":
+                raise FileNotFoundError(f"No snapshot at {self.path} (record one with --record)") from None
+            self.manifest = {"entries": {}}
+        if mode == "record":
+            self.path.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
 
-def stealth_delay():
-    """Random delay between API calls to stay within rate limits."""
-    sec = random.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC)
-    time.sleep(sec)
+    @staticmethod
+    def key(url: str, params: dict | None = None) -> str:
+        req = url + "?" + json.dumps(params or {}, sort_keys=True)
+        return hashlib.sha256(req.encode("utf-8")).hexdigest()[:32]
+
+    def _entry(self, url: str, params: dict | None) -> dict:
+        entry = self.manifest["entries"].get(self.key(url, params))
+        if entry is None:
+            raise LookupError(f"Not in snapshot {self.path}: {url}")
+        current().add("fetch", "replayed")
+        return entry
+
+    def _save_entry(self, url: str, params: dict | None, name: str, raw_bytes: int, encoding: str) -> None:
+        entry = {
+            "url": url,
+            "params": params,
+            "file": name,
+            "encoding": encoding,
+            "bytes": raw_bytes,
+            "compressed_bytes": (self.path / name).stat().st_size,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        with self._lock:
+            self.manifest["entries"][self.key(url, params)] = entry
+            self.manifest["updated_at"] = entry["recorded_at"]
+            tmp = self._manifest_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(self.manifest, indent=2), encoding="utf-8")
+            os.replace(tmp, self._manifest_path)
+
+    def _write_gz(self, name: str, src) -> None:
+        dest = self.path / name
+        tmp = dest.with_name(f"{dest.name}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb", compresslevel=SNAPSHOT_COMPRESS_LEVEL) as out:
+            shutil.copyfileobj(src, out, STREAM_CHUNK_BYTES)
+        os.replace(tmp, dest)
+
+    def record_file(self, url: str, body_path: Path, encoding: str) -> None:
+        name = f"{self.key(url)}.csv.gz"
+        with open(body_path, "rb") as src:
+            self._write_gz(name, src)
+        self._save_entry(url, None, name, body_path.stat().st_size, encoding)
+
+    def replay_file(self, url: str) -> tuple[Path, str]:
+        entry = self._entry(url, None)
+        return self.path / entry["file"], entry.get("encoding") or "utf-8"
+
+    def record_json(self, url: str, params: dict | None, body: bytes) -> None:
+        name = f"{self.key(url, params)}.json.gz"
+        self._write_gz(name, io.BytesIO(body))
+        self._save_entry(url, params, name, len(body), "utf-8")
+
+    def replay_json(self, url: str, params: dict | None) -> dict:
+        with gzip.open(self.path / self._entry(url, params)["file"], "rb") as f:
+            return json.load(f)
+
+    def summary(self) -> str:
+        entries = self.manifest["entries"].values()
+        raw = sum(e.get("bytes", 0) for e in entries)
+        packed = sum(e.get("compressed_bytes", 0) for e in entries)
+        return f"{len(entries)} responses, {raw / 2**20:.1f} MiB -> {packed / 2**20:.1f} MiB gzipped"
+
+
+SNAPSHOT: HttpSnapshot | None = None  # Set by main() for --record / --replay
+
+
+def _nonblank(lines: Iterable[str]) -> Iterator[str]:
+    return (line for line in lines if line.strip())
+
+
+def _open_text(path: Path, encoding: str):
+    """Open a local CSV body for reading; .gz (snapshot replay) is decompressed on the fly."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", newline="", encoding=encoding, errors="replace")
+    return open(path, newline="", encoding=encoding, errors="replace")
+
+
+def iter_csv_file(path: Path, encoding: str = "utf-8") -> Iterator[dict]:
+    """Yield row dicts from a CSV on disk, one at a time."""
+    with _open_text(path, encoding) as f:
+        yield from csv.DictReader(_nonblank(f))
+
+
+def iter_csv_records(path: Path, encoding: str = "utf-8") -> Iterator[list[str]]:
+    """Yield the header, then each data row, as plain lists (no per-row dict)."""
+    with _open_text(path, encoding) as f:
+        yield from csv.reader(_nonblank(f))
+
+
+def iter_csv(url: str) -> Iterator[dict]:
+    """
+    Stream row dicts from a CSV URL. Memory stays flat regardless of dataset size:
+    the body goes through the disk cache when enabled, otherwise straight from iter_lines.
+    While recording or replaying a snapshot it goes through a DatasetRegistry download instead.
+    """
+    if SNAPSHOT is not None:
+        registry = DatasetRegistry()
+        try:
+            yield from registry.rows(url)
+        finally:
+            registry.close()
+        return
+    rate_limit(url)
+    if CACHE_ENABLED:
+        path, encoding = http_get_cached(url)
+        yield from iter_csv_file(path, encoding)
+        return
+    with get_session().get(url, timeout=60, stream=True) as r:
+        r.raise_for_status()
+        r.encoding = r.encoding or "utf-8"
+        yield from csv.DictReader(_nonblank(r.iter_lines(decode_unicode=True)))
 
 
 def fetch_csv(url: str) -> list[dict]:
-    """Fetch CSV from URL and return list of row dicts."""
-    stealth_delay()
-    r = requests.get(url, timeout=60)
-    r.raise_for_status()
-    text = r.text
-    lines = [l for l in text.splitlines() if l.strip()]
-    if not lines:
-        return []
-    reader = csv.DictReader(lines)
-    return list(reader)
+    """Fetch CSV from URL and return list of row dicts. Prefer iter_csv for large datasets."""
+    return list(iter_csv(url))
 
 
-def ckan_datastore_search(resource_id: str, filters: dict | None = None, limit: int = 1000) -> list[dict]:
-    """Query San Diego CKAN datastore_search. Returns records."""
-    stealth_delay()
-    payload = {"resource_id": resource_id, "limit": limit}
-    if filters:
-        payload["filters"] = filters
-    r = requests.get(f"{CKAN_BASE}/datastore_search", params=payload, timeout=60)
-    r.raise_for_status()
-    data = r.json()
+def _ckan_get(url: str, params: dict | None = None) -> dict:
+    if SNAPSHOT is not None and SNAPSHOT.replaying:
+        data = SNAPSHOT.replay_json(url, params)
+    else:
+        rate_limit(url)
+        with current().stage("fetch"):
+            r = get_session().get(url, params=params, timeout=60)
+            r.raise_for_status()
+            data = r.json()
+        current().add("fetch", "bytes_downloaded", len(r.content))
+        if SNAPSHOT is not None:
+            SNAPSHOT.record_json(url, params, r.content)
     if not data.get("success"):
         raise RuntimeError(data.get("error", {}))
-    return data.get("result", {}).get("records", [])
+    return data.get("result", {})
+
+
+def ckan_resource_fields(resource_id: str) -> list[str]:
+    """Column ids of a CKAN datastore resource (limit=0: schema only, no records)."""
+    result = _ckan_get(f"{CKAN_BASE}/datastore_search", {"resource_id": resource_id, "limit": 0})
+    return [f["id"] for f in result.get("fields", [])]
+
+
+def iter_ckan_records(
+    resource_id: str,
+    filters: dict | None = None,
+    q: str | None = None,
+    fields: Iterable[str] | None = None,
+    page_size: int | None = None,
+) -> Iterator[dict]:
+    """
+    Stream records from CKAN datastore_search, page by page (follows _links.next).
+    filters / q are applied server-side; fields projects columns so only those come down.
+    """
+    page_size = page_size or CKAN_PAGE_SIZE
+    params: dict = {"resource_id": resource_id, "limit": page_size}
+    if filters:
+        params["filters"] = json.dumps(filters)
+    if q:
+        params["q"] = q
+    if fields:
+        params["fields"] = ",".join(fields)
+    url: str | None = f"{CKAN_BASE}/datastore_search"
+    while url:
+        result = _ckan_get(url, params)
+        records = result.get("records") or []
+        yield from records
+        next_link = (result.get("_links") or {}).get("next")
+        if len(records) < page_size or not next_link:
+            break
+        url, params = urljoin(CKAN_BASE, next_link), None
+
+
+def iter_ckan_table(
+    resource_id: str,
+    filters: dict | None = None,
+    q: str | None = None,
+    fields: Iterable[str] | None = None,
+) -> Iterator[list[str]]:
+    """
+    CKAN records in the same shape as iter_csv_records (header, then row lists of strings),
+    so a datastore query can feed run_rules in place of the CSV export.
+    Requested fields (and filters on fields) the resource does not have are dropped.
+    """
+    available = ckan_resource_fields(resource_id)
+    header = [f for f in fields if f in available] if fields else [f for f in available if f != "_id"]
+    if filters:
+        filters = {k: v for k, v in filters.items() if k in available}
+    yield header
+    for rec in iter_ckan_records(resource_id, filters=filters, q=q, fields=header):
+        yield ["" if rec.get(f) is None else str(rec.get(f)) for f in header]
+
+
+def ckan_datastore_search(resource_id: str, filters: dict | None = None, limit: int = 1000) -> list[dict]:
+    """Query San Diego CKAN datastore_search. Returns up to `limit` records."""
+    return list(islice(iter_ckan_records(resource_id, filters=filters, page_size=limit), limit))
+
+
+class DatasetRegistry:
+    """
+    Per-run dataset registry. Each URL is downloaded at most once (to the disk cache,
+    or to a per-run spool directory when the cache is disabled); every priority pass
+    then streams rows from that local copy. Failures are remembered too, so a dead
+    endpoint is not retried (and re-throttled) by later passes.
+    """
+
+    def __init__(self):
+        self._local: dict[str, tuple[Path, str]] = {}
+        self._errors: dict[str, Exception] = {}
+        self._spool: tempfile.TemporaryDirectory | None = None
+
+    def _spool_dir(self) -> Path:
+        if self._spool is None:
+            self._spool = tempfile.TemporaryDirectory(prefix="lead_sniper_")
+        return Path(self._spool.name)
+
+    def _download(self, url: str) -> tuple[Path, str]:
+        if SNAPSHOT is not None and SNAPSHOT.replaying:
+            return SNAPSHOT.replay_file(url)
+        rate_limit(url)
+        with current().stage("fetch"):
+            if CACHE_ENABLED:
+                path, encoding = http_get_cached(url)
+            else:
+                path = self._spool_dir() / hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+                with get_session().get(url, timeout=60, stream=True) as r:
+                    r.raise_for_status()
+                    _stream_to_file(r, path)
+                    encoding = r.encoding or "utf-8"
+        if SNAPSHOT is not None:
+            SNAPSHOT.record_file(url, path, encoding)
+        return path, encoding
+
+    def _ensure(self, url: str) -> tuple[Path, str]:
+        if url in self._errors:
+            raise self._errors[url]
+        if url not in self._local:
+            try:
+                self._local[url] = self._download(url)
+            except Exception as e:
+                self._errors[url] = e
+                raise
+        return self._local[url]
+
+    def prefetch(self, urls: Iterable[str], workers: int = FETCH_WORKERS) -> None:
+        """Download every not-yet-fetched url in parallel; failures are recorded for rows()/records() to raise."""
+        pending = [u for u in dict.fromkeys(urls) if u not in self._local and u not in self._errors]
+        if not pending:
+            return
+        if not CACHE_ENABLED:
+            self._spool_dir()  # Create once, before worker threads race for it
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(url, pool.submit(self._download, url)) for url in pending]
+            for url, fut in futures:
+                try:
+                    self._local[url] = fut.result()
+                except Exception as e:
+                    self._errors[url] = e
+
+    def rows(self, url: str) -> Iterator[dict]:
+        """Stream row dicts for url, downloading it on first use."""
+        return iter_csv_file(*self._ensure(url))
+
+    def records(self, url: str) -> Iterator[list[str]]:
+        """Stream the header then raw row lists for url, downloading it on first use."""
+        return iter_csv_records(*self._ensure(url))
+
+    def local_copy(self, url: str) -> tuple[Path, str] | None:
+        """(path, encoding) of url's downloaded body, if it was fetched this run."""
+        return self._local.get(url)
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.cleanup()
+            self._spool = None
 
 
 def enrich_contact_info(name: str | None, business_name: str | None) -> str:
@@ -93,240 +685,887 @@ def enrich_contact_info(name: str | None, business_name: str | None) -> str:
     return ""
 
 
-# --- Priority 1: Tier 3 STRO in Pacific Beach / Mission Beach ---
-def fetch_stro_priority1() -> list[dict]:
-    """Tier 3 STRO owners in Pacific Beach and Mission Beach (Jan 28 tax proposal)."""
-    rows = fetch_csv(URL_STRO)
-    leads = []
-    for row in rows:
-        tier = (row.get("tier") or "").strip()
-        zip_ = (row.get("zip") or "").strip()
-        if tier != TIER_3:
-            continue
-        if zip_ != ZIP_PACIFIC_BEACH:
-            continue
-        name = (row.get("host_contact_name") or row.get("local_contact_contact_name") or "").strip()
-        address = (row.get("address") or "").strip()
-        if not address:
+# --- Lead rule engine: one scan per dataset, every rule tested on each row ---
+# Candidate source columns per canonical field; the first non-empty value wins.
+DATASET_COLUMNS: dict[str, dict[str, tuple[str, ...]]] = {
+    "stro": {
+        "key": ("license_id", "stro_license_id", "id"),
+        "name": ("host_contact_name", "local_contact_contact_name"),
+        "address": ("address",),
+        "zip": ("zip",),
+        "tier": ("tier",),
+        "lat": ("latitude", "lat"),
+        "lon": ("longitude", "lng", "lon"),
+    },
+    "rubt": {
+        "key": ("account_key", "account_id", "account_number"),
+        "name": ("business_name", "owner", "account_name"),
+        "address": ("address", "street_address", "property_address"),
+        "zip": ("zip", "zip_code"),
+        "lat": ("latitude", "lat"),
+        "lon": ("longitude", "lng", "lon"),
+    },
+    "permits_closed": {
+        "key": ("APPROVAL_ID", "PROJECT_ID", "approval_id", "project_id"),
+        "name": ("APPROVAL_PERMIT_HOLDER", "applicant", "owner", "contact_name"),
+        "address": ("ADDRESS_JOB", "address", "project_address", "street_address", "addr"),
+        "zip": ("zip", "zip_code"),
+    },
+}
+# Seshat permits: PROJECT_TITLE, APPROVAL_TYPE, JOB_BC_CODE_DESCRIPTION, etc.
+PERMIT_DESC_COLUMNS = (
+    "description", "record_type", "type", "project_type", "work_description",
+    "PROJECT_TITLE", "PROJECT_SCOPE", "APPROVAL_TYPE", "JOB_BC_CODE_DESCRIPTION",
+)
+DATASET_ORDER = ("stro", "rubt", "permits_closed")
+RUBT_LANDLORD_SAMPLE = 200
+
+
+def dataset_url(dataset: str) -> str:
+    return {"stro": URL_STRO, "rubt": URL_RUBT, "permits_closed": URL_PERMITS_CLOSED}[dataset]
+
+
+@dataclass(frozen=True)
+class LeadRule:
+    """A lead filter: a predicate over the normalized row view of one dataset, emitting into its own bucket."""
+
+    bucket: str
+    dataset: str
+    lead_type: str
+    match: Callable[[dict], object]  # Truthy accepts the row; a str result is kept as the lead's Match tag
+    zone: Callable[[dict], str]
+    business_contact: bool = False  # Name doubles as business name for contact enrichment
+    dedupe: bool = False            # Drop repeated addresses within the bucket
+    max_rows: int | None = None     # Only consider the first N rows of the dataset
+    ckan_filters: dict | None = None  # Server-side prefilter (a superset of match) when run alone against CKAN
+    vector_match: Callable[[dict], object] | None = None  # Columnar prefilter (a superset of match; may return None); see run_rules_columnar
+    spatial: bool = False  # Matches on TPA polygons when loaded, so ckan_filters (zip based) are not pushed down
+
+
+def compile_row_view(header: list[str], dataset: str) -> Callable[[list[str]], dict]:
+    """
+    Resolve DATASET_COLUMNS against this file's header once, into fixed column indices.
+    Returns an accessor mapping a raw row list to the normalized view shared by every rule
+    (first non-empty candidate wins, as in the old .get(...) or .get(...) chains).
+    """
+    pos = {name: i for i, name in enumerate(header)}
+    fields = [
+        (field, tuple(pos[col] for col in cols if col in pos))
+        for field, cols in DATASET_COLUMNS[dataset].items()
+    ]
+    desc_idx = (
+        tuple(i for name, i in pos.items() if name in PERMIT_DESC_COLUMNS)
+        if dataset == "permits_closed" else None
+    )
+    width = len(header)
+
+    def view(row: list[str]) -> dict:
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        v = {}
+        for field, idxs in fields:
+            value = ""
+            for i in idxs:
+                if row[i]:
+                    value = row[i]
+                    break
+            v[field] = value.strip()
+        if desc_idx is not None:
+            v["desc"] = " ".join(row[i].lower() for i in desc_idx if row[i])
+        return v
+
+    return view
+
+
+def _dataset_fields(dataset: str) -> list[str]:
+    """Every source column the rules can read for a dataset (CKAN field projection)."""
+    cols = [col for cands in DATASET_COLUMNS[dataset].values() for col in cands]
+    if dataset == "permits_closed":
+        cols.extend(PERMIT_DESC_COLUMNS)
+    return list(dict.fromkeys(cols))
+
+
+def dataset_records(registry: DatasetRegistry, dataset: str, rules: list[LeadRule]) -> Iterator[list[str]]:
+    """
+    Header then raw rows for a dataset: from CKAN datastore_search when a resource id is
+    configured, else the CSV export. A lone rule's ckan_filters are pushed server-side.
+    """
+    resource_id = CKAN_RESOURCE_IDS.get(dataset)
+    if resource_id:
+        filters = rules[0].ckan_filters if len(rules) == 1 and not (rules[0].spatial and tpa_index()) else None
+        return iter_ckan_table(resource_id, filters=filters, fields=_dataset_fields(dataset))
+    return registry.records(dataset_url(dataset))
+
+
+def _make_lead(rule: LeadRule, view: dict, matched: object) -> dict:
+    name = view["name"]
+    lead = {
+        "Name": name or "Unknown",
+        "Address": view["address"],
+        "Zone": rule.zone(view),
+        "Lead_Type": rule.lead_type,
+        "Email": enrich_contact_info(name, name if rule.business_contact else None),
+        "Status": "New",
+        "Zip": view.get("zip", "")[:5],  # In-memory, for fuzzy dedupe blocking; not a CSV column
+    }
+    if isinstance(matched, str):
+        lead["Match"] = matched  # In-memory tag only; not a leads_crm.csv column
+    return lead
+
+
+def _digest64(data: bytes, salt: bytes = b"") -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8, key=salt).digest(), "little")
+
+
+def _sorted_contains(arr: array, value: int) -> bool:
+    i = bisect_left(arr, value)
+    return i < len(arr) and arr[i] == value
+
+
+def _code_fingerprint(fn: object) -> str:
+    """Bytecode, constants and names of a rule callable (nested code objects included, without addresses)."""
+    code = getattr(fn, "__code__", fn)
+    if not hasattr(code, "co_code"):
+        return repr(fn)
+    consts = [_code_fingerprint(c) if hasattr(c, "co_code") else repr(c) for c in code.co_consts]
+    return f"{code.co_name}:{code.co_code.hex()}:{consts}:{code.co_names}"
+
+
+def rules_fingerprint(rules: Iterable[LeadRule], dataset: str) -> bytes:
+    """
+    Digest of everything that decides which rows of dataset become leads: its column map, the
+    rule definitions (callables by bytecode), the zone / keyword parameters they read, and the
+    TPA polygon file (size + mtime) for spatial rules.
+    """
+    ds_rules = [rule for rule in rules if rule.dataset == dataset]
+    parts = [
+        repr(sorted(DATASET_COLUMNS.get(dataset, {}).items())),
+        repr((TIER_3, TIER_4, ZIP_PACIFIC_BEACH, sorted(TPA_ZIPS), ADU_KEYWORDS)),
+    ]
+    for rule in ds_rules:
+        parts.append(repr([(name, _code_fingerprint(v) if callable(v) else repr(v)) for name, v in vars(rule).items()]))
+    if any(rule.spatial for rule in ds_rules):
+        try:
+            st = TPA_GEOJSON.stat()
+            parts.append(f"tpa:{TPA_GEOJSON}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("tpa:none")
+    return hashlib.blake2b("\x1e".join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+class DatasetWatermark:
+    """
+    Row-hash watermark for one dataset, persisted between runs as sorted uint64 digest arrays
+    (8 bytes per row). A row whose content digest was seen last run is unchanged and skipped;
+    a changed row is an update if its identity key (id column, else address) was seen before,
+    otherwise an insert.
+    """
+
+    def __init__(self, dataset: str, reset: bool = False):
+        self.dataset = dataset
+        self._prev_rows = array("Q") if reset else self._load("rows")
+        self._prev_keys = array("Q") if reset else self._load("keys")
+        self._rows = array("Q")
+        self._keys = array("Q")
+        self._salt = b""
+        self.inserted = self.updated = self.unchanged = 0
+        self.complete = False  # Set once the whole dataset was scanned; only then is the watermark saved
+
+    def _path(self, kind: str) -> Path:
+        return WATERMARK_DIR / f"{self.dataset}.{kind}.bin"
+
+    def _load(self, kind: str) -> array:
+        arr = array("Q")
+        path = self._path(kind)
+        if path.exists():
+            arr.frombytes(path.read_bytes())
+        return arr
+
+    def begin(self, header: list[str], rules: Iterable[LeadRule] = ()) -> None:
+        """
+        Salt row digests with the header and the rules' fingerprint, so a schema change or a rule
+        change (new TPA_ZIPS, ADU keywords, TPA polygons, ...) reads as every row changed.
+        """
+        salt = "\x1f".join(header).encode("utf-8") + rules_fingerprint(rules, self.dataset)
+        self._salt = hashlib.blake2b(salt, digest_size=16).digest()
+
+    def is_changed(self, row: list[str]) -> bool:
+        digest = _digest64("\x1f".join(row).encode("utf-8", "replace"), self._salt)
+        self._rows.append(digest)
+        if _sorted_contains(self._prev_rows, digest):
+            self.unchanged += 1
+            return False
+        return True
+
+    def record_change(self, key: str) -> str:
+        """Classify a changed row by identity key; returns "insert" or "update"."""
+        digest = _digest64(key.strip().lower().encode("utf-8"))
+        self._keys.append(digest)
+        if _sorted_contains(self._prev_keys, digest):
+            self.updated += 1
+            return "update"
+        self.inserted += 1
+        return "insert"
+
+    def save(self) -> None:
+        if not self.complete:
+            return
+        WATERMARK_DIR.mkdir(parents=True, exist_ok=True)
+        rows = array("Q", sorted(set(self._rows)))
+        keys = array("Q", sorted(set(self._prev_keys).union(self._keys)))
+        for kind, arr in (("rows", rows), ("keys", keys)):
+            path = self._path(kind)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(arr.tobytes())
+            os.replace(tmp, path)
+
+
+def run_rules(
+    registry: DatasetRegistry,
+    rules: Iterable[LeadRule],
+    watermarks: dict[str, DatasetWatermark] | None = None,
+) -> dict[str, list[dict]]:
+    """
+    Scan each dataset once and test every rule registered for it on that pass.
+    With watermarks, rows unchanged since the last run are skipped before any rule runs.
+    Returns {bucket: leads}; a dataset that fails to download leaves its buckets empty.
+    Reports parse time (producing rows; includes CKAN page fetches) and filter time (everything else) separately.
+    """
+    report = current()
+    rules = list(rules)
+    buckets: dict[str, list[dict]] = {rule.bucket: [] for rule in rules}
+    seen: dict[str, set[str]] = {rule.bucket: set() for rule in rules if rule.dedupe}
+    for dataset in DATASET_ORDER:
+        ds_rules = [rule for rule in rules if rule.dataset == dataset]
+        if not ds_rules:
             continue
-        leads.append({
-            "Name": name or "Unknown",
-            "Address": address,
-            "Zone": "Pacific Beach / Mission Beach",
-            "Lead_Type": "STRO_Tier3_Jan28_Tax",
-            "Email": enrich_contact_info(name, None),
-            "Status": "New",
-        })
-    return leads
-
-
-# --- Priority 2: TPA property owners ---
-def fetch_tpa_leads() -> list[dict]:
-    """Property owners in Transit Priority Areas (2026 LDC density amendments)."""
-    stro_rows = fetch_csv(URL_STRO)
-    rubt_rows = []
+        records = None
+        matched_rows = unchanged_rows = 0
+        try:
+            records = TimedIter(dataset_records(registry, dataset, ds_rules))
+            t0 = time.perf_counter()  # CSV download (fetch stage) already done by dataset_records
+            header = next(records, None)
+            if header is None:
+                continue
+            view_of = compile_row_view(header, dataset)
+            watermark = (watermarks or {}).get(dataset)
+            if watermark is not None:
+                watermark.begin(header, ds_rules)
+            for i, row in enumerate(records):
+                if watermark is not None and not watermark.is_changed(row):
+                    unchanged_rows += 1
+                    continue
+                view = view_of(row)
+                if watermark is not None:
+                    watermark.record_change(view["key"] or view["address"])
+                if not view["address"]:
+                    continue
+                hit = False
+                for rule in ds_rules:
+                    if rule.max_rows is not None and i >= rule.max_rows:
+                        continue
+                    matched = rule.match(view)
+                    if not matched:
+                        continue
+                    hit = True
+                    if rule.dedupe:
+                        key = canonical_address(view["address"])
+                        if key in seen[rule.bucket]:
+                            continue
+                        seen[rule.bucket].add(key)
+                    buckets[rule.bucket].append(_make_lead(rule, view, matched))
+                matched_rows += hit
+            if watermark is not None:
+                watermark.complete = True
+        except Exception as e:
+            print(f"[lead_sniper] {dataset} scan skipped: {e}")
+        finally:
+            if records is not None:
+                report.add_time("parse", records.spent)
+                report.add_time("filter", time.perf_counter() - t0 - records.spent)
+                report.add("parse", "rows_scanned", max(records.n - 1, 0))  # Minus the header
+                report.add("filter", "rows_unchanged", unchanged_rows)
+                report.add("filter", "rows_matched", matched_rows)
+    return buckets
+
+
+# --- Columnar snapshot: rule columns as memory-mapped Arrow, filtered with whole-column kernels ---
+def _columnar_paths(dataset: str) -> tuple[Path, Path]:
+    return COLUMNAR_DIR / f"{dataset}.arrow", COLUMNAR_DIR / f"{dataset}.json"
+
+
+def write_columnar(dataset: str, path: Path, encoding: str = "utf-8", url: str = "") -> bool:
+    """
+    Convert a downloaded CSV (plain or .gz) to COLUMNAR_DIR/<dataset>.arrow: the columns the rules
+    read, all as strings, uncompressed so it can be memory-mapped. Skipped when the source file
+    and the rules' columns are unchanged since the last conversion. Returns True when a file was written.
+    """
+    if not HAS_PYARROW:
+        return False
+    stat = path.stat()
+    # Fields in the fingerprint too: a rule reading a new column (e.g. lat/lon) forces a rewrite
+    source = {"url": url, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "fields": sorted(_dataset_fields(dataset))}
+    arrow_path, meta_path = _columnar_paths(dataset)
     try:
-        rubt_rows = fetch_csv(URL_RUBT)
-    except Exception as e:
-        print(f"[lead_sniper] RUBT fetch skipped: {e}")
-    leads = []
-    seen = set()
-
-    for row in stro_rows:
-        zip_ = (row.get("zip") or "").strip()
-        if zip_ not in TPA_ZIPS:
-            continue
-        address = (row.get("address") or "").strip()
-        if not address or address in seen:
+        if arrow_path.exists() and json.loads(meta_path.read_text(encoding="utf-8")).get("source") == source:
+            return False
+    except (OSError, ValueError):
+        pass
+    header = next(iter_csv_records(path, encoding), None) or []
+    wanted = set(_dataset_fields(dataset))
+    cols = list(dict.fromkeys(c for c in header if c in wanted))  # Header order, as compile_row_view sees it
+    skipped = 0
+
+    def skip_row(row) -> str:
+        nonlocal skipped
+        skipped += 1
+        return "skip"
+
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(encoding=encoding),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=skip_row),
+        convert_options=pa_csv.ConvertOptions(include_columns=cols, column_types={c: pa.string() for c in cols}),
+    )
+    COLUMNAR_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = arrow_path.with_name(arrow_path.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, arrow_path)
+    _cache_write_meta(meta_path, {
+        "source": source,
+        "rows": table.num_rows,
+        "columns": cols,
+        "skipped_rows": skipped,
+        "written_at": time.time(),
+    })
+    if skipped:
+        print(f"[lead_sniper] {dataset}: {skipped} malformed rows left out of the columnar snapshot")
+    return True
+
+
+def save_columnar(registry: DatasetRegistry) -> int:
+    """Refresh the columnar snapshot from every CSV downloaded this run. Returns files written."""
+    written = 0
+    for dataset in DATASET_ORDER:
+        url = dataset_url(dataset)
+        local = registry.local_copy(url)
+        if local is None:
             continue
-        seen.add(address)
-        name = (row.get("host_contact_name") or row.get("local_contact_contact_name") or "").strip()
-        leads.append({
-            "Name": name or "Unknown",
-            "Address": address,
-            "Zone": f"TPA_{zip_}",
-            "Lead_Type": "STRO_TPA_LDC2026",
-            "Email": enrich_contact_info(name, None),
-            "Status": "New",
-        })
-
-    for row in rubt_rows:
-        zip_ = (row.get("zip") or row.get("zip_code") or "").strip()
-        if zip_ not in TPA_ZIPS:
+        try:
+            written += write_columnar(dataset, *local, url=url)
+        except Exception as e:  # Never fail a run over the analysis copy
+            print(f"[lead_sniper] {dataset} columnar snapshot skipped: {e}")
+    return written
+
+
+def load_columnar(dataset: str):
+    """The dataset's columnar snapshot as a zero-copy, memory-mapped pyarrow Table, or None."""
+    arrow_path, _ = _columnar_paths(dataset)
+    if not HAS_PYARROW or not arrow_path.exists():
+        return None
+    return pa.ipc.open_file(pa.memory_map(str(arrow_path), "r")).read_all()
+
+
+class ColumnarView(dict):
+    """
+    Vectorized compile_row_view over a pyarrow Table: each canonical field as one string column
+    (first non-empty candidate, stripped), plus the lowercased permit description for
+    permits_closed. Fields are computed on first access, so a prefilter pays only for the
+    columns it reads.
+    """
+
+    def __init__(self, table, dataset: str):
+        super().__init__()
+        self.table = table
+        self.dataset = dataset
+        self._names = set(table.column_names)
+
+    def fields(self) -> list[str]:
+        return list(DATASET_COLUMNS[self.dataset]) + (["desc"] if self.dataset == "permits_closed" else [])
+
+    def _nonempty(self, col: str):  # "" -> null, so coalesce / join skip it like the row view does
+        arr = self.table.column(col)
+        return pc.if_else(pc.equal(arr, ""), pa.scalar(None, pa.string()), arr)
+
+    def __missing__(self, field: str):
+        if field == "desc" and self.dataset == "permits_closed":
+            cols = [self._nonempty(c) for c in self.table.column_names if c in PERMIT_DESC_COLUMNS]
+            joined = pc.binary_join_element_wise(*cols, " ", null_handling="skip") if cols else None
+            arr = pc.utf8_lower(pc.fill_null(joined, "")) if cols else None
+        else:
+            cols = [self._nonempty(c) for c in DATASET_COLUMNS[self.dataset][field] if c in self._names]
+            first = (pc.coalesce(*cols) if len(cols) > 1 else cols[0]) if cols else None
+            arr = pc.utf8_trim_whitespace(pc.fill_null(first, "")) if cols else None
+        if arr is None:
+            arr = pa.nulls(self.table.num_rows, pa.string()).fill_null("")
+        self[field] = arr
+        return arr
+
+
+def run_rules_columnar(rules: Iterable[LeadRule], tables: dict | None = None) -> dict[str, list[dict]]:
+    """
+    run_rules over the columnar snapshot (tables, else load_columnar per dataset). Each rule's
+    vector_match narrows whole columns at once; only surviving rows are tested with the rule
+    itself, in row order, so the buckets are the same as run_rules on the same data.
+    """
+    rules = list(rules)
+    buckets: dict[str, list[dict]] = {rule.bucket: [] for rule in rules}
+    seen: dict[str, set[str]] = {rule.bucket: set() for rule in rules if rule.dedupe}
+    for dataset in DATASET_ORDER:
+        ds_rules = [rule for rule in rules if rule.dataset == dataset]
+        if not ds_rules:
             continue
-        address = (row.get("address") or row.get("street_address") or row.get("property_address") or "").strip()
-        if not address or address in seen:
+        table = tables.get(dataset) if tables is not None else load_columnar(dataset)
+        if table is None:
+            print(f"[lead_sniper] {dataset}: no columnar snapshot (run lead_sniper once with pyarrow installed)")
             continue
-        seen.add(address)
-        name = (row.get("business_name") or row.get("owner") or row.get("account_name") or "").strip()
-        leads.append({
-            "Name": name or "Unknown",
-            "Address": address,
-            "Zone": f"TPA_{zip_}",
-            "Lead_Type": "RUBT_TPA_LDC2026",
-            "Email": enrich_contact_info(name, name),
-            "Status": "New",
-        })
-
-    return leads
-
-
-# --- Priority 3: Completed ADU permits (condo-sale eligible) ---
-def fetch_adu_completed() -> list[dict]:
+        view = ColumnarView(table, dataset)
+        has_address = pc.not_equal(view["address"], "")
+        candidates: set[int] = set()
+        for rule in ds_rules:
+            prefilter = rule.vector_match(view) if rule.vector_match is not None else None
+            mask = has_address if prefilter is None else pc.and_(has_address, prefilter)
+            if rule.max_rows is not None:
+                mask = mask.slice(0, rule.max_rows)
+            candidates.update(pc.indices_nonzero(pc.fill_null(mask, False)).to_pylist())
+        order = sorted(candidates)
+        # Remaining fields are normalized for the surviving rows only
+        rows = ColumnarView(table.take(pa.array(order, pa.int64())), dataset)
+        cols = {field: rows[field].to_pylist() for field in rows.fields()}
+        for j, i in enumerate(order):
+            v = {field: values[j] for field, values in cols.items()}
+            for rule in ds_rules:
+                if rule.max_rows is not None and i >= rule.max_rows:
+                    continue
+                matched = rule.match(v)
+                if not matched:
+                    continue
+                if rule.dedupe:
+                    key = canonical_address(v["address"])
+                    if key in seen[rule.bucket]:
+                        continue
+                    seen[rule.bucket].add(key)
+                buckets[rule.bucket].append(_make_lead(rule, v, matched))
+        current().add("filter", "rows_scanned", table.num_rows)
+    return buckets
+
+
+def _tpa_vector_match(c: dict):
+    """Columnar prefilter for in_tpa: zip in TPA_ZIPS, or a point inside the TPA polygons' bounding box."""
+    by_zip = pc.is_in(c["zip"], value_set=pa.array(sorted(TPA_ZIPS)))
+    index = tpa_index()
+    if index is None:
+        return by_zip
+
+    def coord(field: str):
+        return pc.cast(pc.if_else(pc.equal(c[field], ""), pa.scalar(None, pa.string()), c[field]), pa.float64())
+
+    try:
+        lat, lon = coord("lat"), coord("lon")
+    except pa.ArrowInvalid:
+        return None  # Unparsable coordinates somewhere: no prefilter, every row gets the exact test
+    min_lon, min_lat, max_lon, max_lat = index.bbox
+    in_box = pc.and_(
+        pc.and_(pc.greater_equal(lat, min_lat), pc.less_equal(lat, max_lat)),
+        pc.and_(pc.greater_equal(lon, min_lon), pc.less_equal(lon, max_lon)),
+    )
+    return pc.or_(by_zip, pc.fill_null(in_box, False))
+
+
+# Priority 1: Tier 3 STRO in Pacific Beach / Mission Beach (Jan 28 tax proposal)
+RULE_STRO_TIER3 = LeadRule(
+    bucket="stro_tier3_pbmb",
+    dataset="stro",
+    lead_type="STRO_Tier3_Jan28_Tax",
+    match=lambda v: v["tier"] == TIER_3 and v["zip"] == ZIP_PACIFIC_BEACH,
+    zone=lambda v: "Pacific Beach / Mission Beach",
+    ckan_filters={"tier": TIER_3, "zip": ZIP_PACIFIC_BEACH},
+    vector_match=lambda c: pc.and_(pc.equal(c["tier"], TIER_3), pc.equal(c["zip"], ZIP_PACIFIC_BEACH)),
+)
+# Priority 2: property owners in Transit Priority Areas (2026 LDC density amendments); STRO and RUBT share a bucket
+RULE_STRO_TPA = LeadRule(
+    bucket="tpa",
+    dataset="stro",
+    lead_type="STRO_TPA_LDC2026",
+    match=in_tpa,
+    zone=lambda v: f"TPA_{v['zip']}",
+    dedupe=True,
+    ckan_filters={"zip": sorted(TPA_ZIPS)},
+    vector_match=_tpa_vector_match,
+    spatial=True,
+)
+RULE_RUBT_TPA = LeadRule(
+    bucket="tpa",
+    dataset="rubt",
+    lead_type="RUBT_TPA_LDC2026",
+    match=in_tpa,
+    zone=lambda v: f"TPA_{v['zip']}",
+    business_contact=True,
+    dedupe=True,
+    vector_match=_tpa_vector_match,
+    spatial=True,
+)
+# Priority 3: completed ADU permits — eligible for new condo-sale separate title laws
+# (closed permits = completed projects; active = in progress)
+RULE_ADU_COMPLETED = LeadRule(
+    bucket="adu_completed",
+    dataset="permits_closed",
+    lead_type="ADU_Completed_CondoSale",
+    match=lambda v: match_adu_keyword(v["desc"]),
+    zone=lambda v: v["zip"],
+    dedupe=True,
+    vector_match=lambda c: pc.match_substring_regex(c["desc"], ADU_KEYWORD_RE.pattern),
+)
+# Bonus: long-term landlords from Rental Unit Business Tax accounts (sample)
+RULE_RUBT_LANDLORD = LeadRule(
+    bucket="rubt_landlords",
+    dataset="rubt",
+    lead_type="RUBT_Landlord",
+    match=lambda v: True,
+    zone=lambda v: v["zip"],
+    business_contact=True,
+    max_rows=RUBT_LANDLORD_SAMPLE,
+)
+LEAD_RULES = (RULE_STRO_TIER3, RULE_STRO_TPA, RULE_RUBT_TPA, RULE_ADU_COMPLETED, RULE_RUBT_LANDLORD)
+
+# (label, bucket) in the order leads are deduped and appended
+PRIORITY_PASSES = (
+    ("Priority 1 (STRO Tier3 PB/MB)", "stro_tier3_pbmb"),
+    ("Priority 2 (TPA)", "tpa"),
+    ("Priority 3 (ADU Completed)", "adu_completed"),
+    ("RUBT landlords", "rubt_landlords"),
+)
+
+
+def fetch_stro_priority1(registry: DatasetRegistry | None = None) -> list[dict]:
+    """Tier 3 STRO owners in Pacific Beach and Mission Beach (Jan 28 tax proposal)."""
+    return run_rules(registry or DatasetRegistry(), [RULE_STRO_TIER3])[RULE_STRO_TIER3.bucket]
+
+
+def fetch_tpa_leads(registry: DatasetRegistry | None = None) -> list[dict]:
+    """Property owners in Transit Priority Areas (2026 LDC density amendments)."""
+    return run_rules(registry or DatasetRegistry(), [RULE_STRO_TPA, RULE_RUBT_TPA])["tpa"]
+
+
+def fetch_adu_completed(registry: DatasetRegistry | None = None) -> list[dict]:
     """Owners with completed ADU permits — eligible for new condo-sale separate title laws."""
-    leads = []
-    seen = set()
+    return run_rules(registry or DatasetRegistry(), [RULE_ADU_COMPLETED])[RULE_ADU_COMPLETED.bucket]
 
-    # Use closed permits (completed projects); active = in progress
-    for url in (URL_PERMITS_CLOSED,):
-        try:
-            rows = fetch_csv(url)
-        except Exception as e:
-            print(f"[lead_sniper] Permits fetch skipped ({url}): {e}")
-            continue
-        for row in rows:
-            # Seshat permits: PROJECT_TITLE, APPROVAL_TYPE, JOB_BC_CODE_DESCRIPTION, etc.
-            desc = " ".join(
-                str(v).lower() for k, v in row.items()
-                if v and k in (
-                    "description", "record_type", "type", "project_type", "work_description",
-                    "PROJECT_TITLE", "PROJECT_SCOPE", "APPROVAL_TYPE", "JOB_BC_CODE_DESCRIPTION",
-                )
-            )
-            if not any(k in desc for k in ADU_KEYWORDS):
-                continue
-            address = (
-                row.get("ADDRESS_JOB") or row.get("address") or row.get("project_address")
-                or row.get("street_address") or row.get("addr") or ""
-            ).strip()
-            if not address or address in seen:
-                continue
-            seen.add(address)
-            name = (
-                row.get("APPROVAL_PERMIT_HOLDER") or row.get("applicant") or row.get("owner")
-                or row.get("contact_name") or ""
-            ).strip()
-            leads.append({
-                "Name": name or "Unknown",
-                "Address": address,
-                "Zone": (row.get("zip") or row.get("zip_code") or "").strip(),
-                "Lead_Type": "ADU_Completed_CondoSale",
-                "Email": enrich_contact_info(name, None),
-                "Status": "New",
-            })
-
-    return leads
-
-
-# --- RUBT long-term landlords (bonus) ---
-def fetch_rubt_landlords(limit: int = 500) -> list[dict]:
+
+def fetch_rubt_landlords(limit: int = 500, registry: DatasetRegistry | None = None) -> list[dict]:
     """Long-term landlords from Rental Unit Business Tax accounts."""
-    try:
-        rows = fetch_csv(URL_RUBT)
-    except Exception as e:
-        print(f"[lead_sniper] RUBT fetch skipped: {e}")
-        return []
-    leads = []
-    for row in rows[:limit]:
-        address = (row.get("address") or row.get("street_address") or row.get("property_address") or "").strip()
-        if not address:
+    rule = replace(RULE_RUBT_LANDLORD, max_rows=limit)
+    return run_rules(registry or DatasetRegistry(), [rule])[rule.bucket]
+
+
+def load_existing_addresses(store: LeadStore | None = None) -> AddressIndex:
+    """Compact hash index (8 bytes/address) of canonical addresses already in the lead store."""
+    return (store or LeadStore(LEADS_DB, csv_path=OUTPUT_CSV)).addresses()
+
+
+def dedupe_leads(leads: list[dict], existing: AddressIndex | set[str]) -> list[dict]:
+    """Filter out leads already stored, comparing canonical addresses ("123 Main St" == "123 MAIN STREET #A")."""
+    return [l for l in leads if canonical_address(l.get("Address")) not in existing]
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A lead merged into an earlier (higher-priority) lead for the same property."""
+
+    kept: str
+    merged: str
+    lead_type: str
+    score: float
+
+
+def _token_similarity(a: list[str], b: list[str]) -> float:
+    """Soft Dice over tokens: each token scores its best match in the other list (exact 1.0, near-miss ratio)."""
+    if not a or not b:
+        return 0.0
+
+    def best(tok: str, others: list[str]) -> float:
+        if tok in others:
+            return 1.0
+        r = max(SequenceMatcher(None, tok, o).ratio() for o in others)
+        return r if r >= FUZZY_TOKEN_RATIO else 0.0
+
+    return (sum(best(t, b) for t in a) + sum(best(t, a) for t in b)) / (len(a) + len(b))
+
+
+def _name_tokens(name: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", (name or "").lower()) if t not in NAME_STOPWORDS]
+
+
+def lead_similarity(a: dict, b: dict) -> float:
+    """0..1 match score for two leads in the same block: street tokens, blended with owner name when both are known."""
+    street_a = canonical_address(a.get("Address")).split()[1:]
+    street_b = canonical_address(b.get("Address")).split()[1:]
+    score = _token_similarity(street_a, street_b)
+    names_a, names_b = _name_tokens(a.get("Name")), _name_tokens(b.get("Name"))
+    if names_a and names_b:
+        score = (1 - FUZZY_NAME_WEIGHT) * score + FUZZY_NAME_WEIGHT * _token_similarity(names_a, names_b)
+    return score
+
+
+def _block_key(lead: dict) -> tuple[str, str, str] | None:
+    """
+    Blocking key (zip, house number, street prefix): the first FUZZY_STREET_PREFIX characters of the
+    first street token after any directional. Leads without a house number are never fuzzy-merged.
+    """
+    tokens = canonical_address(lead.get("Address")).split()
+    if not tokens or not any(c.isdigit() for c in tokens[0]):
+        return None
+    street = [t for t in tokens[1:] if t not in _DIRECTIONAL_TOKENS] or [""]
+    return ((lead.get("Zip") or "")[:5], tokens[0], street[0][:FUZZY_STREET_PREFIX])
+
+
+def merge_duplicate_leads(leads: list[dict]) -> tuple[list[dict], list[FuzzyMatch]]:
+    """
+    Collapse leads for the same property across sources. Identical canonical addresses merge with
+    score 1.0; otherwise leads are blocked by zip + house number and compared only within a block
+    (near-linear). Leads without a zip (closed permits) are blocked by house number + street prefix
+    instead and compared with every lead in that block, whatever its zip. A lead scoring >=
+    FUZZY_MATCH_THRESHOLD against an earlier one is folded into it: Lead_Types joined with "+",
+    Name/Email filled if missing, and the lowest merge score kept as Match_Score. Input order is
+    priority order.
+    """
+    exact: dict[str, dict] = {}
+    zip_blocks: dict[tuple[str, str], list[dict]] = {}
+    street_blocks: dict[tuple[str, str], list[dict]] = {}  # Every lead, by (house number, street prefix)
+    zipless_blocks: dict[tuple[str, str], list[dict]] = {}  # The zipless subset of street_blocks
+    out: list[dict] = []
+    matches: list[FuzzyMatch] = []
+    for lead in leads:
+        address_key = canonical_address(lead.get("Address"))
+        key = _block_key(lead)
+        candidates: list[dict] = []
+        if key is not None:
+            zip_code, street_key = key[0], key[1:]
+            if zip_code:
+                candidates = zip_blocks.get((zip_code, key[1]), []) + zipless_blocks.get(street_key, [])
+            else:
+                candidates = street_blocks.get(street_key, [])
+        best, best_score = exact.get(address_key), 1.0
+        if best is None:
+            best_score = 0.0
+            for kept in candidates:
+                score = lead_similarity(kept, lead)
+                if score > best_score:
+                    best, best_score = kept, score
+        if best is None or best_score < FUZZY_MATCH_THRESHOLD:
+            lead = dict(lead)
+            out.append(lead)
+            exact[address_key] = lead
+            if key is not None:
+                street_blocks.setdefault(street_key, []).append(lead)
+                if zip_code:
+                    zip_blocks.setdefault((zip_code, key[1]), []).append(lead)
+                else:
+                    zipless_blocks.setdefault(street_key, []).append(lead)
             continue
-        name = (row.get("business_name") or row.get("owner") or row.get("account_name") or "").strip()
-        zip_ = (row.get("zip") or row.get("zip_code") or "").strip()
-        leads.append({
-            "Name": name or "Unknown",
-            "Address": address,
-            "Zone": zip_,
-            "Lead_Type": "RUBT_Landlord",
-            "Email": enrich_contact_info(name, name),
-            "Status": "New",
-        })
-    return leads
-
-
-def load_existing_addresses() -> set[str]:
-    """Load addresses already in leads_crm.csv to avoid duplicates."""
-    if not OUTPUT_CSV.exists():
-        return set()
-    addresses = set()
-    with open(OUTPUT_CSV, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            addr = (row.get("Address") or "").strip()
-            if addr:
-                addresses.add(addr.lower())
-    return addresses
-
-
-def dedupe_leads(leads: list[dict], existing: set[str]) -> list[dict]:
-    """Filter out leads already in CSV."""
-    return [l for l in leads if (l.get("Address") or "").strip().lower() not in existing]
+        types = best["Lead_Type"].split(LEAD_TYPE_SEP)
+        if lead["Lead_Type"] not in types:
+            best["Lead_Type"] = LEAD_TYPE_SEP.join(types + [lead["Lead_Type"]])
+        if best.get("Name") in ("", "Unknown") and lead.get("Name"):
+            best["Name"] = lead["Name"]
+        best["Email"] = best.get("Email") or lead.get("Email")
+        best["Match_Score"] = round(min(best.get("Match_Score", 1.0), best_score), 3)
+        matches.append(FuzzyMatch(best["Address"], lead["Address"], lead["Lead_Type"], round(best_score, 3)))
+    return out, matches
 
 
 def append_leads(leads: list[dict]) -> None:
-    """Append new leads to leads_crm.csv. Create file with headers if missing."""
+    """
+    Append new leads to leads_crm.csv. Create file with headers if missing.
+    Rows follow the existing header (an exported CSV carries the outreach tracking columns too).
+    """
     if not leads:
         return
-    file_exists = OUTPUT_CSV.exists()
-    with open(OUTPUT_CSV, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["Name", "Address", "Zone", "Lead_Type", "Email", "Status"])
-        if not file_exists:
-            writer.writeheader()
-        writer.writerows(leads)
+    fieldnames = ["Name", "Address", "Zone", "Lead_Type", "Email", "Status"]
+    with csv_lock(OUTPUT_CSV):  # Never interleave with a concurrent lead_store export (temp + rename)
+        file_exists = OUTPUT_CSV.exists() and OUTPUT_CSV.stat().st_size > 0
+        if file_exists:
+            with open(OUTPUT_CSV, newline="", encoding="utf-8") as f:
+                fieldnames = next(csv.reader(f), None) or fieldnames
+        with open(OUTPUT_CSV, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+            if not file_exists:
+                writer.writeheader()
+            writer.writerows(leads)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def analyze_columnar(existing: AddressIndex) -> None:
+    """--analyze: every rule over the columnar snapshot, with per-pass lead counts (new vs already stored)."""
+    if not HAS_PYARROW:
+        print("[lead_sniper] --analyze needs pyarrow: pip install pyarrow")
+        return
+    report = current()
+    t0 = time.perf_counter()
+    with report.stage("filter"):
+        buckets = run_rules_columnar(LEAD_RULES)
+    candidates = []
+    with report.stage("dedupe"):
+        for label, bucket in PRIORITY_PASSES:
+            leads = buckets.get(bucket, [])
+            new = dedupe_leads(leads, existing)
+            candidates.extend(new)
+            print(f"[lead_sniper] {label}: {len(new)} new of {len(leads)}")
+        merged, matches = merge_duplicate_leads(candidates)
+    print(
+        f"[lead_sniper] Columnar analysis in {time.perf_counter() - t0:.2f}s: {len(merged)} new leads "
+        f"after merging {len(matches)} cross-source duplicates (nothing written)"
+    )
 
 
-def main() -> None:
-    """Run lead sniper: fetch, filter, dedupe, append to leads_crm.csv."""
+def main(argv: list[str] | None = None) -> None:
+    """Run lead sniper: fetch, filter, dedupe, insert into the lead store and append to leads_crm.csv (--replay: dry run)."""
+    parser = argparse.ArgumentParser(description="DoggyBagg Lead Sniper")
+    parser.add_argument(
+        "--concurrent", action="store_true",
+        default=os.environ.get("LEAD_SNIPER_CONCURRENT", "").strip() in ("1", "true"),
+        help="Download all datasets in parallel under the per-host rate limit",
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Ignore watermarks and scan every row (watermarks are rebuilt for the next run)",
+    )
+    parser.add_argument("--report", metavar="PATH", help="Run report path (default run_reports/lead_sniper-<time>.json)")
+    parser.add_argument("--profile", action="store_true", help="Also run under cProfile + tracemalloc (slower)")
+    parser.add_argument(
+        "--analyze", action="store_true",
+        help="Run the rules on the columnar snapshot of the last downloads and print counts; no network, nothing written",
+    )
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument(
+        "--record", nargs="?", const=str(SNAPSHOT_DIR), metavar="DIR",
+        help=f"Save every raw dataset response to a gzipped snapshot (default {SNAPSHOT_DIR.name}/)",
+    )
+    snapshot.add_argument(
+        "--replay", nargs="?", const=str(SNAPSHOT_DIR), metavar="DIR",
+        help="Dry run on a recorded snapshot: no network, full scan against an empty throwaway store, nothing written",
+    )
+    args = parser.parse_args(argv)
+    # Resolve user paths before moving to the repo root
+    for name in ("report", "record", "replay"):
+        if getattr(args, name):
+            setattr(args, name, Path(getattr(args, name)).resolve())
+
     os.chdir(BASE_DIR)
+    report = activate(RunReport("lead_sniper", profile=args.profile))
+    try:
+        with report.profiling():
+            run(args)
+    finally:
+        path = report.write(args.report)
+        print(f"[lead_sniper] Run report: {path}")
+        for line in report.summary().splitlines():
+            print(f"[lead_sniper]   {line}")
+
+
+def run(args: argparse.Namespace) -> None:
+    global SNAPSHOT
+    report = current()
     print("[lead_sniper] Starting DoggyBagg Lead Sniper")
+    SNAPSHOT = None
+    if args.record or args.replay:
+        try:
+            SNAPSHOT = HttpSnapshot(args.record or args.replay, "record" if args.record else "replay")
+        except FileNotFoundError as e:
+            print(f"[lead_sniper] {e}")
+            return
+        print(f"[lead_sniper] {'Recording' if args.record else 'Replaying'} snapshot: {SNAPSHOT.path}")
 
-    existing = load_existing_addresses()
+    replaying = SNAPSHOT is not None and SNAPSHOT.replaying
+    replay_dir = None
+    if replaying:
+        # Deterministic and offline-safe: every replay of a snapshot starts from the same empty
+        # store and a full scan, and leaves leads_crm.*, watermarks and the columnar snapshot alone
+        replay_dir = tempfile.TemporaryDirectory(prefix="lead_sniper_replay_")
+        store = LeadStore(Path(replay_dir.name) / "leads_crm.db", bootstrap=False)
+    else:
+        store = LeadStore(LEADS_DB, csv_path=OUTPUT_CSV)
+    existing = load_existing_addresses(store)
+    if args.analyze:
+        store.close()
+        analyze_columnar(existing)
+        if replay_dir is not None:
+            replay_dir.cleanup()
+        return
+    registry = DatasetRegistry()  # one download per dataset, shared by all passes
     all_new = []
 
-    # Priority 1: Tier 3 STRO in PB/Mission Beach
-    try:
-        p1 = fetch_stro_priority1()
-        p1_new = dedupe_leads(p1, existing)
-        for l in p1_new:
-            existing.add((l.get("Address") or "").strip().lower())
-        all_new.extend(p1_new)
-        print(f"[lead_sniper] Priority 1 (STRO Tier3 PB/MB): {len(p1_new)} new of {len(p1)}")
-    except Exception as e:
-        print(f"[lead_sniper] Priority 1 failed: {e}")
-
-    # Priority 2: TPA
-    try:
-        p2 = fetch_tpa_leads()
-        p2_new = dedupe_leads(p2, existing)
-        for l in p2_new:
-            existing.add((l.get("Address") or "").strip().lower())
-        all_new.extend(p2_new)
-        print(f"[lead_sniper] Priority 2 (TPA): {len(p2_new)} new of {len(p2)}")
-    except Exception as e:
-        print(f"[lead_sniper] Priority 2 failed: {e}")
-
-    # Priority 3: Completed ADU
-    try:
-        p3 = fetch_adu_completed()
-        p3_new = dedupe_leads(p3, existing)
-        for l in p3_new:
-            existing.add((l.get("Address") or "").strip().lower())
-        all_new.extend(p3_new)
-        print(f"[lead_sniper] Priority 3 (ADU Completed): {len(p3_new)} new of {len(p3)}")
-    except Exception as e:
-        print(f"[lead_sniper] Priority 3 failed: {e}")
-
-    # Bonus: RUBT landlords (sample)
-    try:
-        rubt = fetch_rubt_landlords(limit=200)
-        rubt_new = dedupe_leads(rubt, existing)
-        all_new.extend(rubt_new)
-        print(f"[lead_sniper] RUBT landlords: {len(rubt_new)} new of {len(rubt)}")
-    except Exception as e:
-        print(f"[lead_sniper] RUBT failed: {e}")
-
-    append_leads(all_new)
+    if args.concurrent:
+        t0 = time.monotonic()
+        registry.prefetch(
+            dataset_url(d) for d in DATASET_ORDER
+            if not CKAN_RESOURCE_IDS.get(d) and any(r.dataset == d for r in LEAD_RULES)
+        )
+        print(f"[lead_sniper] Concurrent fetch done in {time.monotonic() - t0:.1f}s")
+
+    # Incremental unless asked for a full scan or there is no CRM to be incremental against
+    incremental = not args.full and not replaying and store.count() > 0
+    watermarks = {d: DatasetWatermark(d, reset=not incremental) for d in DATASET_ORDER}
+    print(f"[lead_sniper] Mode: {'incremental' if incremental else 'full scan'}")
+
+    # Single pass per dataset; every rule fills its own bucket
+    buckets = run_rules(registry, LEAD_RULES, watermarks)
+    for wm in watermarks.values():
+        if wm.complete:
+            print(
+                f"[lead_sniper] {wm.dataset}: {wm.inserted} inserted, {wm.updated} updated, "
+                f"{wm.unchanged} unchanged (skipped)"
+            )
+    candidates = []
+    dedupe_t0 = time.perf_counter()
+    for label, bucket in PRIORITY_PASSES:
+        leads = buckets.get(bucket, [])
+        new = dedupe_leads(leads, existing)
+        candidates.extend(new)
+        print(f"[lead_sniper] {label}: {len(new)} new of {len(leads)}")
+        tags = Counter(l["Match"] for l in new if l.get("Match"))
+        if tags:
+            print(f"[lead_sniper]   matched by: {', '.join(f'{k}={n}' for k, n in tags.most_common())}")
+
+    # Same property from several sources/passes -> one lead carrying every Lead_Type
+    all_new, matches = merge_duplicate_leads(candidates)
+    report.add_time("dedupe", time.perf_counter() - dedupe_t0)
+    report.add("dedupe", "candidates", len(candidates))
+    report.add("dedupe", "merged", len(matches))
+    report.add("dedupe", "new_leads", len(all_new))
+    if matches:
+        fuzzy = [m for m in matches if m.score < 1.0]
+        print(
+            f"[lead_sniper] Merged {len(matches)} duplicate leads across sources "
+            f"({len(fuzzy)} fuzzy, score >= {FUZZY_MATCH_THRESHOLD})"
+        )
+        for m in sorted(fuzzy, key=lambda m: m.score)[:5]:
+            print(f"[lead_sniper]   {m.score:.2f}  {m.merged!r} -> {m.kept!r} ({m.lead_type})")
+
+    if replaying:
+        registry.close()
+        store.close()
+        replay_dir.cleanup()
+        print(f"[lead_sniper] Replay done: {len(all_new)} new leads against an empty store (nothing written)")
+        return
+    if COLUMNAR_ENABLED:
+        with report.stage("columnar"):
+            report.add("columnar", "datasets_written", save_columnar(registry))
+    registry.close()
+    with report.stage("append"):
+        store.insert_leads(all_new)
+        append_leads(all_new)
+        if all_new:
+            store.mark_csv_synced(OUTPUT_CSV)  # The appended rows are the ones just stored
+        store.close()
+    report.add("append", "rows_written", len(all_new))
+    for wm in watermarks.values():
+        wm.save()  # Only after the leads are on disk, so a crash never skips unprocessed rows
     print(f"[lead_sniper] Done. Appended {len(all_new)} new leads to {OUTPUT_CSV}")
+    if SNAPSHOT is not None:
+        print(f"[lead_sniper] Snapshot: {SNAPSHOT.summary()} in {SNAPSHOT.path}")
 
 
 if __name__ == "__main__":
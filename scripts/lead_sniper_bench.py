@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Lead Sniper Bench — micro-benchmarks for the lead_sniper.py filter pipeline.
+
+No network: inputs are synthetic and generated in-process. The pipeline benchmark writes
+Seshat-shaped STRO / RUBT / closed-permit CSVs, serves them from a local HTTP server and
+runs the real fetch_*, dedupe_leads and append_leads against them; each run is appended to
+bench_results/lead_sniper_bench.jsonl and compared with the previous run at the same size, or,
+on a host with no previous run, with the committed reference run in lead_sniper_bench_baseline.jsonl.
+
+Usage:
+  python scripts/lead_sniper_bench.py adu-matcher [--rows 200000] [--repeat 5]
+  python scripts/lead_sniper_bench.py address-index [--rows 1000000] [--lookups 200000]
+  python scripts/lead_sniper_bench.py tpa-index [--polygons 300] [--points 200000]
+  python scripts/lead_sniper_bench.py pipeline [--sizes 10000 100000 1000000] [--no-save] [--save-baseline]
+  python scripts/lead_sniper_bench.py columnar [--rows 1000000] [--repeat 3]   (needs pyarrow)
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import http.server
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource  # Unix only: process max RSS in the pipeline summary
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import lead_sniper  # noqa: E402
+from lead_store import AddressIndex, LeadStore, address_hash, canonical_address, key_hash  # noqa: E402
+from tpa_index import PreparedPolygon, TpaIndex  # noqa: E402
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BENCH_RESULTS = BASE_DIR / "bench_results" / "lead_sniper_bench.jsonl"
+BENCH_BASELINE = Path(__file__).resolve().parent / "lead_sniper_bench_baseline.jsonl"  # Committed reference run
+PIPELINE_SIZES = (10_000, 100_000, 1_000_000)
+REGRESSION_PCT = 15  # Flag a stage this much slower than the previous run at the same size
+
+# Permit description fragments (PROJECT_TITLE / APPROVAL_TYPE / JOB_BC_CODE_DESCRIPTION style)
+DESC_FRAGMENTS = (
+    "building permit", "combination permit", "kitchen remodel", "bathroom remodel",
+    "single family dwelling", "roof replacement", "photovoltaic system", "electrical service upgrade",
+    "new accessory dwelling unit", "junior adu conversion", "garage conversion to adu",
+    "detached secondary unit", "retaining wall", "pool and spa", "no plan check",
+)
+
+
+STREET_NAMES = (
+    "Mission", "Garnet", "Grand", "Ingraham", "Cass", "Felspar", "Hornblend", "Law", "Reed", "Diamond",
+    "Loring", "Thomas", "Beryl", "Turquoise", "Chalcedony", "Oliver", "Pacific Beach", "Bayard",
+)
+STREET_SUFFIXES = ("Street", "St", "Avenue", "Ave.", "Boulevard", "Blvd", "Drive", "Court", "Place", "Way")
+UNIT_FORMS = ("", "", "", " #A", " Apt 2", " Unit 101", " Suite 200")
+
+
+def synthetic_addresses(rows: int, seed: int = 7) -> list[str]:
+    """Distinct street addresses in mixed raw formats (case, suffix spelling, unit, punctuation)."""
+    rnd = random.Random(seed)
+    per_street = rows // (len(STREET_NAMES) * len(STREET_SUFFIXES)) + 1
+    out = []
+    for name in STREET_NAMES:
+        for suffix in STREET_SUFFIXES:
+            for n in range(per_street):
+                addr = f"{100 + n} {name} {suffix}{rnd.choice(UNIT_FORMS)}"
+                out.append(addr.upper() if rnd.random() < 0.3 else addr)
+    rnd.shuffle(out)
+    return out[:rows]
+
+
+# --- Synthetic Seshat datasets (column names as in the seshat.datasd.org exports) ---
+STRO_COLUMNS = (
+    "license_id", "address", "street_number", "street_name", "unit_number", "city", "state", "zip",
+    "council_district", "tier", "date_expiration", "rtax_no", "tot_no", "host_contact_name",
+    "local_contact_contact_name", "local_contact_phone", "latitude", "longitude",
+)
+RUBT_COLUMNS = (
+    "account_key", "business_name", "dba_name", "address", "city", "state", "zip",
+    "date_account_creation", "rental_units",
+)
+PERMITS_COLUMNS = (
+    "PROJECT_ID", "PROJECT_TITLE", "PROJECT_SCOPE", "PROJECT_STATUS", "APPROVAL_ID", "APPROVAL_TYPE",
+    "APPROVAL_STATUS", "DATE_APPROVAL_CLOSE", "ADDRESS_JOB", "JOB_APN", "JOB_BC_CODE",
+    "JOB_BC_CODE_DESCRIPTION", "APPROVAL_PERMIT_HOLDER", "LAT_JOB", "LNG_JOB",
+)
+# TPA zips, Pacific Beach and a few outside both, roughly as often as in the real exports
+SD_ZIPS = tuple(sorted(lead_sniper.TPA_ZIPS)) + ("92109",) * 4 + ("92037", "92106", "92107", "92119", "92120", "92130")
+STRO_TIERS = ("Tier 1", "Tier 2", "Tier 3", "Tier 3", "Tier 4")
+FIRST_NAMES = ("Maria", "James", "Linh", "David", "Sofia", "Robert", "Aisha", "Michael", "Elena", "Kevin")
+LAST_NAMES = ("Garcia", "Nguyen", "Smith", "Johnson", "Martinez", "Lee", "Brown", "Lopez", "Kim", "Davis")
+ADU_TITLES = ("New ADU", "Detached ADU", "Junior ADU conversion", "Garage conversion to accessory dwelling")
+OTHER_TITLES = ("Kitchen remodel", "Roof replacement", "PV system", "Electrical upgrade", "Pool and spa", "Retaining wall")
+SCOPE_FRAGMENTS = tuple(f for f in DESC_FRAGMENTS if not lead_sniper.match_adu_keyword(f))
+
+
+def _person(rnd: random.Random) -> str:
+    return f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+
+
+def _street(rnd: random.Random, pool: int) -> tuple[str, str]:
+    """(house number, street); a shared pool so the same property shows up across datasets."""
+    return str(100 + rnd.randrange(pool)), f"{rnd.choice(STREET_NAMES)} {rnd.choice(STREET_SUFFIXES)}"
+
+
+def write_synthetic_datasets(out_dir: Path, rows: int, seed: int = 11) -> dict[str, Path]:
+    """Write stro.csv, rubt.csv and permits_closed.csv with `rows` data rows each. Returns {dataset: path}."""
+    rnd = random.Random(seed)
+    pool = max(rows // 20, 50)
+    paths = {}
+
+    def write(name: str, columns: tuple[str, ...], make_row) -> None:
+        path = out_dir / f"{name}.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(columns)
+            w.writerows(make_row(i) for i in range(rows))
+        paths[name] = path
+
+    def stro_row(i: int) -> list:
+        num, street = _street(rnd, pool)
+        zip_code = rnd.choice(SD_ZIPS)
+        host = _person(rnd)
+        return [
+            f"STR-{i:07d}L", f"{num} {street}", num, street, rnd.choice(UNIT_FORMS).strip(" #"), "SAN DIEGO", "CA",
+            zip_code, rnd.randint(1, 9), rnd.choice(STRO_TIERS), "2026-06-30", f"R{i:07d}", f"T{i:07d}",
+            host, host if rnd.random() < 0.5 else _person(rnd), "619-555-0100",
+            f"{32.70 + rnd.random() * 0.2:.6f}", f"{-117.25 + rnd.random() * 0.2:.6f}",
+        ]
+
+    def rubt_row(i: int) -> list:
+        num, street = _street(rnd, pool)
+        owner = _person(rnd)
+        business = f"{owner} Properties LLC" if rnd.random() < 0.4 else owner
+        return [
+            f"{1_000_000 + i}", business, "", f"{num} {street}", "SAN DIEGO", "CA", rnd.choice(SD_ZIPS),
+            f"20{rnd.randint(5, 25):02d}-0{rnd.randint(1, 9)}-15", rnd.randint(1, 12),
+        ]
+
+    def permit_row(i: int) -> list:
+        num, street = _street(rnd, pool)
+        adu = rnd.random() < 0.1
+        title = rnd.choice(ADU_TITLES if adu else OTHER_TITLES)
+        return [
+            f"PRJ-{i // 2:07d}", title, " ".join(rnd.sample(SCOPE_FRAGMENTS, 2)), "Closed", f"{3_000_000 + i}",
+            rnd.choice(("Building Permit", "Combination Permit", "No-Plan Permit")), "Closed",
+            f"202{rnd.randint(0, 5)}-0{rnd.randint(1, 9)}-01", f"{num} {street}", f"{rnd.randint(100, 999)}-010-01-00",
+            "4341", "accessory dwelling unit" if adu else "single family dwelling", _person(rnd),
+            f"{32.70 + rnd.random() * 0.2:.6f}", f"{-117.25 + rnd.random() * 0.2:.6f}",
+        ]
+
+    write("stro", STRO_COLUMNS, stro_row)
+    write("rubt", RUBT_COLUMNS, rubt_row)
+    write("permits_closed", PERMITS_COLUMNS, permit_row)
+    return paths
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve_directory(directory: Path) -> tuple[http.server.ThreadingHTTPServer, str]:
+    """Local stand-in for seshat.datasd.org: a threaded static file server. Returns (server, base url)."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _traced(fn):
+    """Run fn, return (result, peak bytes allocated during the call)."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def synthetic_descs(rows: int, seed: int = 42) -> list[str]:
+    rnd = random.Random(seed)
+    return [" ".join(rnd.sample(DESC_FRAGMENTS, rnd.randint(2, 4))) for _ in range(rows)]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_adu_matcher(rows: int, repeat: int) -> None:
+    """Substring any() per keyword (previous approach) vs the combined ADU_KEYWORD_RE."""
+    descs = synthetic_descs(rows)
+    keywords = lead_sniper.ADU_KEYWORDS
+    match = lead_sniper.match_adu_keyword
+
+    def substring_any():
+        return sum(1 for d in descs if any(k in d for k in keywords))
+
+    def combined_regex():
+        return sum(1 for d in descs if match(d))
+
+    expected = substring_any()
+    got = combined_regex()
+    if got != expected:
+        raise SystemExit(f"Matcher mismatch: any()={expected} regex={got}")
+
+    t_any = _best_of(substring_any, repeat)
+    t_re = _best_of(combined_regex, repeat)
+    print(f"[bench] adu-matcher: {rows:,} descriptions, {got:,} matches (best of {repeat})")
+    print(f"[bench]   substring any(): {t_any * 1000:8.1f} ms  ({rows / t_any:,.0f} rows/s)")
+    print(f"[bench]   combined regex : {t_re * 1000:8.1f} ms  ({rows / t_re:,.0f} rows/s)  x{t_any / t_re:.2f}")
+
+
+def bench_address_index(rows: int, lookups: int) -> None:
+    """Set of canonical address strings vs the sorted 64-bit AddressIndex: memory and lookup time."""
+    raw = synthetic_addresses(rows)
+    t0 = time.perf_counter()
+    keys = [canonical_address(a) for a in raw]
+    t_canon = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    digests = [key_hash(k) for k in keys]
+    t_hash = time.perf_counter() - t0
+
+    # Fresh strings so the set's footprint includes the keys themselves, not just the hash table
+    str_set, set_bytes = _traced(lambda: {canonical_address(a) for a in raw})
+    # Load path used by lead_sniper: digests streamed off the store's unique index
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LeadStore(Path(tmp) / "bench.db", bootstrap=False)
+        with store.conn:
+            store.conn.executemany(
+                "INSERT OR IGNORE INTO leads (address_key, address_hash, created_at, updated_at) VALUES (?, ?, '', '')",
+                zip(keys, digests),
+            )
+        del digests
+        t0 = time.perf_counter()
+        index, index_bytes = _traced(lambda: AddressIndex.from_store(store))
+        t_load = time.perf_counter() - t0
+        store.close()
+
+    rnd = random.Random(1)
+    probes = [rnd.choice(raw) for _ in range(lookups // 2)] + [f"9{i} Nowhere Ln" for i in range(lookups // 2)]
+
+    t0 = time.perf_counter()
+    hits_set = sum(1 for p in probes if canonical_address(p) in str_set)
+    t_set = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits_index = sum(1 for p in probes if canonical_address(p) in index)
+    t_index = time.perf_counter() - t0
+    if hits_set != hits_index:
+        raise SystemExit(f"Lookup mismatch: set={hits_set} index={hits_index}")
+
+    print(f"[bench] address-index: {len(keys):,} addresses, {len(str_set):,} distinct canonical keys")
+    print(f"[bench]   canonicalize: {t_canon:6.2f} s  ({len(keys) / t_canon:,.0f} addr/s)")
+    print(f"[bench]   hash (64-bit): {t_hash:6.2f} s  ({len(keys) / t_hash:,.0f} addr/s)")
+    print(f"[bench]   memory: set[str] {set_bytes / 2**20:8.1f} MiB   AddressIndex {index.nbytes / 2**20:8.1f} MiB "
+          f"(peak load {index_bytes / 2**20:.1f} MiB, {t_load:.2f} s from store)")
+    print(f"[bench]   lookups ({len(probes):,}, {hits_index:,} hits): set[str] {t_set / len(probes) * 1e6:.2f} us/op   "
+          f"AddressIndex {t_index / len(probes) * 1e6:.2f} us/op")
+
+
+SD_BBOX = (-117.30, 32.55, -116.90, 33.10)  # lon/lat extent of the synthetic TPA polygons and points
+
+
+def synthetic_tpa_polygons(count: int, seed: int = 3) -> list[PreparedPolygon]:
+    """Irregular star-shaped polygons (8-400 vertices, every third with a hole) scattered over San Diego."""
+    rnd = random.Random(seed)
+
+    def ring(cx: float, cy: float, radius: float, vertices: int) -> list[tuple[float, float]]:
+        return [
+            (cx + radius * rnd.uniform(0.5, 1.5) * math.cos(a), cy + radius * rnd.uniform(0.5, 1.5) * math.sin(a))
+            for a in (2 * math.pi * i / vertices for i in range(vertices))
+        ]
+
+    polygons = []
+    for i in range(count):
+        cx, cy = rnd.uniform(SD_BBOX[0], SD_BBOX[2]), rnd.uniform(SD_BBOX[1], SD_BBOX[3])
+        radius = rnd.uniform(0.003, 0.012)  # Roughly a half-mile buffer around a stop
+        rings = [ring(cx, cy, radius, rnd.randint(8, 400))]
+        if i % 3 == 0:
+            rings.append(ring(cx, cy, radius / 8, 12))
+        polygons.append(PreparedPolygon(rings, f"tpa_{i}"))
+    return polygons
+
+
+def bench_tpa_index(count: int, points: int) -> None:
+    """Ray casting every polygon (bbox-checked) vs the TpaIndex grid over prepared polygons."""
+    polygons = synthetic_tpa_polygons(count)
+    t0 = time.perf_counter()
+    index = TpaIndex(polygons)
+    t_build = time.perf_counter() - t0
+    rnd = random.Random(5)
+    probes = [(rnd.uniform(SD_BBOX[0], SD_BBOX[2]), rnd.uniform(SD_BBOX[1], SD_BBOX[3])) for _ in range(points)]
+
+    def ray_cast(poly: PreparedPolygon, x: float, y: float) -> bool:
+        min_x, min_y, max_x, max_y = poly.bbox
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        inside = False
+        for x1, y1, x2, y2 in poly.edges:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    t0 = time.perf_counter()
+    expected = [any(ray_cast(p, x, y) for p in polygons) for x, y in probes]
+    t_scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = [index.contains(x, y) for x, y in probes]
+    t_index = time.perf_counter() - t0
+    if got != expected:
+        raise SystemExit(f"TPA mismatch on {sum(g != e for g, e in zip(got, expected)):,} points")
+
+    stats = index.stats()
+    print(f"[bench] tpa-index: {stats['polygons']:,} polygons, {stats['edges']:,} edges, "
+          f"{points:,} points ({sum(got):,} inside)")
+    print(f"[bench]   grid: {stats['cells_inside']:,} inside + {stats['cells_boundary']:,} boundary cells, "
+          f"built in {t_build * 1000:.0f} ms")
+    print(f"[bench]   ray cast, all polygons: {t_scan / points * 1e6:8.2f} us/point")
+    print(f"[bench]   TpaIndex             : {t_index / points * 1e6:8.2f} us/point  x{t_scan / t_index:.1f}")
+
+
+def _serve_synthetic(rows: int, tmp: Path) -> tuple[http.server.ThreadingHTTPServer, int]:
+    """Write the synthetic datasets under tmp and point lead_sniper at a local server for them (no pacing, no cache)."""
+    ls = lead_sniper
+    data_dir = tmp / "data"
+    data_dir.mkdir()
+    paths = write_synthetic_datasets(data_dir, rows)
+    server, base = serve_directory(data_dir)
+    ls.URL_STRO, ls.URL_RUBT = f"{base}/stro.csv", f"{base}/rubt.csv"
+    ls.URL_PERMITS_CLOSED = f"{base}/permits_closed.csv"
+    ls.RATE_LIMIT_PER_SEC, ls.RATE_LIMIT_BURST = 1e9, 1_000_000
+    ls.CACHE_ENABLED = False
+    return server, sum(p.stat().st_size for p in paths.values())
+
+
+def bench_columnar(rows: int, repeat: int) -> None:
+    """run_rules over the downloaded CSVs vs run_rules_columnar over the memory-mapped Arrow snapshot."""
+    ls = lead_sniper
+    if not ls.HAS_PYARROW:
+        raise SystemExit("pyarrow required: pip install pyarrow")
+    with tempfile.TemporaryDirectory(prefix="lead_sniper_bench_") as tmp:
+        tmp = Path(tmp)
+        server, csv_bytes = _serve_synthetic(rows, tmp)
+        ls.COLUMNAR_DIR = tmp / "columnar"
+        registry = ls.DatasetRegistry()
+        try:
+            registry.prefetch(ls.dataset_url(d) for d in ls.DATASET_ORDER)
+            t0 = time.perf_counter()
+            ls.save_columnar(registry)
+            t_convert = time.perf_counter() - t0
+            arrow_bytes = sum(p.stat().st_size for p in ls.COLUMNAR_DIR.glob("*.arrow"))
+            print(
+                f"[bench] columnar: {rows:,} rows per dataset; CSV {csv_bytes / 2**20:.1f} MiB -> "
+                f"Arrow {arrow_bytes / 2**20:.1f} MiB in {t_convert:.2f} s (best of {repeat})"
+            )
+            for label, rules in (("all rules", ls.LEAD_RULES), ("ADU permits", [ls.RULE_ADU_COMPLETED])):
+                expected = ls.run_rules(registry, rules)
+                got = ls.run_rules_columnar(rules)
+                if got != expected:
+                    raise SystemExit(f"Columnar mismatch ({label})")
+                t_csv = _best_of(lambda rules=rules: ls.run_rules(registry, rules), repeat)
+                t_col = _best_of(lambda rules=rules: ls.run_rules_columnar(rules), repeat)
+                n = sum(len(v) for v in got.values())
+                print(f"[bench]   {label:<12} CSV rows : {t_csv * 1000:9.1f} ms  ({n:,} leads)")
+                print(f"[bench]   {label:<12} columnar : {t_col * 1000:9.1f} ms  x{t_csv / t_col:.1f}")
+        finally:
+            registry.close()
+            server.shutdown()
+            server.server_close()
+
+
+def _git_commit() -> str:
+    """Short HEAD hash, with -dirty for uncommitted changes to tracked files; "unknown" outside git."""
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=30,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR, capture_output=True, text=True, timeout=30,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return (head or "unknown") + ("-dirty" if head and dirty else "")
+
+
+def _load_results(path: Path) -> list[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return []
+
+
+def _measure(fn, setup=None) -> tuple[object, float, int]:
+    """Time fn untraced, then run it again under tracemalloc for its peak. Returns (result, seconds, peak bytes)."""
+    if setup:
+        setup()
+    t0 = time.perf_counter()
+    result = fn()
+    sec = time.perf_counter() - t0
+    if setup:
+        setup()
+    _, peak = _traced(fn)
+    return result, sec, peak
+
+
+def _pipeline_stages(rows: int, csv_bytes: int, tmp: Path) -> list[tuple[str, int, int, float, int]]:
+    """Run each pipeline stage against the stand-in URLs. Returns (stage, rows in, bytes in, seconds, peak bytes)."""
+    ls = lead_sniper
+    urls = [ls.dataset_url(d) for d in ls.DATASET_ORDER]
+    stages = []
+
+    def download() -> None:
+        registry = ls.DatasetRegistry()
+        registry.prefetch(urls, workers=1)
+        for url in urls:
+            registry.rows(url)  # Raises the recorded error if a download failed
+        registry.close()
+
+    _, sec, peak = _measure(download)
+    stages.append(("download", 3 * rows, csv_bytes, sec, peak))
+
+    registry = ls.DatasetRegistry()
+    registry.prefetch(urls, workers=1)
+    try:
+        for fn, n in (
+            (ls.fetch_stro_priority1, rows),
+            (ls.fetch_tpa_leads, 2 * rows),
+            (ls.fetch_adu_completed, rows),
+        ):
+            _, sec, peak = _measure(lambda fn=fn: fn(registry))
+            stages.append((fn.__name__, n, 0, sec, peak))
+        buckets, sec, peak = _measure(lambda: ls.run_rules(registry, ls.LEAD_RULES))
+        stages.append(("run_rules (all rules)", 3 * rows, 0, sec, peak))
+    finally:
+        registry.close()
+
+    # Half the leads already stored, as on a typical incremental day
+    leads = [lead for _, bucket in ls.PRIORITY_PASSES for lead in buckets.get(bucket, [])]
+    existing = AddressIndex(address_hash(lead["Address"]) for lead in leads[::2])
+    new, sec, peak = _measure(lambda: ls.dedupe_leads(leads, existing))
+    stages.append(("dedupe_leads", len(leads), 0, sec, peak))
+
+    ls.OUTPUT_CSV = tmp / "leads_crm.csv"
+    _, sec, peak = _measure(lambda: ls.append_leads(new), setup=lambda: ls.OUTPUT_CSV.unlink(missing_ok=True))
+    stages.append(("append_leads", len(new), 0, sec, peak))
+    return stages
+
+
+def bench_pipeline(sizes: list[int], results_path: Path | None, save_baseline: bool = False) -> None:
+    """fetch_* / dedupe_leads / append_leads on synthetic datasets served over local HTTP: throughput and peak memory."""
+    commit = _git_commit()
+    host = platform.node()
+    history = _load_results(results_path) if results_path else []
+    baseline = _load_results(BENCH_BASELINE)
+    recorded_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    records = []
+    for rows in sizes:
+        with tempfile.TemporaryDirectory(prefix="lead_sniper_bench_") as tmp:
+            tmp = Path(tmp)
+            t0 = time.perf_counter()
+            # No pacing or disk cache against the stand-in: downloads spool to a per-run temp dir
+            server, csv_bytes = _serve_synthetic(rows, tmp)
+            print(
+                f"[bench] pipeline: {rows:,} rows per dataset, {csv_bytes / 2**20:.1f} MiB of CSV "
+                f"(generated in {time.perf_counter() - t0:.1f} s), commit {commit}"
+            )
+            try:
+                stages = _pipeline_stages(rows, csv_bytes, tmp)
+            finally:
+                server.shutdown()
+                server.server_close()
+        for stage, n, nbytes, sec, peak in stages:
+            prev = next(
+                (r for r in reversed(history) if r.get("rows") == rows and r.get("stage") == stage and r.get("host") == host),
+                None,
+            )
+            ref = prev or next((r for r in baseline if r.get("rows") == rows and r.get("stage") == stage), None)
+            note = ""
+            if ref and ref.get("sec"):
+                delta = (sec - ref["sec"]) / ref["sec"] * 100
+                note = f"  {delta:+5.0f}% vs {ref.get('commit', '?')}"
+                if ref is not prev:
+                    note += " (reference)"
+                if delta > REGRESSION_PCT and ref.get("host") == host:  # Other hardware: informational only
+                    note += "  << SLOWER"
+            mb_s = f"  {nbytes / 2**20 / sec:7.1f} MiB/s" if nbytes else ""
+            print(
+                f"[bench]   {stage:<22} {sec:8.3f} s  {n / sec if sec else 0:>12,.0f} rows/s  "
+                f"peak {peak / 2**20:7.1f} MiB{mb_s}{note}"
+            )
+            records.append({
+                "recorded_at": recorded_at, "commit": commit, "host": host, "python": platform.python_version(),
+                "rows": rows, "stage": stage, "items": n, "bytes": nbytes, "sec": round(sec, 6),
+                "rows_per_sec": round(n / sec, 1) if sec else None, "peak_bytes": peak,
+            })
+    if HAS_RESOURCE:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        print(f"[bench] process max RSS {rss / 2**20:.0f} MiB")
+    if results_path:
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(results_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+        print(f"[bench] {len(records)} results appended to {results_path}")
+    if save_baseline:
+        with open(BENCH_BASELINE, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+        print(f"[bench] Reference run saved to {BENCH_BASELINE} (commit it with the change it measures)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lead Sniper micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_adu = sub.add_parser("adu-matcher", help="ADU keyword matcher: substring any() vs combined regex")
+    p_adu.add_argument("--rows", type=int, default=200_000)
+    p_adu.add_argument("--repeat", type=int, default=5)
+    p_addr = sub.add_parser("address-index", help="Dedupe index: set of address strings vs 64-bit AddressIndex")
+    p_addr.add_argument("--rows", type=int, default=1_000_000)
+    p_addr.add_argument("--lookups", type=int, default=200_000)
+    p_tpa = sub.add_parser("tpa-index", help="TPA membership: ray casting every polygon vs the grid index")
+    p_tpa.add_argument("--polygons", type=int, default=300)
+    p_tpa.add_argument("--points", type=int, default=200_000)
+    p_col = sub.add_parser("columnar", help="Rule pass over CSV rows vs the Arrow columnar snapshot (needs pyarrow)")
+    p_col.add_argument("--rows", type=int, default=1_000_000)
+    p_col.add_argument("--repeat", type=int, default=3)
+    p_pipe = sub.add_parser("pipeline", help="fetch_* / dedupe / append on synthetic Seshat CSVs over local HTTP")
+    p_pipe.add_argument("--sizes", type=int, nargs="+", default=list(PIPELINE_SIZES), help="Rows per dataset")
+    p_pipe.add_argument("--results", default=str(BENCH_RESULTS), help="JSONL file the results are appended to")
+    p_pipe.add_argument("--no-save", action="store_true", help="Print only; do not append to the results file")
+    p_pipe.add_argument("--save-baseline", action="store_true", help=f"Also overwrite {BENCH_BASELINE.name} with this run")
+    args = parser.parse_args()
+
+    if args.command == "adu-matcher":
+        bench_adu_matcher(args.rows, args.repeat)
+    elif args.command == "address-index":
+        bench_address_index(args.rows, args.lookups)
+    elif args.command == "tpa-index":
+        bench_tpa_index(args.polygons, args.points)
+    elif args.command == "columnar":
+        bench_columnar(args.rows, args.repeat)
+    elif args.command == "pipeline":
+        bench_pipeline(args.sizes, None if args.no_save else Path(args.results), args.save_baseline)
+
+
+if __name__ == "__main__":
+    main()
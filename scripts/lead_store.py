@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Lead Store — SQLite backend for the DoggyBagg lead CRM (leads_crm.db).
+
+Shared by lead_sniper.py (inserts) and outreach_hunter.py (status updates).
+WAL mode, a unique index on the canonical-address hash and an index on (Status, Lead_Type):
+inserts, dedupe lookups and status changes touch only the affected rows, so runtime
+does not grow with the total lead count. leads_crm.csv stays available as an export
+for spreadsheets and the Next.js property pages (lib/leads.ts). Hand edits to its Name, Email
+and Status columns are synced back into the store whenever the file has changed since the
+last import/export (see LeadStore.sync_csv).
+
+Usage:
+  python scripts/lead_store.py export [--out leads_crm.csv]
+  python scripts/lead_store.py import [--csv leads_crm.csv]
+  python scripts/lead_store.py stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: no advisory locks; CSV writers must not overlap
+    HAS_FCNTL = False
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DB_PATH = BASE_DIR / "leads_crm.db"
+LEADS_CSV = BASE_DIR / "leads_crm.csv"
+
+BASE_FIELDS = ["Name", "Address", "Zone", "Lead_Type", "Email", "Status"]
+TRACKING_FIELDS = ["Contacted_Date", "Gmail_Thread_Id", "FollowUp_Sent_Date"]
+LEAD_FIELDS = BASE_FIELDS + TRACKING_FIELDS
+
+SCHEMA_VERSION = 4  # v2: canonical address_key + 64-bit address_hash dedupe index; v3/v4: re-key (unit designators)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    address_key TEXT NOT NULL,
+    address_hash INTEGER,
+    Name TEXT NOT NULL DEFAULT '',
+    Address TEXT NOT NULL DEFAULT '',
+    Zone TEXT NOT NULL DEFAULT '',
+    Lead_Type TEXT NOT NULL DEFAULT '',
+    Email TEXT NOT NULL DEFAULT '',
+    Status TEXT NOT NULL DEFAULT 'New',
+    Contacted_Date TEXT NOT NULL DEFAULT '',
+    Gmail_Thread_Id TEXT NOT NULL DEFAULT '',
+    FollowUp_Sent_Date TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_status_type ON leads (Status, Lead_Type);
+CREATE TABLE IF NOT EXISTS csv_sync (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+_ADDRESS_HASH_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_address_hash ON leads (address_hash)"
+
+# --- Address canonicalization (USPS Publication 28 abbreviations) ---
+STREET_SUFFIXES = {
+    "street": "st", "str": "st", "avenue": "ave", "av": "ave", "aven": "ave", "boulevard": "blvd",
+    "boul": "blvd", "drive": "dr", "drv": "dr", "road": "rd", "lane": "ln", "court": "ct",
+    "place": "pl", "terrace": "ter", "terr": "ter", "circle": "cir", "parkway": "pkwy", "pky": "pkwy",
+    "highway": "hwy", "square": "sq", "trail": "trl", "cove": "cv", "point": "pt", "alley": "aly",
+    "crossing": "xing", "heights": "hts", "way": "way", "walk": "walk", "row": "row", "mall": "mall",
+    "plaza": "plz", "loop": "loop", "glen": "gln", "ridge": "rdg", "view": "vw", "vista": "vis",
+    "canyon": "cyn", "creek": "crk", "mesa": "mesa", "expressway": "expy", "freeway": "fwy",
+}
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+# Secondary unit designators; the dedupe key is per property, so the unit is dropped.
+# Words like "lot" or "space" are also street names, so they only count after the street suffix.
+UNIT_DESIGNATORS = {
+    "#", "apt", "apartment", "unit", "ste", "suite", "spc", "space", "rm", "room",
+    "fl", "floor", "bldg", "building", "lot", "no", "trlr", "trailer",
+}
+# Unambiguous designators that also count as a unit at the very end of an address without a suffix
+# ("5 Via De La Valle Ste 200"), when followed by an identifier (a number or a single letter)
+TRAILING_UNIT_DESIGNATORS = {"apt", "apartment", "unit", "ste", "suite"}
+_SUFFIX_TOKENS = set(STREET_SUFFIXES) | set(STREET_SUFFIXES.values())
+_ADDRESS_PUNCT_RE = re.compile(r"[.,;:'\"()]")
+
+
+def _is_unit_id(tok: str) -> bool:
+    return any(c.isdigit() for c in tok) or (len(tok) == 1 and tok.isalpha())
+
+
+def canonical_address(address: str | None, keep_unit: bool = False) -> str:
+    """
+    Canonical form of a street address: lowercase, punctuation and extra whitespace removed,
+    suffixes and directionals abbreviated (USPS). A unit ("#A" anywhere after the house number;
+    "Apt 4", "Suite 200", "Lot 7" after the street suffix; "Apt 4", "Ste 200" as the last two
+    tokens of a street without a suffix) ends the key unless keep_unit, in which case it becomes
+    "unit <id>". "123 MAIN STREET #A" -> "123 main st", "55 W Lot St #3" -> "55 w lot st",
+    "5 Via De La Valle Ste 200" -> "5 via de la valle". Idempotent.
+    """
+    s = _ADDRESS_PUNCT_RE.sub(" ", (address or "").lower().replace("#", " # "))
+    tokens = s.split()
+    out = []
+    after_suffix = False
+    for i, tok in enumerate(tokens):
+        is_unit = i >= 1 and (
+            tok == "#"
+            or (after_suffix and tok in UNIT_DESIGNATORS and i + 1 < len(tokens) and tokens[i + 1] not in _SUFFIX_TOKENS)
+            or (i >= 2 and i == len(tokens) - 2 and tok in TRAILING_UNIT_DESIGNATORS and _is_unit_id(tokens[i + 1]))
+        )
+        if is_unit:
+            if keep_unit and i + 1 < len(tokens):
+                out.append("unit")
+                out.extend(t for t in tokens[i + 1:] if t not in UNIT_DESIGNATORS)
+            break
+        after_suffix = i >= 2 and tok in _SUFFIX_TOKENS
+        out.append(STREET_SUFFIXES.get(tok) or DIRECTIONALS.get(tok) or tok)
+    return " ".join(out)
+
+
+def key_hash(key: str) -> int:
+    """Signed 64-bit digest of an already canonical address key (fits SQLite INTEGER and array('q'))."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def address_hash(address: str | None) -> int:
+    """key_hash of the canonical form of a raw address."""
+    return key_hash(canonical_address(address))
+
+
+@contextmanager
+def csv_lock(csv_path: Path) -> Iterator[None]:
+    """
+    Exclusive advisory lock shared by every writer of csv_path (lead_sniper appends, exports).
+    Held on a sidecar .lock file, since an export replaces the CSV's inode.
+    """
+    if not HAS_FCNTL:
+        yield
+        return
+    lock_path = csv_path.with_name(csv_path.name + ".lock")
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _csv_signature(csv_path: Path) -> str:
+    st = csv_path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class AddressIndex:
+    """
+    Compact dedupe index: sorted 64-bit digests of canonical addresses in an array('q')
+    (8 bytes per address vs ~100+ for a set of strings), bisect lookups. add() keeps
+    addresses accepted this run in a small side set. Like a set of address_key strings,
+    `in` and add() take canonical keys (canonical_address output), which are hashed as is.
+    """
+
+    def __init__(self, digests: Iterable[int] = ()):
+        self._sorted = array("q", sorted(set(digests)))
+        self._pending: set[int] = set()
+
+    @classmethod
+    def from_store(cls, store: LeadStore) -> AddressIndex:
+        """Load digests straight off the unique index (already sorted, no re-hashing)."""
+        index = cls()
+        index._sorted = array(
+            "q",
+            (h for (h,) in store.conn.execute(
+                "SELECT address_hash FROM leads WHERE address_hash IS NOT NULL ORDER BY address_hash"
+            )),
+        )
+        return index
+
+    def __contains__(self, key: object) -> bool:
+        h = key_hash(str(key))
+        if h in self._pending:
+            return True
+        i = bisect_left(self._sorted, h)
+        return i < len(self._sorted) and self._sorted[i] == h
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def add(self, key: str) -> None:
+        self._pending.add(key_hash(key))
+
+    @property
+    def nbytes(self) -> int:
+        return self._sorted.itemsize * len(self._sorted)
+
+
+class LeadStore:
+    """SQLite lead CRM. On open, leads_crm.csv is synced in if it changed since the last import/export."""
+
+    def __init__(self, path: Path | None = None, csv_path: Path | None = None, bootstrap: bool = True):
+        self.path = path or DB_PATH
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        csv_path = csv_path or LEADS_CSV
+        if bootstrap:
+            synced = self.sync_csv(csv_path)
+            if synced is not None:
+                print(f"[lead_store] Synced {csv_path}: {synced[0]} new, {synced[1]} updated leads")
+
+    def __enter__(self) -> LeadStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _migrate(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self.conn:
+            cols = {row[1] for row in self.conn.execute("PRAGMA table_info(leads)")}
+            if "address_hash" not in cols:
+                self.conn.execute("ALTER TABLE leads ADD COLUMN address_hash INTEGER")
+            self.conn.execute("DROP INDEX IF EXISTS idx_leads_address_key")
+            self.conn.execute("DROP INDEX IF EXISTS idx_leads_address_hash")  # Re-keyed rows may swap hashes
+            # Re-key existing rows canonically. Rows that now collide with an earlier lead keep
+            # their data but get a NULL hash, so they no longer take part in dedupe.
+            seen: set[int] = set()
+            updates = []
+            for lead_id, address in self.conn.execute("SELECT id, Address FROM leads ORDER BY id").fetchall():
+                key = canonical_address(address)
+                h = key_hash(key)
+                updates.append((key, None if h in seen else h, lead_id))
+                seen.add(h)
+            self.conn.executemany("UPDATE leads SET address_key = ?, address_hash = ? WHERE id = ?", updates)
+            self.conn.execute(_ADDRESS_HASH_INDEX)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def has_address(self, address: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM leads WHERE address_hash = ?", (address_hash(address),),
+        ).fetchone()
+        return row is not None
+
+    def addresses(self) -> AddressIndex:
+        return AddressIndex.from_store(self)
+
+    def insert_leads(self, leads: Iterable[dict]) -> int:
+        """Insert leads in one transaction; addresses already stored are left untouched. Returns rows inserted."""
+        now = _now()
+        cols = ", ".join(LEAD_FIELDS)
+        marks = ", ".join("?" for _ in LEAD_FIELDS)
+        params = []
+        for lead in leads:
+            key = canonical_address(lead.get("Address"))
+            if not key:
+                continue
+            values = [(lead.get(f) or "").strip() for f in LEAD_FIELDS]
+            values[LEAD_FIELDS.index("Status")] = values[LEAD_FIELDS.index("Status")] or "New"
+            params.append((key, key_hash(key), *values, now, now))
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO leads (address_key, address_hash, {cols}, created_at, updated_at) "
+                f"VALUES (?, ?, {marks}, ?, ?)",
+                params,
+            )
+            return self.conn.total_changes - before
+
+    def upsert_leads(self, leads: Iterable[dict], since: str | None = None) -> tuple[int, int]:
+        """
+        Insert new leads and apply the editable columns of known ones, in one transaction.
+        Non-empty Name and Email values replace the stored ones. Status is taken only for rows not
+        updated after `since` (the last CSV sync; None: never), so a stale copy never undoes
+        outreach progress.
+        Returns (rows inserted, rows updated).
+        """
+        now = _now()
+        cols = ", ".join(LEAD_FIELDS)
+        marks = ", ".join("?" for _ in LEAD_FIELDS)
+        params = []
+        for lead in leads:
+            key = canonical_address(lead.get("Address"))
+            if not key:
+                continue
+            values = [(lead.get(f) or "").strip() for f in LEAD_FIELDS]
+            values[LEAD_FIELDS.index("Status")] = values[LEAD_FIELDS.index("Status")] or "New"
+            params.append((key, key_hash(key), *values, now, now, since, since))
+        with self.conn:
+            before_count, before = self.count(), self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT INTO leads (address_key, address_hash, {cols}, created_at, updated_at) "
+                f"VALUES (?, ?, {marks}, ?, ?) "
+                "ON CONFLICT(address_hash) DO UPDATE SET "
+                "Name = CASE WHEN excluded.Name != '' THEN excluded.Name ELSE Name END, "
+                "Email = CASE WHEN excluded.Email != '' THEN excluded.Email ELSE Email END, "
+                "Status = CASE WHEN updated_at <= ? THEN excluded.Status ELSE Status END, "
+                "updated_at = excluded.updated_at "
+                "WHERE (excluded.Name != '' AND excluded.Name != Name) "
+                "OR (excluded.Email != '' AND excluded.Email != Email) "
+                "OR (excluded.Status != Status AND updated_at <= ?)",
+                params,
+            )
+            inserted = self.count() - before_count
+            return inserted, self.conn.total_changes - before - inserted
+
+    def update_lead(self, lead_id: int, **fields: str) -> None:
+        """Update a single lead's columns (e.g. Status, Contacted_Date) and commit immediately."""
+        unknown = set(fields) - set(LEAD_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown lead fields: {sorted(unknown)}")
+        if not fields:
+            return
+        assignments = ", ".join(f"{f} = ?" for f in fields)
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE leads SET {assignments}, updated_at = ? WHERE id = ?",
+                (*fields.values(), _now(), lead_id),
+            )
+
+    def find(
+        self,
+        statuses: Iterable[str] | None = None,
+        lead_types: Iterable[str] | None = None,
+        with_email: bool = False,
+    ) -> list[dict]:
+        """Leads filtered through the (Status, Lead_Type) index. Each dict carries its row `id` and `created_at`."""
+        where, params = [], []
+        if statuses is not None:
+            statuses = list(statuses)
+            where.append(f"Status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if lead_types is not None:
+            lead_types = list(lead_types)
+            where.append(f"Lead_Type IN ({', '.join('?' for _ in lead_types)})")
+            params.extend(lead_types)
+        if with_email:
+            where.append("TRIM(Email) != ''")
+        sql = f"SELECT id, {', '.join(LEAD_FIELDS)}, created_at FROM leads"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY id", params)]
+
+    def iter_leads(self) -> Iterator[dict]:
+        for row in self.conn.execute(f"SELECT id, {', '.join(LEAD_FIELDS)} FROM leads ORDER BY id"):
+            yield dict(row)
+
+    def import_csv(self, csv_path: Path) -> tuple[int, int]:
+        """upsert_leads from a CSV, then record it as synced. Returns (rows inserted, rows updated)."""
+        row = self.conn.execute("SELECT synced_at FROM csv_sync WHERE path = ?", (str(csv_path),)).fetchone()
+        with csv_lock(csv_path):
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                counts = self.upsert_leads(csv.DictReader(f), since=row[0] if row else None)
+            self.mark_csv_synced(csv_path)
+        return counts
+
+    def sync_csv(self, csv_path: Path) -> tuple[int, int] | None:
+        """import_csv if the file changed since it was last imported or exported; None if it did not."""
+        if not csv_path.exists():
+            return None
+        row = self.conn.execute("SELECT signature FROM csv_sync WHERE path = ?", (str(csv_path),)).fetchone()
+        if row and row[0] == _csv_signature(csv_path):
+            return None
+        return self.import_csv(csv_path)
+
+    def mark_csv_synced(self, csv_path: Path) -> None:
+        """Record csv_path as matching the store (after an import, export or append of stored rows)."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO csv_sync (path, signature, synced_at) VALUES (?, ?, ?)",
+                (str(csv_path), _csv_signature(csv_path), _now()),
+            )
+
+    def export_csv(self, csv_path: Path | None = None) -> int:
+        """Write every lead to CSV (temp file + rename, so readers never see a partial file). Returns rows written."""
+        csv_path = csv_path or LEADS_CSV
+        tmp = csv_path.with_name(csv_path.name + ".tmp")
+        n = 0
+        with csv_lock(csv_path):
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=LEAD_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                for lead in self.iter_leads():
+                    writer.writerow(lead)
+                    n += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, csv_path)
+            self.mark_csv_synced(csv_path)
+        return n
+
+    def stats(self) -> list[tuple[str, str, int]]:
+        return [
+            (row[0], row[1], row[2])
+            for row in self.conn.execute(
+                "SELECT Status, Lead_Type, COUNT(*) FROM leads GROUP BY Status, Lead_Type ORDER BY Status, Lead_Type"
+            )
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DoggyBagg lead store (leads_crm.db)")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="Write all leads to CSV for spreadsheets")
+    p_export.add_argument("--out", type=Path, default=LEADS_CSV)
+    p_import = sub.add_parser(
+        "import", help="Insert new leads from a CSV and apply its Name/Email/Status edits to existing ones",
+    )
+    p_import.add_argument("--csv", type=Path, default=LEADS_CSV)
+    sub.add_parser("stats", help="Lead counts by Status and Lead_Type")
+    args = parser.parse_args()
+
+    with LeadStore(args.db, bootstrap=args.command != "import") as store:
+        if args.command == "export":
+            n = store.export_csv(args.out)
+            print(f"[lead_store] Exported {n} leads to {args.out}")
+        elif args.command == "import":
+            inserted, updated = store.import_csv(args.csv)
+            print(f"[lead_store] Imported {inserted} new and updated {updated} leads from {args.csv}")
+        elif args.command == "stats":
+            for status, lead_type, n in store.stats():
+                print(f"{status or '(blank)':<24} {lead_type or '(blank)':<28} {n}")
+            print(f"Total: {store.count()}")
+
+
+if __name__ == "__main__":
+    main()
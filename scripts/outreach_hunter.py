@@ -2,7 +2,8 @@
 """
 Outreach Hunter — Proactive high-value relationship initiator.
 
-Reads leads_crm.csv, filters High-Priority leads (PB/MB STRO, TPA density),
+Reads the lead store (leads_crm.db, imported from leads_crm.csv on first run),
+filters High-Priority leads (PB/MB STRO, TPA density),
 generates 1-page PDF Intelligence Briefs, and sends personalized emails via
 Gmail API with LLM ghostwriting and human-mimic throttling.
 
@@ -11,17 +12,28 @@ Requires: Gmail API OAuth setup, OpenAI API key (or template fallback).
 
 from __future__ import annotations
 
+import argparse
 import base64
-import csv
 import email.utils
+import hashlib
+import heapq
+import itertools
 import json
 import os
 import random
 import re
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from pathlib import Path
 
+import valuation
+from lead_store import LeadStore
+from run_report import RunReport, activate, current
+
 # Optional deps — fail gracefully if missing
 try:
     from reportlab.lib import colors
@@ -44,16 +56,24 @@ except ImportError:
 # --- Configuration ---
 BASE_DIR = Path(__file__).resolve().parent.parent
 LEADS_CSV = BASE_DIR / "leads_crm.csv"
+LEADS_DB = BASE_DIR / "leads_crm.db"
 CREDS_DIR = BASE_DIR / "scripts" / "outreach_creds"
 CREDS_FILE = CREDS_DIR / "credentials.json"
 TOKEN_FILE = CREDS_DIR / "token.json"
 DAILY_COUNTER_FILE = BASE_DIR / ".outreach_daily_count.json"
+GMAIL_STATE_FILE = BASE_DIR / ".outreach_gmail_state.json"  # historyId of the last reply check + threads to retry
+GMAIL_BATCH_SIZE = 50  # threads.get calls per batch HTTP request (Gmail allows up to 100)
 
 MAX_EMAILS_PER_DAY = 5
 PST = timezone(timedelta(hours=-8))
 SEND_WINDOW_START = (8, 45)   # 8:45 AM
 SEND_WINDOW_END = (16, 15)    # 4:15 PM
 FOLLOWUP_HOURS = 72
+# Written to a lead just before its email goes out. If the run dies between the Gmail send and the
+# status update, the lead stays "Sending" (never re-sent automatically) instead of looking untouched.
+SENDING_STATUS = "Sending"
+# Contacted thread Gmail no longer has (deleted: threads.get 404). Nothing to follow up on.
+THREAD_GONE_STATUS = "Thread_Gone"
 
 SUBJECT_TEMPLATES = [
     "Urgent: Transfer Tax Impact for {address}",
@@ -61,23 +81,53 @@ SUBJECT_TEMPLATES = [
     "New Condo-Sale Equity at {address}?",
 ]
 
-# High-priority zones / lead types
+# Priority scoring: zone + lead-type signals + transfer-tax exposure + recency
 PB_MB_ZONES = ("Pacific Beach", "Mission Beach", "Pacific Beach / Mission Beach")
 TPA_ZONE_PREFIX = "TPA_"
-STRO_TYPES = ("stro", "STRO")
-ADU_TYPES = ("adu", "ADU")
+FOCUS_ZIPS = ("92109", "92101", "92103")
+ZONE_SCORE_PB_MB = 3.0
+ZONE_SCORE_TPA = 2.0
+ZONE_SCORE_FOCUS_ZIP = 1.5
+# Lead_Type substring -> points; merged leads ("STRO_TPA_LDC2026+RUBT_Landlord") collect every signal
+LEAD_TYPE_SCORES = {"tier3": 3.0, "adu": 2.5, "stro": 2.0, "tpa": 1.5, "landlord": 0.5}
+TAX_SCORE_PER_100K = 1.0  # per $100k of estimated transfer-tax increase
+RECENCY_SCORE = 1.0  # for a lead found today, halving every RECENCY_HALF_LIFE_DAYS
+RECENCY_HALF_LIFE_DAYS = 14
+MIN_PRIORITY_SCORE = 2.5  # a landlord outside the focus zones stays below this even when new
+
+
+def _lead_age_days(lead: dict, now: datetime) -> float | None:
+    try:
+        found = datetime.strptime(lead.get("created_at") or "", "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return max((now - found).total_seconds() / 86400, 0.0)
 
 
-def is_high_priority(lead: dict) -> bool:
+def priority_score(lead: dict, tax_increase: float | None = None, now: datetime | None = None) -> float:
+    """Outreach priority; tax_increase can be passed in from a valuation.value_leads batch."""
     zone = (lead.get("Zone") or "").strip()
-    lt = (lead.get("Lead_Type") or "").strip().lower()
-    if any(z in zone for z in PB_MB_ZONES) and any(s in lt for s in ("stro", "tier")):
-        return True
-    if zone.startswith(TPA_ZONE_PREFIX) or "TPA" in zone:
-        return True
-    if "92109" in zone or "92101" in zone or "92103" in zone:
-        return True
-    return "stro" in lt or "adu" in lt or "tpa" in lt
+    lt = (lead.get("Lead_Type") or "").lower()
+    if any(z in zone for z in PB_MB_ZONES):
+        score = ZONE_SCORE_PB_MB
+    elif zone.startswith(TPA_ZONE_PREFIX) or "TPA" in zone:
+        score = ZONE_SCORE_TPA
+    elif any(z in zone for z in FOCUS_ZIPS):
+        score = ZONE_SCORE_FOCUS_ZIP
+    else:
+        score = 0.0
+    score += sum(points for key, points in LEAD_TYPE_SCORES.items() if key in lt)
+    if tax_increase is None:
+        tax_increase = valuation.value_lead(lead)["tax_increase"]
+    score += TAX_SCORE_PER_100K * tax_increase / 100_000
+    age = _lead_age_days(lead, now or datetime.now(timezone.utc))
+    if age is not None:
+        score += RECENCY_SCORE * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
+    return score
+
+
+def is_high_priority(lead: dict) -> bool:
+    return priority_score(lead) >= MIN_PRIORITY_SCORE
 
 
 def is_not_contacted(lead: dict) -> bool:
@@ -89,135 +139,236 @@ def has_email(lead: dict) -> bool:
     return bool((lead.get("Email") or "").strip())
 
 
-def load_leads() -> list[dict]:
-    if not LEADS_CSV.exists():
-        return []
-    rows = []
-    with open(LEADS_CSV, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        fieldnames = list(reader.fieldnames or [])
-        for row in reader:
-            rows.append(dict(row))
-    return rows
+def open_store() -> LeadStore:
+    return LeadStore(LEADS_DB, csv_path=LEADS_CSV)
 
 
-def save_leads(rows: list[dict], fieldnames: list[str]) -> None:
-    with open(LEADS_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(rows)
+def save_lead(store: LeadStore, lead_id: int, **fields: str) -> None:
+    """store.update_lead, timed as the run report's store_save stage."""
+    report = current()
+    with report.stage("store_save"):
+        store.update_lead(lead_id, **fields)
+    report.add("store_save", "updates")
 
 
-def get_fieldnames(rows: list[dict]) -> list[str]:
-    base = ["Name", "Address", "Zone", "Lead_Type", "Email", "Status"]
-    extra = ["Contacted_Date", "Gmail_Thread_Id", "FollowUp_Sent_Date"]
-    return base + extra
+def load_initial_candidates(store: LeadStore) -> list[dict]:
+    """Not-yet-contacted leads with an email, via the Status index (no full scan)."""
+    return store.find(statuses=("", "New", "new"), with_email=True)
 
 
-# --- Transfer Tax (same logic as property page) ---
-RATE_CURRENT = 0.55 / 500
-RATE_PROPOSED = 30.55 / 500
+def load_followup_candidates(store: LeadStore) -> list[dict]:
+    return store.find(statuses=("Contacted_With_Brief",))
 
 
+# --- Transfer Tax (same logic as property page; rate tables and zip estimates in valuation.py) ---
 def exit_tax_increase(value: float) -> float:
-    return value * (RATE_PROPOSED - RATE_CURRENT)
+    return valuation.tax_increase(value)
 
 
 def estimate_transfer_tax_risk(lead: dict) -> tuple[float, str]:
-    """Return (est_tax_increase, label). Assume $1.5M for PB/MB/TPA/ADU."""
-    return (exit_tax_increase(1_500_000), "$1.5M sale: ~$90k increase")
+    """Return (est_tax_increase, label) for the lead's assessed value, else its zip's median sale price."""
+    est = valuation.value_lead(lead)
+    price = est["value"]
+    price_label = f"${price / 1e6:.1f}M" if price >= 1e6 else f"${price / 1e3:.0f}k"
+    return (est["tax_increase"], f"{price_label} sale: ~${est['tax_increase'] / 1e3:.0f}k increase")
 
 
 def adu_condo_potential(lead: dict) -> str:
-    lt = (lead.get("Lead_Type") or "").lower()
-    if "adu" in lt:
-        return "$550k – $750k (est. separated asset value)"
+    est = valuation.value_lead(lead)
+    if est["adu_low"] is not None:
+        return f"${est['adu_low'] / 1e3:.0f}k – ${est['adu_high'] / 1e3:.0f}k (est. separated asset value)"
     return "N/A (no completed ADU on record)"
 
 
 # --- PDF Brief ---
-def generate_property_report(lead_data: dict, out_path: Path) -> None:
-    """Generate 1-page 2026 San Diego Property Intelligence Brief PDF."""
-    if not HAS_REPORTLAB:
-        raise RuntimeError("ReportLab required. Install: pip install reportlab")
-
-    addr = lead_data.get("Address") or "Unknown"
-    zone = lead_data.get("Zone") or "San Diego"
+PDF_DIR = BASE_DIR / "outreach_pdfs"
+# Bump when the brief layout changes so content-hash filenames stop matching stale PDFs
+BRIEF_TEMPLATE_VERSION = "2026-02-02"
+BRIEF_CHUNK_SIZE = 25  # leads per process-pool task: amortizes pickling without starving workers
+if HAS_REPORTLAB:
+    PAGE_W, PAGE_H = letter
+    INK = colors.HexColor("#1a1a1a")
+    MUTED = colors.HexColor("#666666")
+    FAINT = colors.HexColor("#888888")
+    WATERMARK = colors.HexColor("#e0e0e0")
+    ALERT = colors.HexColor("#c2410c")
+
+
+def brief_fields(lead_data: dict) -> dict[str, str]:
+    """The only parts of a brief that differ per lead (everything else is the fixed layout)."""
     tax_risk, tax_label = estimate_transfer_tax_risk(lead_data)
-    adu_val = adu_condo_potential(lead_data)
+    return {
+        "address": lead_data.get("Address") or "Unknown",
+        "tax": f"Est. increase: ${tax_risk:,.0f} ({tax_label})",
+        "adu": adu_condo_potential(lead_data),
+        "zone": f"Zone: {lead_data.get('Zone') or 'San Diego'} | Generated Feb 2, 2026",
+    }
 
-    c = canvas.Canvas(str(out_path), pagesize=letter)
-    w, h = letter
 
-    # Watermark
+def brief_path(lead_data: dict, out_dir: Path = PDF_DIR) -> Path:
+    """brief_<address slug>_<content hash>.pdf — same lead content, same file."""
+    return _brief_path(brief_fields(lead_data), out_dir)
+
+
+def _brief_path(fields: dict[str, str], out_dir: Path) -> Path:
+    digest = hashlib.sha256(
+        json.dumps([BRIEF_TEMPLATE_VERSION, fields], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+    slug = re.sub(r"[^\w\-]", "", fields["address"].lower().replace(" ", "-"))[:50]
+    return out_dir / f"brief_{slug or 'unknown'}_{digest}.pdf"
+
+
+def _draw_brief_static(c) -> None:
+    """Watermark, header, section labels and disclaimer: identical on every brief."""
     c.saveState()
-    c.setFillColor(colors.HexColor("#e0e0e0"))
+    c.setFillColor(WATERMARK)
     c.setFont("Helvetica-Bold", 32)
-    c.translate(w / 2, h / 2)
+    c.translate(PAGE_W / 2, PAGE_H / 2)
     c.rotate(45)
     c.drawCentredString(0, 0, "CONFIDENTIAL")
     c.restoreState()
 
-    # Header
     c.setFont("Helvetica-Bold", 16)
-    c.setFillColor(colors.HexColor("#1a1a1a"))
-    c.drawString(inch, h - inch, "2026 San Diego Property Intelligence Brief")
+    c.setFillColor(INK)
+    c.drawString(inch, PAGE_H - inch, "2026 San Diego Property Intelligence Brief")
     c.setFont("Helvetica", 10)
-    c.setFillColor(colors.HexColor("#666666"))
-    c.drawString(inch, h - inch - 16, "DoggyBagg Ordinance | Feb 2, 2026")
+    c.setFillColor(MUTED)
+    c.drawString(inch, PAGE_H - inch - 16, "DoggyBagg Ordinance | Feb 2, 2026")
 
-    # Content
-    y = h - inch - 60
+    y = PAGE_H - inch - 60
     c.setFont("Helvetica-Bold", 12)
-    c.setFillColor(colors.HexColor("#1a1a1a"))
-    c.drawString(inch, y, "Property Address")
-    c.setFont("Helvetica", 11)
-    y -= 20
-    c.drawString(inch, y, addr)
-    y -= 30
+    c.setFillColor(INK)
+    for i, label in enumerate(("Property Address", "Transfer Tax Exit Risk", "ADU Condo-Sale Potential")):
+        c.drawString(inch, y - 50 * i, label)
+    c.setFont("Helvetica", 9)
+    c.setFillColor(FAINT)
+    c.drawString(inch, y - 174, "This brief is for informational purposes. Consult a professional for advice.")
 
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(inch, y, "Transfer Tax Exit Risk")
-    c.setFont("Helvetica", 11)
-    y -= 20
-    c.setFillColor(colors.HexColor("#c2410c"))
-    c.drawString(inch, y, f"Est. increase: ${tax_risk:,.0f} ({tax_label})")
-    c.setFillColor(colors.HexColor("#1a1a1a"))
-    y -= 30
 
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(inch, y, "ADU Condo-Sale Potential")
-    c.setFont("Helvetica", 11)
-    y -= 20
-    c.drawString(inch, y, adu_val)
-    y -= 40
+def _render_brief(fields: dict[str, str], out_path: Path) -> None:
+    # invariant=1: no timestamps/random ids in the file, so identical content gives identical bytes
+    c = canvas.Canvas(str(out_path), pagesize=letter, invariant=1)
+    _draw_brief_static(c)
 
+    y = PAGE_H - inch - 80
+    c.setFont("Helvetica", 11)
+    c.setFillColor(INK)
+    c.drawString(inch, y, fields["address"])
+    c.setFillColor(ALERT)
+    c.drawString(inch, y - 50, fields["tax"])
+    c.setFillColor(INK)
+    c.drawString(inch, y - 100, fields["adu"])
     c.setFont("Helvetica", 9)
-    c.setFillColor(colors.HexColor("#888888"))
-    c.drawString(inch, y, f"Zone: {zone} | Generated Feb 2, 2026")
-    c.drawString(inch, y - 14, "This brief is for informational purposes. Consult a professional for advice.")
-
+    c.setFillColor(FAINT)
+    c.drawString(inch, y - 140, fields["zone"])
     c.save()
 
 
+def _render_brief_chunk(jobs: list[tuple[dict[str, str], str]]) -> int:
+    """Render (fields, path) jobs; top-level so process-pool workers can run it. Returns jobs done."""
+    for fields, path in jobs:
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        _render_brief(fields, tmp)
+        os.replace(tmp, path)  # Never leave a half-written PDF under a valid content-hash name
+    return len(jobs)
+
+
+def render_briefs(
+    leads: list[dict],
+    out_dir: Path = PDF_DIR,
+    workers: int = 1,
+    chunk_size: int = BRIEF_CHUNK_SIZE,
+    progress: Callable[[int, int], None] | None = None,
+) -> list[tuple[Path, bool]]:
+    """
+    Render briefs for many leads in one call. Each brief is its own one-page PDF, so nothing is
+    shared between files: the saving comes from skipping work. A lead whose content-hash file
+    already exists is skipped, and leads with identical content share one file. With workers > 1,
+    chunks of chunk_size go to a process pool; files are byte-identical to a serial run. Returns
+    (path, rendered) per lead, in input order.
+    """
+    if not HAS_REPORTLAB:
+        raise RuntimeError("ReportLab required. Install: pip install reportlab")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths, jobs = [], {}
+    for lead in leads:
+        fields = brief_fields(lead)
+        path = _brief_path(fields, out_dir)
+        paths.append(path)
+        if path not in jobs and not path.exists():
+            jobs[path] = fields
+    pending = [(fields, str(path)) for path, fields in jobs.items()]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    done = 0
+    report = current()
+    with report.stage("pdf_render"):
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                done += _render_brief_chunk(chunk)
+                if progress:
+                    progress(done, len(pending))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for fut in as_completed([pool.submit(_render_brief_chunk, chunk) for chunk in chunks]):
+                    done += fut.result()
+                    if progress:
+                        progress(done, len(pending))
+    report.add("pdf_render", "rendered", len(pending))
+    report.add("pdf_render", "reused", len(leads) - len(pending))
+    rendered = set()
+    results = []
+    for path in paths:
+        results.append((path, path in jobs and path not in rendered))
+        rendered.add(path)
+    return results
+
+
+def generate_property_report(lead_data: dict, out_path: Path) -> None:
+    """Generate 1-page 2026 San Diego Property Intelligence Brief PDF."""
+    if not HAS_REPORTLAB:
+        raise RuntimeError("ReportLab required. Install: pip install reportlab")
+    _render_brief(brief_fields(lead_data), out_path)
+
+
 # --- LLM Ghostwriter ---
-def write_email_body(lead: dict, is_followup: bool = False) -> str:
-    """Generate Concerned Expert tone body via LLM or template."""
+LLM_MODEL = "gpt-4o-mini"
+LLM_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/chat/completions"
+LLM_TIMEOUT_SEC = 30
+# Drafts are cached by a hash of the exact request (model + prompt), so an unchanged prompt never
+# hits the API twice; the send loop reads only this cache and never waits on the LLM.
+DRAFT_CACHE_DIR = BASE_DIR / ".outreach_drafts"
+DRAFT_TTL_SEC = 7 * 24 * 3600
+DRAFT_WORKERS = 4  # concurrent LLM requests while pre-generating
+
+
+def write_email_body(lead: dict, is_followup: bool = False, cached_only: bool = False) -> str:
+    """
+    Generate Concerned Expert tone body via LLM or template. A cached draft is used when present;
+    with cached_only (the send loop) a cache miss falls back to the template instead of calling the LLM.
+    """
     api_key = os.environ.get("OPENAI_API_KEY")
     addr = lead.get("Address") or "[Address]"
     zone = lead.get("Zone") or "your area"
     name = (lead.get("Name") or "").strip() or "there"
 
     if api_key:
-        try:
-            import urllib.request
-            import urllib.error
-            body = _call_openai(api_key, lead, addr, zone, name, is_followup)
-            if body:
-                return body
-        except Exception as e:
-            print(f"[outreach_hunter] LLM fallback: {e}")
-
+        payload = _llm_request(addr, zone, name, is_followup)
+        key = _draft_key(payload)
+        body = _draft_cache_get(key)
+        if body:
+            current().add("llm", "cache_hits")
+            return body
+        if not cached_only:
+            try:
+                body = _call_openai(api_key, payload)
+                if body:
+                    _draft_cache_put(key, body)
+                    return body
+            except Exception as e:
+                print(f"[outreach_hunter] LLM fallback: {e}")
+
+    current().add("llm", "template_fallbacks")
     if is_followup:
         return f"""Hi {name},
 
@@ -242,40 +393,123 @@ DoggyBagg Ordinance
 """
 
 
-def _call_openai(api_key: str, lead: dict, addr: str, zone: str, name: str, is_followup: bool) -> str | None:
-    try:
-        import urllib.request
-        import urllib.error
-    except ImportError:
-        return None
+def _llm_request(addr: str, zone: str, name: str, is_followup: bool) -> dict:
     sys_msg = "You are a concerned expert in San Diego real estate ordinances. Write a brief, professional email. Tone: concerned expert, not salesy. Do not use markdown. Sign as DoggyBagg Ordinance."
     if is_followup:
         user_msg = f"Follow-up to {name} about {addr}. Mention Feb 5th Neighborhoods for All forum as a compliance deadline. Soft nudge, not pushy."
     else:
         user_msg = f"Email to {name} about {addr} in {zone}. Mention transfer tax impact and ADU condo-sale potential. They received a PDF brief. Invite them to reply or schedule a call."
-    data = json.dumps({
-        "model": "gpt-4o-mini",
+    return {
+        "model": LLM_MODEL,
         "messages": [
             {"role": "system", "content": sys_msg},
             {"role": "user", "content": user_msg},
         ],
         "max_tokens": 400,
-    }).encode()
+    }
+
+
+def _call_openai(api_key: str, payload: dict) -> str | None:
+    import urllib.request
+
+    report = current()
     req = urllib.request.Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=data,
+        LLM_URL,
+        data=json.dumps(payload).encode(),
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         },
         method="POST",
     )
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        j = json.load(resp)
+    report.add("llm", "requests")
+    try:
+        with report.stage("llm"), urllib.request.urlopen(req, timeout=LLM_TIMEOUT_SEC) as resp:
+            j = json.load(resp)
+    except Exception:
+        report.add("llm", "failed")
+        raise
     text = (j.get("choices") or [{}])[0].get("message", {}).get("content", "")
+    report.add("llm", "generated" if text else "failed")
     return text.strip() if text else None
 
 
+def _draft_key(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _draft_cache_get(key: str) -> str | None:
+    path = DRAFT_CACHE_DIR / f"{key}.json"
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("created", 0) > DRAFT_TTL_SEC:
+        path.unlink(missing_ok=True)
+        return None
+    return entry.get("body") or None
+
+
+def _draft_cache_put(key: str, body: str) -> None:
+    DRAFT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = DRAFT_CACHE_DIR / f"{key}.json"
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"created": time.time(), "body": body}, f)
+    os.replace(tmp, path)
+
+
+def prune_draft_cache() -> int:
+    """Delete drafts older than DRAFT_TTL_SEC. Returns files removed."""
+    removed = 0
+    cutoff = time.time() - DRAFT_TTL_SEC
+    for path in DRAFT_CACHE_DIR.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def pregenerate_drafts(jobs: list[tuple[dict, bool]], workers: int = DRAFT_WORKERS) -> int:
+    """
+    Fill the draft cache for (lead, is_followup) jobs, at most `workers` LLM calls in flight.
+    Cached drafts are skipped. Returns drafts newly generated.
+    """
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key or not jobs:
+        return 0
+    prune_draft_cache()
+    pending = {}
+    for lead, is_followup in jobs:
+        payload = _llm_request(
+            lead.get("Address") or "[Address]",
+            lead.get("Zone") or "your area",
+            (lead.get("Name") or "").strip() or "there",
+            is_followup,
+        )
+        key = _draft_key(payload)
+        if key not in pending and _draft_cache_get(key) is None:
+            pending[key] = payload
+
+    def generate(item: tuple[str, dict]) -> bool:
+        key, payload = item
+        try:
+            body = _call_openai(api_key, payload)
+        except Exception as e:
+            print(f"[outreach_hunter] Draft failed ({payload['messages'][1]['content'][:40]}...): {e}")
+            return False
+        if body:
+            _draft_cache_put(key, body)
+        return bool(body)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        return sum(pool.map(generate, pending.items()))
+
+
 # --- Gmail ---
 SCOPES = ["https://www.googleapis.com/auth/gmail.send", "https://www.googleapis.com/auth/gmail.readonly"]
 
@@ -323,17 +557,144 @@ def send_email(service, to: str, subject: str, body: str, pdf_path: Path | None
         attachment.add_header("Content-Disposition", "attachment", filename=pdf_path.name)
         msg.attach(attachment)
     raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-    sent = service.users().messages().send(userId="me", body={"raw": raw}).execute()
+    report = current()
+    try:
+        with report.stage("gmail_send"):
+            sent = service.users().messages().send(userId="me", body={"raw": raw}).execute()
+    except Exception:
+        report.add("gmail_send", "failed")
+        raise
+    report.add("gmail_send", "sent")
+    report.add("gmail_send", "bytes_sent", len(raw))
     return sent.get("threadId") or sent.get("id")
 
 
-def has_reply(service, thread_id: str) -> bool:
-    """Check if thread has messages after our send (simple: count > 1 = reply)."""
+def _load_gmail_state() -> tuple[str | None, set[str]]:
+    """(historyId of the last reply check, threads whose check failed and must be retried directly)."""
     try:
-        thread = service.users().threads().get(userId="me", id=thread_id).execute()
-        return len(thread.get("messages", [])) > 1
-    except Exception:
-        return False
+        with open(GMAIL_STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None, set()
+    return state.get("history_id") or None, set(state.get("retry_threads") or ())
+
+
+def _save_gmail_state(history_id: str, retry_threads: set[str]) -> None:
+    tmp = GMAIL_STATE_FILE.with_name(GMAIL_STATE_FILE.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"history_id": str(history_id), "retry_threads": sorted(retry_threads)}, f)
+    os.replace(tmp, GMAIL_STATE_FILE)
+
+
+def _http_status(exc: BaseException) -> int | None:
+    """HTTP status of a googleapiclient HttpError (None for anything else)."""
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None) or getattr(exc, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_reply(message: dict) -> bool:
+    """Any message in our thread that we did not send (our sends and follow-ups carry SENT)."""
+    labels = message.get("labelIds") or []
+    return "SENT" not in labels and "DRAFT" not in labels
+
+
+def _replied_via_history(service, thread_ids: set[str], start_history_id: str) -> tuple[set[str], str]:
+    """One paged history.list since start_history_id; returns (replied thread ids, latest history id)."""
+    replied, page_token, latest = set(), None, start_history_id
+    while True:
+        kwargs = {"userId": "me", "startHistoryId": start_history_id, "historyTypes": ["messageAdded"]}
+        if page_token:
+            kwargs["pageToken"] = page_token
+        resp = service.users().history().list(**kwargs).execute()
+        for record in resp.get("history", []):
+            for added in record.get("messagesAdded", []):
+                msg = added.get("message") or {}
+                if msg.get("threadId") in thread_ids and _is_reply(msg):
+                    replied.add(msg["threadId"])
+        latest = resp.get("historyId") or latest
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return replied, latest
+
+
+def _replied_via_batch(service, thread_ids: set[str]) -> tuple[set[str], set[str], set[str]]:
+    """
+    threads.get for every thread, GMAIL_BATCH_SIZE per batch HTTP request; returns
+    (replied, gone, failed): gone threads answered 404, failed ones any other error.
+    """
+    replied, gone, failed = set(), set(), set()
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            (gone if _http_status(exception) == 404 else failed).add(request_id)
+        elif any(_is_reply(m) for m in response.get("messages", [])):
+            replied.add(request_id)
+
+    ids = sorted(thread_ids)
+    for i in range(0, len(ids), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for thread_id in ids[i:i + GMAIL_BATCH_SIZE]:
+            batch.add(
+                service.users().threads().get(userId="me", id=thread_id, format="minimal"),
+                request_id=thread_id,
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            print(f"[outreach_hunter] Gmail batch failed: {e}")
+            failed.update(ids[i:i + GMAIL_BATCH_SIZE])
+    return replied, gone, failed
+
+
+def replied_threads(service, thread_ids) -> tuple[set[str], set[str], set[str]]:
+    """
+    Which of thread_ids have a reply, in bulk: history.list since the historyId stored by the
+    last run (one call per page for all threads), else batched threads.get. Returns
+    (replied, unknown, gone): unknown threads could not be checked and should not get a
+    follow-up this run (they are retried directly next run); gone threads no longer exist.
+    """
+    thread_ids = set(thread_ids)
+    if not thread_ids:
+        return set(), set(), set()
+    report = current()
+    with report.stage("gmail_reply_check"):
+        replied, unknown, gone = _replied_threads(service, thread_ids)
+    report.add("gmail_reply_check", "threads", len(thread_ids))
+    report.add("gmail_reply_check", "replied", len(replied))
+    report.add("gmail_reply_check", "unknown", len(unknown))
+    report.add("gmail_reply_check", "gone", len(gone))
+    return replied, unknown, gone
+
+
+def _replied_threads(service, thread_ids: set[str]) -> tuple[set[str], set[str], set[str]]:
+    start, retry = _load_gmail_state()
+    if start:
+        try:
+            replied, latest = _replied_via_history(service, thread_ids, start)
+        except Exception as e:  # historyId too old (404) or transient: full check below
+            print(f"[outreach_hunter] Gmail history unavailable ({e}); checking threads directly")
+        else:
+            # Threads whose earlier check failed may have a reply older than `start`: ask them directly
+            retry &= thread_ids
+            gone, failed = set(), set()
+            if retry:
+                replied_retry, gone, failed = _replied_via_batch(service, retry)
+                replied |= replied_retry
+            _save_gmail_state(latest, failed)
+            return replied, failed, gone
+    try:
+        latest = service.users().getProfile(userId="me").execute().get("historyId")  # before the scan: no gap
+        replied, gone, failed = _replied_via_batch(service, thread_ids)
+    except Exception as e:
+        print(f"[outreach_hunter] Gmail reply check failed: {e}")
+        return set(), thread_ids, set()
+    if latest:
+        _save_gmail_state(latest, failed)  # Failed threads are carried forward, not a reason to rescan all
+    return replied, failed, gone
 
 
 # --- Throttling ---
@@ -365,8 +726,10 @@ def get_today_sent_count() -> int:
 def increment_today_sent() -> None:
     today = datetime.now(PST).strftime("%Y-%m-%d")
     count = get_today_sent_count() + 1
-    with open(DAILY_COUNTER_FILE, "w") as f:
+    tmp = DAILY_COUNTER_FILE.with_name(DAILY_COUNTER_FILE.name + ".tmp")
+    with open(tmp, "w") as f:
         json.dump({"date": today, "count": count}, f)
+    os.replace(tmp, DAILY_COUNTER_FILE)  # Atomic: a crash never leaves a truncated counter
 
 
 def can_send_more() -> bool:
@@ -374,30 +737,81 @@ def can_send_more() -> bool:
 
 
 # --- Main ---
-def get_initial_outreach_leads(rows: list[dict]) -> list[tuple[int, dict]]:
-    """High-priority, not contacted, has email."""
-    out = []
-    for i, r in enumerate(rows):
-        if not is_high_priority(r):
-            continue
-        if not is_not_contacted(r):
-            continue
-        if not has_email(r):
-            continue
-        out.append((i, r))
-    return out
-
-
-def get_followup_leads(rows: list[dict], service=None) -> list[tuple[int, dict]]:
-    """Contacted >72h ago, no reply (via Gmail), no follow-up sent."""
+def _score_initial_leads(rows: list[dict]) -> list[tuple[float, int, dict]]:
+    """
+    (-score, lead id, lead) for every lead that is not contacted, has an email and scores >=
+    MIN_PRIORITY_SCORE, so the smallest entry is the best lead (ties: older lead first).
+    Each lead gets its score as Priority_Score.
+    """
+    rows = [r for r in rows if is_not_contacted(r) and has_email(r)]
+    taxes = valuation.value_leads(rows)["tax_increase"]  # one vectorized pass for the whole batch
+    now = datetime.now(timezone.utc)
+    scored = []
+    for r, tax in zip(rows, taxes):
+        score = priority_score(r, float(tax), now)
+        if score >= MIN_PRIORITY_SCORE:
+            r["Priority_Score"] = round(score, 3)
+            scored.append((-score, r["id"], r))
+    return scored
+
+
+def get_initial_outreach_leads(rows: list[dict], k: int | None = None) -> list[tuple[int, dict]]:
+    """
+    Eligible leads (see _score_initial_leads) as (lead id, lead) pairs best first: the top k
+    via a heap (O(n log k)), or all of them when k is None.
+    """
+    scored = _score_initial_leads(rows)
+    best = heapq.nsmallest(k, scored, key=itemgetter(0, 1)) if k is not None else sorted(scored, key=itemgetter(0, 1))
+    return [(r["id"], r) for _, _, r in best]
+
+
+def iter_initial_outreach_leads(rows: list[dict]) -> Iterator[tuple[int, dict]]:
+    """
+    Same order as get_initial_outreach_leads, popped lazily off a heap (O(n) + O(log n) per lead),
+    so a send run can keep pulling the next-best lead after a failed brief or send.
+    """
+    heap = _score_initial_leads(rows)
+    heapq.heapify(heap)  # lead ids are unique, so the dicts are never compared
+    while heap:
+        _, lead_id, lead = heapq.heappop(heap)
+        yield lead_id, lead
+
+
+def get_followup_leads(
+    rows: list[dict], service=None, store: LeadStore | None = None, due_within_hours: float = 0,
+) -> list[tuple[int, dict]]:
+    """
+    Contacted >72h ago (or due within due_within_hours), no reply (via Gmail), no follow-up sent.
+    Replies (and deleted threads) are looked up in bulk for every contacted thread, not just the due ones, and recorded in store.
+    """
     now = datetime.now(PST)
-    cutoff = now - timedelta(hours=FOLLOWUP_HOURS)
+    cutoff = now - timedelta(hours=FOLLOWUP_HOURS - due_within_hours)
+    rows = [
+        r for r in rows
+        if (r.get("Status") or "").strip() == "Contacted_With_Brief" and not (r.get("FollowUp_Sent_Date") or "").strip()
+    ]
+    replied, unknown, gone = set(), set(), set()
+    if service:
+        thread_ids = {(r.get("Gmail_Thread_Id") or "").strip() for r in rows} - {""}
+        replied, unknown, gone = replied_threads(service, thread_ids)
+        if unknown:
+            print(f"[outreach_hunter] Reply check failed for {len(unknown)} thread(s); no follow-up for them this run")
+        if gone:
+            print(f"[outreach_hunter] {len(gone)} contacted thread(s) no longer exist in Gmail; marked {THREAD_GONE_STATUS}")
     out = []
-    for i, r in enumerate(rows):
-        status = (r.get("Status") or "").strip()
-        if status != "Contacted_With_Brief":
+    for r in rows:
+        thread_id = (r.get("Gmail_Thread_Id") or "").strip()
+        if thread_id in replied:
+            r["Status"] = "Replied"
+            if store:
+                save_lead(store, r["id"], Status="Replied")
+            continue
+        if thread_id in gone:
+            r["Status"] = THREAD_GONE_STATUS
+            if store:
+                save_lead(store, r["id"], Status=THREAD_GONE_STATUS)
             continue
-        if (r.get("FollowUp_Sent_Date") or "").strip():
+        if thread_id in unknown:
             continue
         cd = r.get("Contacted_Date") or ""
         if not cd:
@@ -409,29 +823,133 @@ def get_followup_leads(rows: list[dict], service=None) -> list[tuple[int, dict]]
                 continue
         except ValueError:
             continue
-        thread_id = (r.get("Gmail_Thread_Id") or "").strip()
-        if service and thread_id and has_reply(service, thread_id):
-            rows[i]["Status"] = "Replied"
-            continue
-        out.append((i, r))
+        out.append((r["id"], r))
     return out
 
 
-def main() -> None:
-    import sys
-    dry_run = "--dry-run" in sys.argv
-    if dry_run:
-        print("[outreach_hunter] DRY RUN (no emails sent, no CSV writes)")
+def select_brief_leads(
+    store: LeadStore,
+    zone: str | None = None,
+    lead_type: str | None = None,
+    statuses: list[str] | None = None,
+    high_priority: bool = False,
+) -> list[dict]:
+    """Leads to prepare briefs for: Zone / Lead_Type substring filters (case-insensitive), optional Status list."""
+    zone, lead_type = (zone or "").lower(), (lead_type or "").lower()
+    return [
+        lead for lead in store.find(statuses=statuses)
+        if zone in (lead.get("Zone") or "").lower()
+        and lead_type in (lead.get("Lead_Type") or "").lower()
+        and (not high_priority or is_high_priority(lead))
+    ]
+
+
+def generate_briefs(args: argparse.Namespace) -> None:
+    """generate-briefs: render PDF briefs for a filtered set of leads and write a manifest."""
+    if not HAS_REPORTLAB:
+        print("[outreach_hunter] Install ReportLab: pip install reportlab")
+        return
+    store = open_store()
+    leads = select_brief_leads(store, args.zone, args.lead_type, args.status, args.high_priority)
+    store.close()
+    out_dir = Path(args.out)
+    print(f"[outreach_hunter] Briefs for {len(leads)} leads -> {out_dir} ({args.workers} worker(s))")
+
+    def progress(done: int, total: int) -> None:
+        print(f"[outreach_hunter]   rendered {done}/{total}")
+
+    t0 = time.monotonic()
+    results = render_briefs(leads, out_dir, workers=args.workers, chunk_size=args.chunk_size, progress=progress)
+    manifest = [
+        {"id": lead["id"], "address": lead.get("Address") or "", "path": str(path), "rendered": rendered}
+        for lead, (path, rendered) in zip(leads, results)
+    ]
+    manifest_path = Path(args.manifest) if args.manifest else out_dir / "manifest.json"
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    n_rendered = sum(1 for m in manifest if m["rendered"])
+    print(
+        f"[outreach_hunter] Done in {time.monotonic() - t0:.1f}s: {n_rendered} rendered, "
+        f"{len(manifest) - n_rendered} reused. Manifest: {manifest_path}"
+    )
+
+
+def draft_emails(args: argparse.Namespace) -> None:
+    """draft-emails: fill the draft cache for tomorrow's top initial candidates and due follow-ups."""
+    if not os.environ.get("OPENAI_API_KEY"):
+        print("[outreach_hunter] OPENAI_API_KEY not set; emails use the template, nothing to draft")
+        return
+    store = open_store()
+    initial = get_initial_outreach_leads(load_initial_candidates(store), k=args.count)
+    followups = get_followup_leads(load_followup_candidates(store), due_within_hours=24)
+    store.close()
+    jobs = [(l, True) for _, l in followups] + [(l, False) for _, l in initial]
+    t0 = time.monotonic()
+    n = pregenerate_drafts(jobs, workers=args.workers)
+    print(
+        f"[outreach_hunter] Drafts: {n} generated, {len(jobs) - n} cached or failed "
+        f"({len(initial)} initial, {len(followups)} follow-ups) in {time.monotonic() - t0:.1f}s"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="DoggyBagg Outreach Hunter")
+    parser.add_argument("--dry-run", action="store_true", help="Preview without sending")
+    parser.add_argument("--report", metavar="PATH", help="Run report path (default run_reports/outreach_hunter-<time>.json)")
+    parser.add_argument("--profile", action="store_true", help="Also run under cProfile + tracemalloc (slower)")
+    sub = parser.add_subparsers(dest="command")
+    p_briefs = sub.add_parser("generate-briefs", help="Render PDF briefs for a filtered set of leads (no email)")
+    p_briefs.add_argument("--zone", help="Zone substring, e.g. 92109 or TPA_")
+    p_briefs.add_argument("--lead-type", help="Lead_Type substring, e.g. adu")
+    p_briefs.add_argument("--status", action="append", help="Only these statuses (repeatable; default all)")
+    p_briefs.add_argument("--high-priority", action="store_true", help="Only leads outreach would target")
+    p_briefs.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes (1 = serial)")
+    p_briefs.add_argument("--chunk-size", type=int, default=BRIEF_CHUNK_SIZE)
+    p_briefs.add_argument("--out", default=str(PDF_DIR))
+    p_briefs.add_argument("--manifest", help="Manifest path (default <out>/manifest.json)")
+    p_drafts = sub.add_parser("draft-emails", help="Pre-generate LLM drafts for the next day's top candidates")
+    p_drafts.add_argument("--count", type=int, default=MAX_EMAILS_PER_DAY, help="Top initial candidates to draft")
+    p_drafts.add_argument("--workers", type=int, default=DRAFT_WORKERS, help="Concurrent LLM requests")
+    args = parser.parse_args(argv)
 
     os.chdir(BASE_DIR)
+    report = activate(RunReport("outreach_hunter", profile=args.profile))
+    try:
+        with report.profiling():
+            run(args)
+    finally:
+        path = report.write(args.report)
+        print(f"[outreach_hunter] Run report: {path}")
+        for line in report.summary().splitlines():
+            print(f"[outreach_hunter]   {line}")
+
+
+def run(args: argparse.Namespace) -> None:
+    dry_run = args.dry_run
+    if dry_run:
+        print("[outreach_hunter] DRY RUN (no emails sent, no status updates)")
+
     print("[outreach_hunter] Starting Outreach Hunter")
 
-    if not LEADS_CSV.exists():
-        print("[outreach_hunter] leads_crm.csv not found. Run lead_sniper.py first.")
+    if not LEADS_DB.exists() and not LEADS_CSV.exists():
+        print("[outreach_hunter] No leads found (leads_crm.db / leads_crm.csv). Run lead_sniper.py first.")
         return
 
-    rows = load_leads()
-    fieldnames = get_fieldnames(rows)
+    if args.command == "generate-briefs":
+        generate_briefs(args)
+        return
+    if args.command == "draft-emails":
+        draft_emails(args)
+        return
+
+    store = open_store()
+    stuck = store.find(statuses=(SENDING_STATUS,))
+    if stuck:
+        print(
+            f"[outreach_hunter] {len(stuck)} lead(s) left in '{SENDING_STATUS}' by an interrupted run; "
+            "check Gmail Sent and fix their Status by hand"
+        )
 
     # Check Gmail / ReportLab
     if not HAS_REPORTLAB:
@@ -446,71 +964,91 @@ def main() -> None:
         return
 
     if dry_run:
-        initial = get_initial_outreach_leads(rows)
-        followups = get_followup_leads(rows, service=None)
+        initial = get_initial_outreach_leads(load_initial_candidates(store))
+        followups = get_followup_leads(load_followup_candidates(store), service=None)
         print(f"[outreach_hunter] Would send: {len(initial)} initial, {len(followups)} follow-ups (max {MAX_EMAILS_PER_DAY}/day)")
+        for _, lead in initial[:MAX_EMAILS_PER_DAY]:
+            print(f"[outreach_hunter]   {lead['Priority_Score']:6.2f}  {lead.get('Address')} ({lead.get('Lead_Type')}, {lead.get('Zone')})")
         return
 
     service = get_gmail_service()
-    pdf_dir = BASE_DIR / "outreach_pdfs"
-    pdf_dir.mkdir(exist_ok=True)
+
+    followups = get_followup_leads(load_followup_candidates(store), service, store)
+    # Initial candidates, highest score first. The first `remaining` get drafts up front; if one of
+    # them fails, the loop below keeps pulling the next-best lead until the daily cap is reached
+    remaining = max(MAX_EMAILS_PER_DAY - get_today_sent_count(), 0)
+    candidates = iter_initial_outreach_leads(load_initial_candidates(store))
+    initial = list(itertools.islice(candidates, remaining))
+    # Drafts for everything that may go out today, generated concurrently up front (usually already
+    # cached by draft-emails); the send loops below read the cache only and never wait on the LLM
+    t0 = time.monotonic()
+    n = pregenerate_drafts([(l, True) for _, l in followups[:remaining]] + [(l, False) for _, l in initial])
+    if n:
+        print(f"[outreach_hunter] Generated {n} draft(s) in {time.monotonic() - t0:.1f}s")
 
     # 1. Follow-up loop first (softer touch)
-    followups = get_followup_leads(rows, service)
-    for idx, lead in followups:
+    for lead_id, lead in followups:
         if not can_send_more():
             break
         email_addr = (lead.get("Email") or "").strip()
         addr = lead.get("Address") or "Unknown"
-        body = write_email_body(lead, is_followup=True)
+        body = write_email_body(lead, is_followup=True, cached_only=True)
         subj = f"Re: {random.choice(SUBJECT_TEMPLATES).format(address=addr, zone=lead.get('Zone') or 'your area')}"
+        save_lead(store, lead_id, Status=SENDING_STATUS)
+        msg_id = None
         try:
             msg_id = send_email(service, email_addr, subj, body, pdf_path=None)
-            if msg_id:
-                today = datetime.now(PST).strftime("%Y-%m-%d %H:%M")
-                rows[idx]["Status"] = "Contacted_FollowUp"
-                rows[idx]["FollowUp_Sent_Date"] = today
-                rows[idx]["Gmail_Thread_Id"] = msg_id  # Store for future reply check
-                increment_today_sent()
-                print(f"[outreach_hunter] Follow-up sent: {addr} -> {email_addr}")
         except Exception as e:
             print(f"[outreach_hunter] Follow-up failed {addr}: {e}")
+        if msg_id:
+            today = datetime.now(PST).strftime("%Y-%m-%d %H:%M")
+            save_lead(
+                store,
+                lead_id,
+                Status="Contacted_FollowUp",
+                FollowUp_Sent_Date=today,
+                Gmail_Thread_Id=msg_id,  # Store for future reply check
+            )
+            increment_today_sent()
+            print(f"[outreach_hunter] Follow-up sent: {addr} -> {email_addr}")
+        else:
+            save_lead(store, lead_id, Status=lead.get("Status") or "Contacted_With_Brief")
 
     # 2. Initial outreach
-    initial = get_initial_outreach_leads(rows)
-    random.shuffle(initial)
-    for idx, lead in initial:
+    for lead_id, lead in itertools.chain(initial, candidates):
         if not can_send_more():
             break
         email_addr = (lead.get("Email") or "").strip()
         addr = lead.get("Address") or "Unknown"
-        slug = re.sub(r"[^\w\-]", "", addr.lower().replace(" ", "-"))[:50]
-        pdf_path = pdf_dir / f"brief_{slug or 'unknown'}.pdf"
         try:
-            generate_property_report(lead, pdf_path)
+            [(pdf_path, _)] = render_briefs([lead])
         except Exception as e:
             print(f"[outreach_hunter] PDF failed {addr}: {e}")
             continue
-        body = write_email_body(lead, is_followup=False)
+        body = write_email_body(lead, is_followup=False, cached_only=True)
         subj = random.choice(SUBJECT_TEMPLATES).format(
             address=addr,
             zone=lead.get("Zone") or "your area",
         )
+        save_lead(store, lead_id, Status=SENDING_STATUS)
+        msg_id = None
         try:
             msg_id = send_email(service, email_addr, subj, body, pdf_path=pdf_path)
-            if msg_id:
-                today = datetime.now(PST).strftime("%Y-%m-%d %H:%M")
-                rows[idx]["Status"] = "Contacted_With_Brief"
-                rows[idx]["Contacted_Date"] = today
-                rows[idx]["Gmail_Thread_Id"] = msg_id
-                increment_today_sent()
-                print(f"[outreach_hunter] Sent: {addr} -> {email_addr}")
         except Exception as e:
             print(f"[outreach_hunter] Send failed {addr}: {e}")
+        if msg_id:
+            today = datetime.now(PST).strftime("%Y-%m-%d %H:%M")
+            save_lead(store, lead_id, Status="Contacted_With_Brief", Contacted_Date=today, Gmail_Thread_Id=msg_id)
+            increment_today_sent()
+            print(f"[outreach_hunter] Sent: {addr} -> {email_addr} (score {lead['Priority_Score']:.2f})")
+        else:
+            save_lead(store, lead_id, Status=lead.get("Status") or "New")
         time.sleep(random.uniform(30, 90))  # Human-mimic delay
 
-    save_leads(rows, fieldnames)
-    print("[outreach_hunter] Done. CSV updated.")
+    # The property pages (lib/leads.ts) read the CSV, so it has to carry today's statuses
+    n = store.export_csv(LEADS_CSV)
+    store.close()
+    print(f"[outreach_hunter] Done. Lead store updated and exported ({n} leads) to {LEADS_CSV}")
 
 
 if __name__ == "__main__":
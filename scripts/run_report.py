@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Run Report — per-stage timers and counters for lead_sniper.py and outreach_hunter.py.
+
+Each run writes one JSON report (default run_reports/<script>-<UTC time>.json):
+  {"script", "started_at", "finished_at", "wall_sec", "stages": {name: {"time_sec", "calls", <counters>}}}
+Stage time is summed over every entry into the stage (and over threads, for concurrent stages).
+With profile=True (--profile) the run also goes through cProfile and tracemalloc: the top
+functions by cumulative time and the top allocation sites land in the report under "profile",
+and the raw profile is saved next to it as <report>.prof for snakeviz / pstats.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+REPORT_DIR = BASE_DIR / "run_reports"
+PROFILE_TOP_N = 25
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RunReport:
+    """Timers and counters for one run, grouped by stage. Safe to update from worker threads."""
+
+    def __init__(self, script: str, profile: bool = False):
+        self.script = script
+        self.profile = profile
+        self.started_at = _utc_now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: dict[str, dict[str, float]] = {}
+        self._profile_data: dict | None = None
+        self._profiler: cProfile.Profile | None = None
+
+    def _stage(self, name: str) -> dict[str, float]:
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = {"time_sec": 0.0, "calls": 0}
+        return st
+
+    def add(self, stage: str, key: str, n: float = 1) -> None:
+        with self._lock:
+            st = self._stage(stage)
+            st[key] = st.get(key, 0) + n
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            st = self._stage(stage)
+            st["time_sec"] += seconds
+            st["calls"] += calls
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    @contextmanager
+    def profiling(self) -> Iterator[None]:
+        """cProfile + tracemalloc around the block when profile is on; otherwise a no-op."""
+        if not self.profile:
+            yield
+            return
+        tracemalloc.start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            top_alloc = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP_N]
+            tracemalloc.stop()
+            buf = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative")
+            top = []
+            for (path, line, func), (_, ncalls, tottime, cumtime, _) in sorted(
+                stats.stats.items(), key=lambda kv: kv[1][3], reverse=True,
+            )[:PROFILE_TOP_N]:
+                top.append({
+                    "function": f"{os.path.basename(path)}:{line}({func})",
+                    "calls": ncalls,
+                    "tottime_sec": round(tottime, 4),
+                    "cumtime_sec": round(cumtime, 4),
+                })
+            self._profile_data = {
+                "tracemalloc_peak_bytes": peak,
+                "top_cumulative": top,
+                "top_allocations": [
+                    {"site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size, "blocks": s.count}
+                    for s in top_alloc
+                ],
+            }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {k: (round(v, 4) if isinstance(v, float) else v) for k, v in st.items()}
+                for name, st in self.stages.items()
+            }
+        report = {
+            "script": self.script,
+            "started_at": self.started_at,
+            "finished_at": _utc_now(),
+            "wall_sec": round(time.perf_counter() - self._t0, 4),
+            "stages": stages,
+        }
+        if self._profile_data is not None:
+            report["profile"] = self._profile_data
+        return report
+
+    def write(self, path: Path | str | None = None) -> Path:
+        """Write the JSON report (atomically); the .prof file too when profiled. Returns the report path."""
+        if path is None:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            path = REPORT_DIR / f"{self.script}-{stamp}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(path.with_suffix(".prof")))
+        return path
+
+    def summary(self) -> str:
+        """One line per stage, for the end of the run log."""
+        lines = []
+        for name, st in self.to_dict()["stages"].items():
+            extra = ", ".join(f"{k}={v}" for k, v in st.items() if k not in ("time_sec", "calls"))
+            lines.append(f"{name}: {st['time_sec']:.2f}s" + (f" ({extra})" if extra else ""))
+        return "\n".join(lines)
+
+
+class NullReport(RunReport):
+    """Drop-in RunReport that records nothing (library calls outside a script run)."""
+
+    def __init__(self):
+        super().__init__("null")
+
+    def add(self, stage: str, key: str, n: float = 1) -> None:
+        pass
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+
+NULL_REPORT = NullReport()
+_current: RunReport = NULL_REPORT
+
+
+def current() -> RunReport:
+    """The report of the running script (a no-op NullReport when none is active)."""
+    return _current
+
+
+def activate(report: RunReport) -> RunReport:
+    global _current
+    _current = report
+    return report
+
+
+class TimedIter:
+    """Iterator wrapper that measures the time spent producing items (e.g. CSV parsing) and counts them."""
+
+    def __init__(self, items: Iterable):
+        self._it = iter(items)
+        self.spent = 0.0
+        self.n = 0
+
+    def __iter__(self) -> TimedIter:
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            item = next(self._it)
+        finally:
+            self.spent += time.perf_counter() - t0
+        self.n += 1
+        return item
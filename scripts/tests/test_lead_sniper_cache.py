@@ -0,0 +1,97 @@
+"""HTTP cache of lead_sniper.py against a local stand-in for seshat.datasd.org."""
+
+import json
+import time
+
+import pytest
+
+import lead_sniper as ls
+from lead_sniper_bench import serve_directory
+from run_report import NULL_REPORT, RunReport, activate
+
+ROWS = "license_id,address,zip,tier\n" + "".join(f"L{i},{i} Main St,92101,Tier 3\n" for i in range(50))
+
+
+@pytest.fixture
+def seshat(tmp_path, monkeypatch):
+    """Serve three CSVs locally and point the cache at tmp_path; yields the base url."""
+    data = tmp_path / "data"
+    data.mkdir()
+    for name in ("stro", "rubt", "permits"):
+        (data / f"{name}.csv").write_text(ROWS, encoding="utf-8")
+    monkeypatch.setattr(ls, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(ls, "CACHE_ENABLED", True)
+    monkeypatch.setattr(ls, "RATE_LIMIT_PER_SEC", 1e9)
+    monkeypatch.setattr(ls, "RATE_LIMIT_BURST", 1_000_000)
+    monkeypatch.setattr(ls, "_CACHE_PINNED", set())
+    server, base = serve_directory(data)
+    report = activate(RunReport("test"))
+    try:
+        yield base, report
+    finally:
+        activate(NULL_REPORT)
+        server.shutdown()
+        server.server_close()
+
+
+def _meta(url):
+    return json.loads(ls._cache_paths(url)[1].read_text(encoding="utf-8"))
+
+
+def test_revalidated_entry_is_a_304_hit(seshat):
+    base, report = seshat
+    url = f"{base}/stro.csv"
+    assert len(ls.fetch_csv(url)) == 50
+    downloaded = report.stages["fetch"]["bytes_downloaded"]
+    assert "cache_hits" not in report.stages["fetch"]
+
+    rows = ls.fetch_csv(url)
+
+    assert len(rows) == 50 and rows[0]["address"] == "0 Main St"
+    assert report.stages["fetch"]["cache_hits"] == 1
+    assert report.stages["fetch"]["bytes_downloaded"] == downloaded
+
+
+def test_entry_past_ttl_is_downloaded_again(seshat, monkeypatch):
+    base, report = seshat
+    url = f"{base}/stro.csv"
+    ls.fetch_csv(url)
+    meta_path = ls._cache_paths(url)[1]
+    meta = _meta(url)
+    meta["validated_at"] = time.time() - ls.CACHE_TTL_SEC - 1
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    monkeypatch.setattr(ls, "_CACHE_PINNED", set())  # As in a later run
+
+    assert len(ls.fetch_csv(url)) == 50
+
+    assert "cache_hits" not in report.stages["fetch"]
+    assert report.stages["fetch"]["bytes_downloaded"] == 2 * len(ROWS)
+    assert _meta(url)["validated_at"] > meta["validated_at"]
+
+
+def test_size_cap_never_evicts_bodies_in_use(seshat, monkeypatch):
+    base, _ = seshat
+    monkeypatch.setattr(ls, "CACHE_MAX_BYTES", 1)
+    registry = ls.DatasetRegistry()
+    try:
+        registry.prefetch([f"{base}/stro.csv", f"{base}/rubt.csv", f"{base}/permits.csv"])
+        # Every body fetched this run is still readable, although the cache is over its cap
+        for name in ("stro", "rubt", "permits"):
+            assert len(list(registry.rows(f"{base}/{name}.csv"))) == 50
+        assert len(ls.fetch_csv(f"{base}/rubt.csv")) == 50
+    finally:
+        registry.close()
+
+
+def test_size_cap_evicts_entries_from_earlier_runs(seshat, monkeypatch):
+    base, _ = seshat
+    for name in ("stro", "rubt"):
+        ls.fetch_csv(f"{base}/{name}.csv")
+    monkeypatch.setattr(ls, "_CACHE_PINNED", set())  # Next run
+    monkeypatch.setattr(ls, "CACHE_MAX_BYTES", len(ROWS))
+
+    assert len(ls.fetch_csv(f"{base}/permits.csv")) == 50
+
+    assert not ls._cache_paths(f"{base}/stro.csv")[0].exists()
+    assert not ls._cache_paths(f"{base}/rubt.csv")[0].exists()
+    assert ls._cache_paths(f"{base}/permits.csv")[0].exists()
@@ -0,0 +1,39 @@
+"""Cross-source duplicate merging (merge_duplicate_leads) of lead_sniper.py."""
+
+import pytest
+
+import lead_sniper as ls
+
+
+def _lead(address, lead_type, zip_code="", name="Jane Doe"):
+    return {"Name": name, "Address": address, "Zone": "", "Lead_Type": lead_type, "Email": "", "Status": "New", "Zip": zip_code}
+
+
+@pytest.mark.parametrize("first_is_permit", [True, False])
+def test_zipless_permit_fuzzy_merges_with_a_stro_lead(first_is_permit):
+    permit = _lead("4550 Misson Blvd", "ADU_Permit")
+    stro = _lead("4550 Mission Boulevard", "STRO_Tier3", "92109")
+    merged, matches = ls.merge_duplicate_leads([permit, stro] if first_is_permit else [stro, permit])
+    assert len(merged) == 1 and len(matches) == 1
+    assert set(merged[0]["Lead_Type"].split(ls.LEAD_TYPE_SEP)) == {"ADU_Permit", "STRO_Tier3"}
+    assert 0.8 <= matches[0].score < 1.0
+
+
+def test_zipless_permit_is_not_merged_across_streets_or_house_numbers():
+    leads = [
+        _lead("4550 Mission Blvd", "STRO_Tier3", "92109"),
+        _lead("4550 Garnet Ave", "ADU_Permit"),
+        _lead("4552 Mission Blvd", "ADU_Permit"),
+    ]
+    merged, matches = ls.merge_duplicate_leads(leads)
+    assert len(merged) == 3 and not matches
+
+
+def test_zipped_leads_in_different_zips_stay_apart():
+    merged, _ = ls.merge_duplicate_leads([
+        _lead("100 Main St", "STRO_Tier3", "92109"),
+        _lead("100 Main Street", "RUBT_Landlord", "92101", name="Bob Roe"),
+        _lead("100 Mian St", "RUBT_Landlord", "92101", name="Bob Roe"),
+    ])
+    # The exact canonical match merges regardless of zip; the misspelling only within its own zip
+    assert [m["Lead_Type"] for m in merged] == ["STRO_Tier3+RUBT_Landlord", "RUBT_Landlord"]
@@ -0,0 +1,72 @@
+"""--record / --replay: replay is an offline dry run that gives the same counts every time."""
+
+import re
+
+import pytest
+
+import lead_sniper as ls
+from lead_sniper_bench import serve_directory, write_synthetic_datasets
+
+COUNT_RE = re.compile(r"^\[lead_sniper\] (.+?): (\d+) new of (\d+)$|^\[lead_sniper\] (Replay done|Done)\D*(\d+) new", re.M)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """lead_sniper rooted in tmp_path, reading synthetic datasets from a local server."""
+    data = tmp_path / "data"
+    data.mkdir()
+    write_synthetic_datasets(data, rows=300)
+    server, base = serve_directory(data)
+    monkeypatch.chdir(tmp_path)  # main() moves to BASE_DIR; restore the cwd afterwards
+    root = tmp_path / "repo"
+    root.mkdir()
+    for name, value in {
+        "BASE_DIR": root, "OUTPUT_CSV": root / "leads_crm.csv", "LEADS_DB": root / "leads_crm.db",
+        "WATERMARK_DIR": root / ".lead_sniper_state", "CACHE_DIR": root / ".lead_sniper_cache",
+        "COLUMNAR_DIR": root / ".lead_sniper_columnar", "TPA_GEOJSON": root / "none.geojson",
+        "URL_STRO": f"{base}/stro.csv", "URL_RUBT": f"{base}/rubt.csv",
+        "URL_PERMITS_CLOSED": f"{base}/permits_closed.csv",
+        "RATE_LIMIT_PER_SEC": 1e9, "RATE_LIMIT_BURST": 1_000_000, "_CACHE_PINNED": set(), "SNAPSHOT": None,
+    }.items():
+        monkeypatch.setattr(ls, name, value)
+    monkeypatch.setattr(ls, "_TPA_INDEX_LOADED", False)
+    yield root, server
+    server.shutdown()
+    server.server_close()
+
+
+def _run(capsys, tmp_path, *argv):
+    ls.main([*argv, "--report", str(tmp_path / "report.json")])
+    return [m.group(0) for m in COUNT_RE.finditer(capsys.readouterr().out)]
+
+
+def _tree(root):
+    return {p.relative_to(root): p.read_bytes() for p in root.rglob("*") if p.is_file() and "snapshot" not in str(p)}
+
+
+def test_replay_is_offline_deterministic_and_writes_nothing(workspace, tmp_path, capsys):
+    root, server = workspace
+    snapshot = tmp_path / "snapshot"
+    recorded = _run(capsys, tmp_path, "--record", str(snapshot))
+    before = _tree(root)
+    server.shutdown()  # Replay must not need the network
+
+    first = _run(capsys, tmp_path, "--replay", str(snapshot))
+    second = _run(capsys, tmp_path, "--replay", str(snapshot))
+
+    assert first == second
+    # Same counts as the recorded run, which started from an empty store with a full scan
+    assert first[:-1] == recorded[:-1] and first[-1].startswith("[lead_sniper] Replay done")
+    assert any(not line.endswith(" 0 new of 0") for line in first[:-1])
+    assert _tree(root) == before
+
+
+def test_replay_ignores_watermarks_of_earlier_runs(workspace, tmp_path, capsys):
+    snapshot = tmp_path / "snapshot"
+    recorded = _run(capsys, tmp_path, "--record", str(snapshot))
+    incremental = _run(capsys, tmp_path)  # Everything unchanged: 0 new
+    assert all(" 0 new of 0" in line for line in incremental[:-1])
+
+    replayed = _run(capsys, tmp_path, "--replay", str(snapshot))
+
+    assert replayed[:-1] == recorded[:-1]
@@ -0,0 +1,86 @@
+"""Incremental runs: the row watermark is invalidated by rule changes, not only by new rows."""
+
+import json
+
+import pytest
+
+import lead_sniper as ls
+from lead_sniper_bench import serve_directory
+
+# Two STRO rows outside every TPA zip; the first lies inside the test polygon
+STRO = (
+    "license_id,address,zip,tier,host_contact_name,latitude,longitude\n"
+    "L1,1 Main St,92037,Tier 4,Host 1,32.75,-117.15\n"
+    "L2,2 Main St,92037,Tier 4,Host 2,32.90,-117.00\n"
+)
+SQUARE = {"type": "Polygon", "coordinates": [[[-117.2, 32.7], [-117.1, 32.7], [-117.1, 32.8], [-117.2, 32.8], [-117.2, 32.7]]]}
+
+
+@pytest.fixture
+def stro(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "stro.csv").write_text(STRO, encoding="utf-8")
+    server, base = serve_directory(data)
+    monkeypatch.setattr(ls, "URL_STRO", f"{base}/stro.csv")
+    monkeypatch.setattr(ls, "CACHE_ENABLED", False)
+    monkeypatch.setattr(ls, "RATE_LIMIT_PER_SEC", 1e9)
+    monkeypatch.setattr(ls, "RATE_LIMIT_BURST", 1_000_000)
+    monkeypatch.setattr(ls, "WATERMARK_DIR", tmp_path / "state")
+    monkeypatch.setattr(ls, "TPA_GEOJSON", tmp_path / "tpa.geojson")
+    _reload_tpa(monkeypatch)
+    yield tmp_path
+    server.shutdown()
+    server.server_close()
+
+
+def _reload_tpa(monkeypatch):
+    monkeypatch.setattr(ls, "_TPA_INDEX", None)
+    monkeypatch.setattr(ls, "_TPA_INDEX_LOADED", False)
+
+
+def _incremental_run(rules=(ls.RULE_STRO_TPA,)):
+    """One run_rules pass over STRO with its watermark, saved as run() does; returns (tpa leads, watermark)."""
+    wm = ls.DatasetWatermark("stro")
+    registry = ls.DatasetRegistry()
+    try:
+        buckets = ls.run_rules(registry, list(rules), {"stro": wm})
+    finally:
+        registry.close()
+    wm.save()
+    return buckets["tpa"], wm
+
+
+def test_unchanged_rows_are_skipped(stro):
+    leads, wm = _incremental_run()
+    assert leads == [] and wm.inserted == 2
+
+    leads, wm = _incremental_run()
+    assert wm.unchanged == 2 and wm.inserted == wm.updated == 0
+
+
+def test_adding_tpa_polygons_retests_unchanged_rows(stro, monkeypatch):
+    _incremental_run()
+    (stro / "tpa.geojson").write_text(json.dumps(SQUARE), encoding="utf-8")
+    _reload_tpa(monkeypatch)
+
+    leads, wm = _incremental_run()
+
+    assert wm.unchanged == 0 and wm.updated == 2
+    assert [(l["Address"], l["Match"]) for l in leads] == [("1 Main St", "tpa_polygon")]
+
+
+def test_tpa_zip_change_retests_unchanged_rows(stro, monkeypatch):
+    _incremental_run()
+    monkeypatch.setattr(ls, "TPA_ZIPS", ls.TPA_ZIPS | {"92037"})
+
+    leads, wm = _incremental_run()
+
+    assert wm.unchanged == 0
+    assert sorted(l["Address"] for l in leads) == ["1 Main St", "2 Main St"]
+
+
+def test_new_rule_retests_unchanged_rows(stro):
+    _incremental_run()
+    leads, wm = _incremental_run((ls.RULE_STRO_TPA, ls.RULE_STRO_TIER3))
+    assert wm.unchanged == 0
@@ -0,0 +1,127 @@
+"""Address canonicalization, the dedupe index and CSV sync of lead_store.py."""
+
+import csv
+import sqlite3
+
+import pytest
+
+from lead_store import LEAD_FIELDS, AddressIndex, LeadStore, address_hash, canonical_address, key_hash
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("123 MAIN STREET #A", "123 main st"),
+    ("123 Main St. Apt 4", "123 main st"),
+    ("123 Main St Suite 200", "123 main st"),
+    ("123 Main #A", "123 main"),
+    ("55 W Lot St #3", "55 w lot st"),
+    ("12 Space Way Unit 5", "12 space way"),
+    ("100 Suite Rd", "100 suite rd"),
+    ("4 North Lot Ave", "4 n lot ave"),
+    ("123 Main St Apt", "123 main st apt"),
+    ("5 Via De La Valle Ste 200", "5 via de la valle"),
+    ("5 Via De La Valle Apt B", "5 via de la valle"),
+    ("12 Unit 5", "12 unit 5"),
+    ("7 Camino Del Unit", "7 camino del unit"),
+])
+def test_canonical_address(raw, key):
+    assert canonical_address(raw) == key
+    assert canonical_address(key) == key
+
+
+def test_canonical_address_keep_unit():
+    assert canonical_address("55 W Lot St #3", keep_unit=True) == "55 w lot st unit 3"
+    assert canonical_address("5 Via De La Valle Ste 200", keep_unit=True) == "5 via de la valle unit 200"
+    assert canonical_address("100 Suite Rd", keep_unit=True) == "100 suite rd"
+
+
+def test_street_names_with_unit_words_stay_distinct():
+    assert canonical_address("55 W Lot St") != canonical_address("55 W Main St")
+    assert canonical_address("12 Unit Rd") == "12 unit rd"
+
+
+def test_trailing_unit_without_a_street_suffix_matches_the_bare_address():
+    assert address_hash("5 Via De La Valle Ste 200") == address_hash("5 Via De La Valle")
+
+
+def test_address_index_takes_canonical_keys():
+    index = AddressIndex([address_hash("123 Main Street #A")])
+    assert canonical_address("123 MAIN ST") in index
+    assert "123 main st" in index and "124 main st" not in index
+    index.add("124 main st")
+    assert "124 main st" in index and len(index) == 2
+    assert key_hash("123 main st") == address_hash("123 Main St Apt 9")
+
+
+def test_migration_rekeys_rows_with_the_current_canonical_form(tmp_path):
+    db = tmp_path / "leads.db"
+    LeadStore(db, bootstrap=False).close()
+    conn = sqlite3.connect(db)
+    # v2 keyed "55 W Lot St #3" as "55 w" (unit word after the directional)
+    conn.execute(
+        "INSERT INTO leads (address_key, address_hash, Address, created_at, updated_at) VALUES (?, ?, ?, '', '')",
+        ("55 w", key_hash("55 w"), "55 W Lot St #3"),
+    )
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+
+    with LeadStore(db, bootstrap=False) as store:
+        assert store.conn.execute("SELECT address_key FROM leads").fetchone()[0] == "55 w lot st"
+        assert store.has_address("55 W Lot Street")
+        assert not store.has_address("55 W Elm St")
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=LEAD_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _lead(store, address):
+    return next(l for l in store.iter_leads() if canonical_address(l["Address"]) == canonical_address(address))
+
+
+def test_csv_edits_sync_into_an_existing_store(tmp_path):
+    db, csv_path = tmp_path / "leads.db", tmp_path / "leads.csv"
+    _write_csv(csv_path, [{"Address": "1 Main St", "Name": "Unknown", "Status": "New"}])
+    with LeadStore(db, csv_path=csv_path) as store:
+        assert store.count() == 1
+        store.export_csv(csv_path)
+
+    _write_csv(csv_path, [
+        {"Address": "1 Main Street", "Name": "Ann", "Email": "ann@example.com", "Status": "Do_Not_Contact"},
+        {"Address": "2 Main St", "Status": "New"},
+    ])
+    with LeadStore(db, csv_path=csv_path) as store:
+        lead = _lead(store, "1 Main St")
+        assert (lead["Name"], lead["Email"], lead["Status"]) == ("Ann", "ann@example.com", "Do_Not_Contact")
+        assert store.count() == 2
+        assert len(store.find(with_email=True)) == 1
+        assert store.sync_csv(csv_path) is None  # Unchanged since the sync
+
+
+def test_stale_csv_never_reverts_a_status_changed_in_the_store(tmp_path):
+    db, csv_path = tmp_path / "leads.db", tmp_path / "leads.csv"
+    _write_csv(csv_path, [{"Address": "1 Main St", "Status": "New"}])
+    with LeadStore(db, csv_path=csv_path) as store:
+        store.conn.execute("UPDATE leads SET updated_at = '2000-01-01T00:00:00Z'")  # Synced long ago
+        store.conn.execute("UPDATE csv_sync SET synced_at = '2000-01-01T00:00:01Z'")
+        store.conn.commit()
+        store.update_lead(_lead(store, "1 Main St")["id"], Status="Contacted_With_Brief")
+
+    # Email added to the old copy, whose Status still says New
+    _write_csv(csv_path, [{"Address": "1 Main St", "Email": "a@example.com", "Status": "New"}])
+    with LeadStore(db, csv_path=csv_path) as store:
+        lead = _lead(store, "1 Main St")
+        assert (lead["Email"], lead["Status"]) == ("a@example.com", "Contacted_With_Brief")
+
+
+def test_import_without_a_previous_sync_keeps_stored_statuses(tmp_path):
+    db, csv_path = tmp_path / "leads.db", tmp_path / "leads.csv"
+    with LeadStore(db, bootstrap=False) as store:
+        store.insert_leads([{"Address": "1 Main St", "Status": "Contacted_With_Brief"}])
+        _write_csv(csv_path, [{"Address": "1 Main St", "Email": "a@example.com", "Status": "New"}])
+        assert store.import_csv(csv_path) == (0, 1)
+        lead = _lead(store, "1 Main St")
+        assert (lead["Email"], lead["Status"]) == ("a@example.com", "Contacted_With_Brief")
@@ -0,0 +1,106 @@
+"""LLM draft cache and pre-generation of outreach_hunter.py against a local OpenAI-compatible stub."""
+
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+import outreach_hunter as oh
+
+
+class StubLLM(http.server.ThreadingHTTPServer):
+    """POST /chat/completions: counts requests and the peak number in flight; answers after `delay`."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        stub = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with stub.lock:
+            stub.requests += 1
+            stub.in_flight += 1
+            stub.peak = max(stub.peak, stub.in_flight)
+        time.sleep(stub.delay)
+        with stub.lock:
+            stub.in_flight -= 1
+        body = json.dumps({"choices": [{"message": {"content": f"Draft: {payload['messages'][1]['content']}"}}]})
+        self.send_response(200 if self.path == "/v1/chat/completions" else 404)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    stub = StubLLM()
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{stub.server_port}/v1"
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", base)
+    # LLM_URL is derived from OPENAI_BASE_URL at import time
+    monkeypatch.setattr(oh, "LLM_URL", base + "/chat/completions")
+    monkeypatch.setattr(oh, "DRAFT_CACHE_DIR", tmp_path / "drafts")
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def _lead(i: int) -> dict:
+    return {"Name": f"Owner {i}", "Address": f"{i} Main St", "Zone": "TPA_92101"}
+
+
+def test_draft_is_generated_once_then_served_from_cache(llm):
+    first = oh.write_email_body(_lead(1))
+    second = oh.write_email_body(_lead(1))
+
+    assert first.startswith("Draft: Email to Owner 1 about 1 Main St")
+    assert second == first
+    assert llm.requests == 1
+
+
+def test_expired_draft_is_generated_again(llm):
+    oh.write_email_body(_lead(1))
+    [entry_path] = oh.DRAFT_CACHE_DIR.glob("*.json")
+    entry = json.loads(entry_path.read_text(encoding="utf-8"))
+    entry["created"] = time.time() - oh.DRAFT_TTL_SEC - 1
+    entry_path.write_text(json.dumps(entry), encoding="utf-8")
+
+    oh.write_email_body(_lead(1))
+
+    assert llm.requests == 2
+
+
+def test_pregenerate_bounds_concurrent_requests(llm):
+    llm.delay = 0.1
+    jobs = [(_lead(i), False) for i in range(10)] + [(_lead(0), False), (_lead(0), True)]
+
+    generated = oh.pregenerate_drafts(jobs, workers=3)
+
+    assert generated == llm.requests == 11  # The repeated job is generated once
+    assert 2 <= llm.peak <= 3
+    assert oh.pregenerate_drafts(jobs, workers=3) == 0 and llm.requests == 11  # All cached now
+
+
+def test_cached_only_never_calls_the_endpoint(llm):
+    template = oh.write_email_body(_lead(2), cached_only=True)
+
+    assert llm.requests == 0
+    assert template.startswith("Hi Owner 2,") and "2 Main St" in template
+
+    oh.pregenerate_drafts([(_lead(2), False)])
+    assert llm.requests == 1
+    assert oh.write_email_body(_lead(2), cached_only=True).startswith("Draft: ")
+    assert llm.requests == 1
@@ -0,0 +1,191 @@
+"""Bulk Gmail reply checks of outreach_hunter.py against a fake Gmail service."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import outreach_hunter as oh
+from lead_store import LeadStore
+
+
+class FakeHttpError(Exception):
+    """Shaped like googleapiclient.errors.HttpError: the status is on .resp.status."""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class _Call:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, gmail, callback):
+        self._gmail, self._callback, self._calls = gmail, callback, []
+
+    def add(self, call, request_id):
+        self._calls.append((call, request_id))
+
+    def execute(self):
+        self._gmail.batches += 1
+        for call, request_id in self._calls:
+            try:
+                response, exc = call.execute(), None
+            except Exception as e:
+                response, exc = None, e
+            self._callback(request_id, response, exc)
+
+
+class FakeGmail:
+    """
+    threads: {thread id: [label lists, one per message]}; history: pages of history.list records
+    (any start id at or after `history_floor` is accepted); errors: {thread id: HTTP status}.
+    """
+
+    def __init__(self, threads=None, history_pages=(), history_id="900", history_floor=0, errors=None):
+        self.thread_labels = threads or {}
+        self.history_pages = list(history_pages)
+        self.history_id = history_id
+        self.history_floor = history_floor
+        self.errors = errors or {}
+        self.thread_gets = []
+        self.history_calls = []
+        self.batches = 0
+
+    # service.users().<resource>() chain
+    def users(self):
+        return self
+
+    def threads(self):
+        return self
+
+    def history(self):
+        return self
+
+    def getProfile(self, userId):
+        return _Call(lambda: {"historyId": self.history_id})
+
+    def get(self, userId, id, format):
+        def run():
+            self.thread_gets.append(id)
+            if id in self.errors:
+                raise FakeHttpError(self.errors[id])
+            return {"id": id, "messages": [{"labelIds": labels} for labels in self.thread_labels[id]]}
+        return _Call(run)
+
+    def list(self, userId, startHistoryId, historyTypes, pageToken=None):
+        def run():
+            self.history_calls.append((startHistoryId, pageToken))
+            if int(startHistoryId) < self.history_floor:
+                raise FakeHttpError(404)
+            page = int(pageToken or 0)
+            resp = {"history": self.history_pages[page], "historyId": self.history_id}
+            if page + 1 < len(self.history_pages):
+                resp["nextPageToken"] = str(page + 1)
+            return resp
+        return _Call(run)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+
+def _added(thread_id, *labels):
+    return {"messagesAdded": [{"message": {"threadId": thread_id, "labelIds": list(labels)}}]}
+
+
+SENT = ["SENT"]
+REPLY = ["INBOX", "UNREAD"]
+
+
+@pytest.fixture
+def state_file(tmp_path, monkeypatch):
+    path = tmp_path / "gmail_state.json"
+    monkeypatch.setattr(oh, "GMAIL_STATE_FILE", path)
+    return path
+
+
+def _state(path):
+    return json.loads(path.read_text())
+
+
+def test_batch_path_without_saved_history(state_file, monkeypatch):
+    monkeypatch.setattr(oh, "GMAIL_BATCH_SIZE", 2)
+    gmail = FakeGmail(threads={"t1": [SENT, REPLY], "t2": [SENT], "t3": [SENT, SENT], "t4": [SENT, ["DRAFT"]]})
+
+    replied, unknown, gone = oh.replied_threads(gmail, {"t1", "t2", "t3", "t4"})
+
+    assert (replied, unknown, gone) == ({"t1"}, set(), set())
+    assert gmail.batches == 2 and sorted(gmail.thread_gets) == ["t1", "t2", "t3", "t4"]
+    assert _state(state_file) == {"history_id": "900", "retry_threads": []}
+
+
+def test_paged_history_ignores_our_own_sends(state_file):
+    state_file.write_text(json.dumps({"history_id": "500"}))
+    gmail = FakeGmail(history_id="777", history_pages=[
+        [_added("t1", *SENT), _added("other", *REPLY)],  # Our follow-up; a thread we never contacted
+        [_added("t2", *REPLY)],
+    ])
+
+    replied, unknown, gone = oh.replied_threads(gmail, {"t1", "t2", "t3"})
+
+    assert (replied, unknown, gone) == ({"t2"}, set(), set())
+    assert gmail.history_calls == [("500", None), ("500", "1")]
+    assert gmail.thread_gets == []
+    assert _state(state_file)["history_id"] == "777"
+
+
+def test_expired_history_falls_back_to_batch(state_file):
+    state_file.write_text(json.dumps({"history_id": "5"}))
+    gmail = FakeGmail(threads={"t1": [SENT, REPLY], "t2": [SENT]}, history_floor=100, history_id="901")
+
+    replied, unknown, gone = oh.replied_threads(gmail, {"t1", "t2"})
+
+    assert (replied, unknown, gone) == ({"t1"}, set(), set())
+    assert sorted(gmail.thread_gets) == ["t1", "t2"]
+    assert _state(state_file)["history_id"] == "901"
+
+
+def test_failed_thread_does_not_block_the_history_id(state_file):
+    gmail = FakeGmail(threads={"t1": [SENT], "t2": [SENT]}, errors={"t2": 500, "gone": 404}, history_id="900")
+
+    replied, unknown, gone = oh.replied_threads(gmail, {"t1", "t2", "gone"})
+
+    assert (replied, unknown, gone) == (set(), {"t2"}, {"gone"})
+    assert _state(state_file) == {"history_id": "900", "retry_threads": ["t2"]}
+
+    # Next run: history since 900, plus a direct check of the thread that failed
+    gmail = FakeGmail(threads={"t1": [SENT], "t2": [SENT, REPLY]}, history_pages=[[]], history_id="950")
+    replied, unknown, gone = oh.replied_threads(gmail, {"t1", "t2"})
+
+    assert (replied, unknown, gone) == ({"t2"}, set(), set())
+    assert gmail.history_calls == [("900", None)] and gmail.thread_gets == ["t2"]
+    assert _state(state_file) == {"history_id": "950", "retry_threads": []}
+
+
+def test_followups_skip_replied_failed_and_deleted_threads(state_file, tmp_path):
+    contacted = (datetime.now(oh.PST) - timedelta(days=5)).strftime("%Y-%m-%d")
+    with LeadStore(tmp_path / "leads.db", bootstrap=False) as store:
+        store.insert_leads(
+            {"Name": f"Owner {t}", "Address": f"{i} Main St", "Email": f"{t}@example.com", "Status": "Contacted_With_Brief",
+             "Contacted_Date": contacted, "Gmail_Thread_Id": t}
+            for i, t in enumerate(("quiet", "replied", "failing", "deleted"), start=1)
+        )
+        gmail = FakeGmail(
+            threads={"quiet": [SENT], "replied": [SENT, REPLY], "failing": [SENT]},
+            errors={"failing": 503, "deleted": 404},
+        )
+
+        due = oh.get_followup_leads(oh.load_followup_candidates(store), service=gmail, store=store)
+
+        assert [lead["Gmail_Thread_Id"] for _, lead in due] == ["quiet"]
+        statuses = {lead["Gmail_Thread_Id"]: lead["Status"] for lead in store.find()}
+        assert statuses == {
+            "quiet": "Contacted_With_Brief", "replied": "Replied",
+            "failing": "Contacted_With_Brief", "deleted": oh.THREAD_GONE_STATUS,
+        }
@@ -0,0 +1,64 @@
+"""Initial outreach send loop of outreach_hunter.py, with Gmail and the PDF renderer faked."""
+
+import argparse
+
+import pytest
+
+import outreach_hunter as oh
+from lead_store import LeadStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    db = tmp_path / "leads.db"
+    with LeadStore(db, bootstrap=False) as s:
+        s.insert_leads(
+            {"Address": f"{n} Main St", "Zone": "Pacific Beach", "Lead_Type": "STRO_Tier3", "Email": f"owner{n}@example.com"}
+            for n in range(1, 8)
+        )
+    monkeypatch.setattr(oh, "LEADS_DB", db)
+    monkeypatch.setattr(oh, "LEADS_CSV", tmp_path / "leads.csv")
+    monkeypatch.setattr(oh, "DAILY_COUNTER_FILE", tmp_path / "count.json")
+    monkeypatch.setattr(oh, "open_store", lambda: LeadStore(db, bootstrap=False))
+    monkeypatch.setattr(oh, "HAS_REPORTLAB", True)
+    monkeypatch.setattr(oh, "HAS_GMAIL", True)
+    monkeypatch.setattr(oh, "is_within_send_window", lambda: True)
+    monkeypatch.setattr(oh, "get_gmail_service", lambda: object())
+    monkeypatch.setattr(oh, "get_followup_leads", lambda rows, service, store=None: [])
+    monkeypatch.setattr(oh, "pregenerate_drafts", lambda jobs: 0)
+    monkeypatch.setattr(oh.time, "sleep", lambda s: None)
+    return db
+
+
+def test_failed_candidate_is_replaced_by_the_next_best(store, tmp_path, monkeypatch):
+    sent = []
+
+    def render_briefs(leads):
+        if leads[0]["Address"] == "2 Main St":
+            raise RuntimeError("bad font")
+        return [(tmp_path / "brief.pdf", leads[0])]
+
+    def send_email(service, to, subject, body, pdf_path=None):
+        sent.append(to)
+        return f"thread-{len(sent)}"
+
+    monkeypatch.setattr(oh, "render_briefs", render_briefs)
+    monkeypatch.setattr(oh, "send_email", send_email)
+    oh.run(argparse.Namespace(dry_run=False, command=None))
+
+    assert sent == [f"owner{n}@example.com" for n in (1, 3, 4, 5, 6)]
+    with LeadStore(store, bootstrap=False) as s:
+        contacted = s.find(statuses=("Contacted_With_Brief",))
+        assert sorted(l["Address"] for l in contacted) == [f"{n} Main St" for n in (1, 3, 4, 5, 6)]
+        assert [l["Address"] for l in s.find(statuses=("New",))] == ["2 Main St", "7 Main St"]
+
+
+def test_lazy_candidates_match_the_top_k_order():
+    rows = [
+        {"id": n, "Address": f"{n} Main St", "Zone": zone, "Lead_Type": "STRO_Tier3", "Email": "a@example.com", "Status": "New"}
+        for n, zone in enumerate(["Pacific Beach", "92101", "TPA_92103", "Pacific Beach", "92101"], start=1)
+    ]
+    lazy = [lead_id for lead_id, _ in oh.iter_initial_outreach_leads([dict(r) for r in rows])]
+    assert lazy == [lead_id for lead_id, _ in oh.get_initial_outreach_leads([dict(r) for r in rows])]
+    assert lazy[:3] == [lead_id for lead_id, _ in oh.get_initial_outreach_leads([dict(r) for r in rows], k=3)]
+    assert lazy[:2] == [1, 4]
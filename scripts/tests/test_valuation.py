@@ -0,0 +1,35 @@
+"""valuation.value_leads (batch) agrees with value_lead (scalar)."""
+
+import math
+import random
+
+import valuation
+
+ZONES = ("TPA_92101", "TPA_92126", "Pacific Beach / Mission Beach", "92109", "92037", "", "Downtown")
+LEAD_TYPES = ("STRO_TPA_LDC2026", "ADU_Completed_CondoSale", "RUBT_TPA_LDC2026+RUBT_Landlord", "RUBT_Landlord")
+
+
+def test_batch_matches_scalar():
+    rnd = random.Random(3)
+    leads = [
+        {
+            "Zone": rnd.choice(ZONES),
+            "Lead_Type": rnd.choice(LEAD_TYPES),
+            **({"Assessed_Value": f"{rnd.randint(4, 40) * 100_000:,}"} if i % 4 == 0 else {}),
+            **({"Zip": "92103"} if i % 9 == 0 else {}),
+        }
+        for i in range(2_000)
+    ]
+    batch = valuation.value_leads(leads)
+    for i, lead in enumerate(leads):
+        one = valuation.value_lead(lead)
+        assert batch["zip"][i] == one["zip"]
+        for key in ("value", "tax_current", "tax_proposed", "tax_increase"):
+            assert math.isclose(batch[key][i], one[key])
+        for key in ("adu_low", "adu_high"):
+            got = batch[key][i]
+            assert (one[key] is None and (got is None or math.isnan(got))) or got == one[key]
+
+
+def test_empty_batch():
+    assert all(len(col) == 0 for col in valuation.value_leads([]).values())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+TPA Index — Transit Priority Area membership by point-in-polygon, for lead_sniper.py.
+
+Loads TPA polygons from a GeoJSON file (WGS84 lon/lat, as exported by data.sandiego.gov)
+and answers contains(lon, lat) through a uniform grid:
+  - a cell entirely inside a polygon answers True with no geometry test,
+  - a cell on a boundary lists only the polygons crossing it,
+  - each polygon is "prepared": its edges are bucketed into horizontal bands, so the
+    ray-casting test only visits the few edges in the point's band.
+Holes (inner rings) and MultiPolygons are supported (even-odd rule across all rings).
+Pure Python, no geometry dependencies.
+
+Usage:
+  python scripts/tpa_index.py data/transit_priority_areas.geojson
+  python scripts/tpa_index.py data/transit_priority_areas.geojson --point 32.7157 -117.1611
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+GRID_CELL_DEG = 0.005  # ~500 m cells over San Diego
+EDGES_PER_BAND = 4     # Band count per polygon ~ edges / EDGES_PER_BAND (capped at MAX_BANDS)
+MAX_BANDS = 4096
+
+Ring = Sequence[Sequence[float]]  # [(lon, lat), ...], closed or not
+
+
+class PreparedPolygon:
+    """One polygon (outer ring + holes) with its edges bucketed into horizontal bands for ray casting."""
+
+    def __init__(self, rings: Sequence[Ring], name: str = ""):
+        self.name = name
+        edges = []
+        for ring in rings:
+            pts = [(float(p[0]), float(p[1])) for p in ring]
+            if len(pts) < 3:
+                continue
+            for (x1, y1), (x2, y2) in zip(pts, pts[1:] + pts[:1]):
+                if y1 != y2:  # Horizontal edges never cross a horizontal ray
+                    edges.append((x1, y1, x2, y2))
+        xs = [p[0] for ring in rings for p in ring]
+        ys = [p[1] for ring in rings for p in ring]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys)) if xs else (0.0, 0.0, -1.0, -1.0)
+        self.edges = edges
+        n_bands = max(1, min(len(edges) // EDGES_PER_BAND, MAX_BANDS))
+        self._y0 = self.bbox[1]
+        self._band_h = ((self.bbox[3] - self.bbox[1]) / n_bands) or 1.0
+        self._bands: list[list[tuple[float, float, float, float]]] = [[] for _ in range(n_bands)]
+        for e in edges:
+            lo, hi = self._band(min(e[1], e[3])), self._band(max(e[1], e[3]))
+            for b in range(lo, hi + 1):
+                self._bands[b].append(e)
+
+    def _band(self, y: float) -> int:
+        return min(max(int((y - self._y0) / self._band_h), 0), len(self._bands) - 1)
+
+    def contains(self, x: float, y: float) -> bool:
+        min_x, min_y, max_x, max_y = self.bbox
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        inside = False
+        for x1, y1, x2, y2 in self._bands[self._band(y)]:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+
+class TpaIndex:
+    """Uniform grid over prepared TPA polygons. contains(lon, lat) is True inside any polygon."""
+
+    def __init__(self, polygons: Iterable[PreparedPolygon], cell_deg: float = GRID_CELL_DEG):
+        self.polygons = [p for p in polygons if p.edges]
+        self.cell = cell_deg
+        if self.polygons:
+            self.bbox = (
+                min(p.bbox[0] for p in self.polygons), min(p.bbox[1] for p in self.polygons),
+                max(p.bbox[2] for p in self.polygons), max(p.bbox[3] for p in self.polygons),
+            )
+        else:
+            self.bbox = (0.0, 0.0, -1.0, -1.0)
+        # (col, row) -> True (inside some polygon) or tuple of polygon ids to test
+        self._cells: dict[tuple[int, int], bool | tuple[int, ...]] = {}
+        candidates: dict[tuple[int, int], list[int]] = {}
+        for pid, poly in enumerate(self.polygons):
+            # Cells an edge may pass through (edge bbox, conservative) need the exact test
+            boundary = set()
+            for x1, y1, x2, y2 in poly.edges:
+                c0, r0 = self._key(min(x1, x2), min(y1, y2))
+                c1, r1 = self._key(max(x1, x2), max(y1, y2))
+                boundary.update((c, r) for c in range(c0, c1 + 1) for r in range(r0, r1 + 1))
+            c0, r0 = self._key(poly.bbox[0], poly.bbox[1])
+            c1, r1 = self._key(poly.bbox[2], poly.bbox[3])
+            for c in range(c0, c1 + 1):
+                for r in range(r0, r1 + 1):
+                    key = (c, r)
+                    if self._cells.get(key) is True:
+                        continue
+                    if key in boundary:
+                        candidates.setdefault(key, []).append(pid)
+                    elif poly.contains((c + 0.5) * self.cell, (r + 0.5) * self.cell):
+                        self._cells[key] = True  # No edge in the cell: all of it is inside
+        for key, pids in candidates.items():
+            if key not in self._cells:
+                self._cells[key] = tuple(pids)
+
+    def _key(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell), math.floor(y / self.cell)
+
+    def contains(self, lon: float, lat: float) -> bool:
+        entry = self._cells.get(self._key(lon, lat))
+        if entry is None:
+            return False
+        if entry is True:
+            return True
+        polygons = self.polygons
+        return any(polygons[i].contains(lon, lat) for i in entry)
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+    def stats(self) -> dict:
+        inside = sum(1 for v in self._cells.values() if v is True)
+        return {
+            "polygons": len(self.polygons),
+            "edges": sum(len(p.edges) for p in self.polygons),
+            "cells_inside": inside,
+            "cells_boundary": len(self._cells) - inside,
+        }
+
+    @classmethod
+    def from_geojson(cls, path: Path | str, cell_deg: float = GRID_CELL_DEG) -> TpaIndex:
+        """Polygon / MultiPolygon features (or bare geometries) of a GeoJSON file; other geometry types are ignored."""
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        features = doc.get("features") if doc.get("type") == "FeatureCollection" else [doc]
+        polygons = []
+        for feature in features or []:
+            geom = feature.get("geometry", feature) if feature.get("type") == "Feature" else feature
+            props = feature.get("properties") or {}
+            name = str(props.get("name") or props.get("NAME") or props.get("tpa_name") or "")
+            if not geom:
+                continue
+            if geom.get("type") == "Polygon":
+                polygons.append(PreparedPolygon(geom["coordinates"], name))
+            elif geom.get("type") == "MultiPolygon":
+                polygons.extend(PreparedPolygon(rings, name) for rings in geom["coordinates"])
+        return cls(polygons, cell_deg)
+
+
+def parse_point(lat: str, lon: str) -> tuple[float, float] | None:
+    """(lon, lat) from dataset text columns; None when missing, unparsable, out of range or (0, 0)."""
+    try:
+        y, x = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= y <= 90 and -180 <= x <= 180) or (x == 0 and y == 0):
+        return None
+    return x, y
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DoggyBagg TPA polygon index")
+    parser.add_argument("geojson", help="TPA polygons (GeoJSON, WGS84)")
+    parser.add_argument("--point", type=float, nargs=2, action="append", metavar=("LAT", "LON"), help="Test a point")
+    args = parser.parse_args()
+
+    index = TpaIndex.from_geojson(args.geojson)
+    print(", ".join(f"{k} {v:,}" for k, v in index.stats().items()))
+    for lat, lon in args.point or []:
+        print(f"{lat:.6f}, {lon:.6f}: {'in' if index.contains(lon, lat) else 'not in'} a TPA")
+
+
+if __name__ == "__main__":
+    main()
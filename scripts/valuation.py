@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Valuation — transfer-tax exit risk and ADU condo-sale estimates for DoggyBagg leads.
+
+Per-lead figures come from three columns: value (the lead's Assessed_Value when present,
+else the zip's median sale price), zip (from Zone) and whether the lead is an ADU lead.
+leads_crm.db has no Assessed_Value column (none of the Seshat datasets carries one), so
+leads from the store are always valued at their zip's median; the field is honored only
+on lead dicts that bring it (e.g. a hand-edited CSV row).
+value_leads() computes every estimate for a whole batch at once with NumPy (100k leads
+from the store in ~50 ms end to end, column building included, vs ~600 ms for value_lead
+in a loop); value_lead() is the scalar path the brief renderer uses for one lead. Both
+give the same numbers; without NumPy the batch functions fall back to loops.
+
+Usage:
+  python scripts/valuation.py --zone 92109 --lead-type ADU_Completed_CondoSale
+  python scripts/valuation.py --sweep 1000000 1500000 2000000 3000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# --- Transfer tax (same rates as app/property/[address]/property-intelligence.tsx) ---
+# Tiered tables: (lower bound of sale price, rate per $ of the whole price). A sale is taxed
+# at the rate of the highest tier it reaches. Current law and the Jan 2026 proposal are a
+# single tier each ($0.55 -> $30.55 per $500); add tiers here if the measure is amended.
+RATE_TABLE_CURRENT: tuple[tuple[float, float], ...] = ((0, 0.55 / 500),)
+RATE_TABLE_PROPOSED: tuple[tuple[float, float], ...] = ((0, 30.55 / 500),)
+
+DEFAULT_SALE_PRICE = 1_500_000
+# Planning estimates: median single-family sale price by zip (USD). A lead's Assessed_Value wins.
+ZIP_MEDIAN_VALUE = {
+    "92109": 1_500_000, "92101": 750_000, "92103": 1_300_000, "92104": 1_000_000,
+    "92105": 700_000, "92110": 1_100_000, "92111": 950_000, "92113": 650_000,
+    "92114": 750_000, "92115": 900_000, "92116": 1_000_000, "92117": 1_100_000,
+    "92126": 950_000,
+}
+# Estimated value of a separately titled ADU (low, high), by zip
+DEFAULT_ADU_RANGE = (550_000, 750_000)
+ZIP_ADU_RANGE = {
+    "92109": (550_000, 750_000), "92101": (325_000, 450_000), "92103": (500_000, 675_000),
+    "92104": (400_000, 550_000), "92105": (300_000, 425_000), "92110": (450_000, 600_000),
+    "92111": (375_000, 500_000), "92113": (275_000, 375_000), "92114": (300_000, 425_000),
+    "92115": (375_000, 500_000), "92116": (400_000, 550_000), "92117": (450_000, 600_000),
+    "92126": (375_000, 500_000),
+}
+# Zones written without a zip (lead_sniper's Priority 1 zone label)
+ZONE_ZIPS = {"pacific beach / mission beach": "92109", "pacific beach": "92109", "mission beach": "92109"}
+
+_ZIP_RE = re.compile(r"\b(\d{5})\b|_(\d{5})\b")
+
+
+def lead_zip(lead: dict) -> str:
+    """5-digit zip for a lead: Zip field, else from Zone ("TPA_92101", "92109", zone names)."""
+    zip_code = (lead.get("Zip") or "").strip()[:5]
+    if zip_code:
+        return zip_code
+    zone = (lead.get("Zone") or "").strip()
+    m = _ZIP_RE.search(zone)
+    if m:
+        return m.group(1) or m.group(2)
+    return ZONE_ZIPS.get(zone.lower(), "")
+
+
+def is_adu_lead(lead: dict) -> bool:
+    return "adu" in (lead.get("Lead_Type") or "").lower()
+
+
+def lead_value(lead: dict) -> float:
+    """Sale price to model: Assessed_Value when the lead has one, else the zip median."""
+    try:
+        value = float(str(lead.get("Assessed_Value") or "").replace(",", "").replace("$", ""))
+    except ValueError:
+        value = 0.0
+    return value if value > 0 else float(ZIP_MEDIAN_VALUE.get(lead_zip(lead), DEFAULT_SALE_PRICE))
+
+
+def adu_range(zip_code: str) -> tuple[int, int]:
+    return ZIP_ADU_RANGE.get(zip_code, DEFAULT_ADU_RANGE)
+
+
+def transfer_tax(value: float, table: Sequence[tuple[float, float]] = RATE_TABLE_CURRENT) -> float:
+    """Tax on one sale under a tiered rate table."""
+    bounds = [lo for lo, _ in table]
+    i = max(bisect_right(bounds, value) - 1, 0)
+    return value * table[i][1]
+
+
+def tax_increase(value: float) -> float:
+    """Proposed minus current transfer tax on one sale."""
+    return transfer_tax(value, RATE_TABLE_PROPOSED) - transfer_tax(value, RATE_TABLE_CURRENT)
+
+
+def value_lead(lead: dict) -> dict:
+    """Every estimate for one lead (scalar path; same numbers as value_leads)."""
+    value = lead_value(lead)
+    zip_code = lead_zip(lead)
+    current = transfer_tax(value, RATE_TABLE_CURRENT)
+    proposed = transfer_tax(value, RATE_TABLE_PROPOSED)
+    adu = adu_range(zip_code) if is_adu_lead(lead) else None
+    return {
+        "zip": zip_code,
+        "value": value,
+        "tax_current": current,
+        "tax_proposed": proposed,
+        "tax_increase": proposed - current,
+        "adu_low": adu[0] if adu else None,
+        "adu_high": adu[1] if adu else None,
+    }
+
+
+# --- Batch (columnar) path ---
+# The lead fields every estimate is derived from
+VALUATION_FIELDS = ("Zip", "Zone", "Lead_Type", "Assessed_Value")
+
+
+def lead_columns(leads: Iterable[dict]) -> dict:
+    """
+    Columns the batch functions work on: value, zip, is_adu (NumPy arrays when available).
+    Leads are factorized on VALUATION_FIELDS first, so lead_value / lead_zip / is_adu_lead run
+    once per distinct combination (a few hundred across the CRM) and are broadcast back by code.
+    """
+    uniq: dict[tuple, int] = {}
+    codes = [
+        uniq.setdefault((l.get("Zip"), l.get("Zone"), l.get("Lead_Type"), l.get("Assessed_Value")), len(uniq))
+        for l in leads
+    ]
+    distinct = [dict(zip(VALUATION_FIELDS, key)) for key in uniq]
+    values = [lead_value(d) for d in distinct]
+    zips = [lead_zip(d) for d in distinct]
+    adu = [is_adu_lead(d) for d in distinct]
+    if HAS_NUMPY:
+        idx = np.asarray(codes, dtype=np.intp)
+        return {
+            "value": np.asarray(values, dtype=np.float64)[idx],
+            "zip": np.asarray(zips, dtype="U5")[idx],
+            "is_adu": np.asarray(adu, dtype=bool)[idx],
+        }
+    return {"value": [values[c] for c in codes], "zip": [zips[c] for c in codes], "is_adu": [adu[c] for c in codes]}
+
+
+def transfer_tax_batch(values, table: Sequence[tuple[float, float]] = RATE_TABLE_CURRENT):
+    """Vectorized transfer_tax: one searchsorted over the tier bounds, any array shape."""
+    if not HAS_NUMPY:
+        return [transfer_tax(v, table) for v in values]
+    values = np.asarray(values, dtype=np.float64)
+    bounds = np.array([lo for lo, _ in table], dtype=np.float64)
+    rates = np.array([rate for _, rate in table], dtype=np.float64)
+    idx = np.clip(np.searchsorted(bounds, values, side="right") - 1, 0, None)
+    return values * rates[idx]
+
+
+def value_leads(leads: Iterable[dict] | dict) -> dict:
+    """
+    Estimates for many leads at once (accepts leads or lead_columns() output). Returns columns:
+    zip, value, tax_current, tax_proposed, tax_increase, adu_low, adu_high (NaN / None for
+    non-ADU leads), in input order.
+    """
+    cols = leads if isinstance(leads, dict) else lead_columns(leads)
+    values, zips, is_adu = cols["value"], cols["zip"], cols["is_adu"]
+    current = transfer_tax_batch(values, RATE_TABLE_CURRENT)
+    proposed = transfer_tax_batch(values, RATE_TABLE_PROPOSED)
+    if not HAS_NUMPY:
+        ranges = [adu_range(z) if a else (None, None) for z, a in zip(zips, is_adu)]
+        return {
+            "zip": zips, "value": values, "tax_current": current, "tax_proposed": proposed,
+            "tax_increase": [p - c for p, c in zip(proposed, current)],
+            "adu_low": [lo for lo, _ in ranges], "adu_high": [hi for _, hi in ranges],
+        }
+    # ADU ranges: binary search of each zip in the small table of known zips (no sort of the column)
+    known = np.array(sorted(ZIP_ADU_RANGE), dtype="U5")
+    table = np.array([ZIP_ADU_RANGE[z] for z in known] + [DEFAULT_ADU_RANGE], dtype=np.float64)
+    zips_arr = np.asarray(zips, dtype="U5")
+    pos = np.searchsorted(known, zips_arr)
+    found = known[np.minimum(pos, len(known) - 1)] == zips_arr
+    ranges = table[np.where(found, pos, len(known))]
+    ranges[~np.asarray(is_adu, dtype=bool)] = np.nan
+    return {
+        "zip": zips, "value": values, "tax_current": current, "tax_proposed": proposed,
+        "tax_increase": proposed - current, "adu_low": ranges[:, 0], "adu_high": ranges[:, 1],
+    }
+
+
+def sale_price_sweep(prices: Sequence[float]) -> dict:
+    """Scenario sweep: current/proposed tax and the increase at each sale price."""
+    current = transfer_tax_batch(prices, RATE_TABLE_CURRENT)
+    proposed = transfer_tax_batch(prices, RATE_TABLE_PROPOSED)
+    if not HAS_NUMPY:
+        return {"price": list(prices), "tax_current": current, "tax_proposed": proposed,
+                "tax_increase": [p - c for p, c in zip(proposed, current)]}
+    return {"price": np.asarray(prices, dtype=np.float64), "tax_current": current,
+            "tax_proposed": proposed, "tax_increase": proposed - current}
+
+
+def lead_price_sweep(values, multipliers: Sequence[float]):
+    """Tax increase per lead (rows) per sale-price scenario (columns: value x multiplier)."""
+    if not HAS_NUMPY:
+        return [[tax_increase(v * m) for m in multipliers] for v in values]
+    grid = np.outer(np.asarray(values, dtype=np.float64), np.asarray(multipliers, dtype=np.float64))
+    return transfer_tax_batch(grid, RATE_TABLE_PROPOSED) - transfer_tax_batch(grid, RATE_TABLE_CURRENT)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DoggyBagg transfer-tax / ADU valuation")
+    parser.add_argument("--zone", default="", help="Zone or zip, e.g. 92109 or TPA_92101")
+    parser.add_argument("--lead-type", default="")
+    parser.add_argument("--value", type=float, help="Assessed value (default: zip median)")
+    parser.add_argument("--sweep", type=float, nargs="+", metavar="PRICE", help="Sale prices to compare")
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep = sale_price_sweep(args.sweep)
+        for price, cur, prop, inc in zip(sweep["price"], sweep["tax_current"], sweep["tax_proposed"], sweep["tax_increase"]):
+            print(f"${price:>12,.0f}  current ${cur:>9,.0f}  proposed ${prop:>9,.0f}  increase ${inc:>9,.0f}")
+        return
+    est = value_lead({"Zone": args.zone, "Lead_Type": args.lead_type, "Assessed_Value": args.value or ""})
+    print(f"zip {est['zip'] or '?'}  value ${est['value']:,.0f}  tax increase ${est['tax_increase']:,.0f}")
+    if est["adu_low"] is not None:
+        print(f"ADU separated value ${est['adu_low']:,.0f} – ${est['adu_high']:,.0f}")
+
+
+if __name__ == "__main__":
+    main()